@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Purpose: Demonstrate scope-partitioned admission with per-scope budgets and an allowlist
+Spec: 30-control-mechanisms/isolation
+Note: Illustrative script. Not production code. Authority: human-supervised execution.
+
+What this script does
+- Streams a context bundle (JSON or JSON Lines) from a file path or stdin
+- Partitions artifacts by scope in one pass (unscoped artifacts form the
+  global partition: system, task, the question)
+- Rejects whole scopes that are not on the allowlist
+- Runs the example gate (gates.gate_scoped in minimal-rag-context-gate:
+  relevance to the question, ranking, document cap, budget) for every
+  allowed scope against that scope's own budget, optionally in parallel
+  worker processes
+- Merges the admitted artifacts in authority order and reports per-scope
+  budgets, usage and exclusions
+
+What this script does not do
+- It does not check content for cross-scope leaks (see cross_domain_leak_test.py)
+- It does not infer scope from content; unscoped artifacts stay global
+- It does not judge relevance beyond the gate's term overlap with the question
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+GATE_SRC = REPO_ROOT / "examples" / "minimal-rag-context-gate" / "src"
+for path in (REPO_ROOT, GATE_SRC):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import gates  # noqa: E402
+from context_core.artifact import Artifact, normalize_artifact  # noqa: E402
+from context_core.bundle_stream import iter_artifact_records  # noqa: E402
+from context_core.isolation import ScopePolicy, parse_scope_budgets, partition_by_scope  # noqa: E402
+from context_core.precedence import DEFAULT_WEIGHTS  # noqa: E402
+from context_core.tokens import HeuristicTokenCounter  # noqa: E402
+
+
+# ----------------------------
+# Output helpers
+# ----------------------------
+
+def print_table(rows: List[List[str]], headers: List[str]) -> None:
+    cols = list(zip(*([headers] + rows))) if rows else [headers]
+    widths = [max(len(str(cell)) for cell in col) for col in cols]
+
+    def _line(parts: List[str]) -> str:
+        return "  ".join(str(p).ljust(w) for p, w in zip(parts, widths))
+
+    print(_line(headers))
+    print(_line(["-" * w for w in widths]))
+    for r in rows:
+        print(_line(r))
+
+
+def label(scope: Optional[str]) -> str:
+    return "(global)" if scope is None else scope
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Isolation demo: per-scope admission with budgets and an allowlist.")
+    parser.add_argument(
+        "--input",
+        "-i",
+        default="-",
+        help="Path to context bundle JSON. Use '-' to read from stdin.",
+    )
+    parser.add_argument(
+        "--budget",
+        "-b",
+        type=int,
+        default=200,
+        help="Token budget for every scope without its own --scope-budget.",
+    )
+    parser.add_argument(
+        "--scope-budget",
+        action="append",
+        default=[],
+        metavar="SCOPE=TOKENS",
+        help="Budget for one scope (e.g. billing=300). Repeatable.",
+    )
+    parser.add_argument(
+        "--global-budget",
+        type=int,
+        default=None,
+        help="Budget for unscoped artifacts (default: --budget).",
+    )
+    parser.add_argument(
+        "--allow",
+        action="append",
+        default=None,
+        metavar="SCOPE",
+        help="Only admit these scopes (unscoped artifacts are always admitted). Repeatable.",
+    )
+    parser.add_argument(
+        "--max-docs",
+        type=int,
+        default=3,
+        help="Document cap per scope.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for per-scope admission (1 = in-process).",
+    )
+    args = parser.parse_args()
+
+    try:
+        policy = ScopePolicy(
+            budgets=parse_scope_budgets(args.scope_budget),
+            default_budget=args.budget,
+            allowed=args.allow,
+            global_budget=args.global_budget,
+        )
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+
+    counter = HeuristicTokenCounter()
+    artifacts: List[Artifact] = []
+    try:
+        for i, raw in enumerate(iter_artifact_records(args.input)):
+            artifacts.append(normalize_artifact(raw, i))
+    except (OSError, ValueError) as e:
+        print(f"ERROR: failed to read bundle: {e}", file=sys.stderr)
+        return 2
+
+    if not artifacts:
+        print("No artifacts found in bundle.artifacts", file=sys.stderr)
+        return 1
+
+    if args.workers > 1:
+        with ProcessPoolExecutor(args.workers) as pool:
+            merged, excluded = gates.gate_scoped(artifacts, policy, args.max_docs, counter=counter, executor=pool)
+    else:
+        merged, excluded = gates.gate_scoped(artifacts, policy, args.max_docs, counter=counter)
+
+    parts = partition_by_scope(a.scope for a in artifacts)
+    admitted_by_scope: Dict[Optional[str], List[Artifact]] = {scope: [] for scope in parts}
+    for a in merged:
+        admitted_by_scope[a.scope].append(a)
+
+    scope_rows: List[List[str]] = []
+    for scope, rows in parts.items():
+        if policy.allows(scope):
+            used = sum(counter.count(a.content) for a in admitted_by_scope[scope])
+            budget = policy.budget(scope)
+            scope_rows.append([
+                label(scope), "yes", str(budget), str(len(rows)), str(len(admitted_by_scope[scope])), str(used),
+                f"{used / budget * 100:.1f}%" if budget > 0 else "-",
+            ])
+        else:
+            scope_rows.append([label(scope), "no", "-", str(len(rows)), "0", "0", "-"])
+    excluded_rows = [
+        [a.artifact_id, label(a.scope), a.kind, a.authority, str(counter.count(a.content)), reason]
+        for a, reason in excluded
+    ]
+
+    print("")
+    print("Boundary Split")
+    print("--------------")
+    print(f"Artifacts:          {len(artifacts)}")
+    print(f"Scopes:             {len(parts)} ({sum(map(policy.allows, parts))} allowed)")
+    print(f"Workers:            {args.workers}")
+    print("")
+
+    print("Per-scope admission")
+    print_table(scope_rows, headers=["scope", "allowed", "budget", "artifacts", "admitted", "tokens", "used"])
+    print("")
+
+    print("Admitted context (merged in authority order)")
+    print_table(
+        [
+            [str(n), a.artifact_id, label(a.scope), a.authority, a.kind, str(DEFAULT_WEIGHTS.score(a)), str(counter.count(a.content))]
+            for n, a in enumerate(merged, 1)
+        ],
+        headers=["#", "id", "scope", "authority", "kind", "score", "tokens"],
+    )
+    print("")
+
+    print("Excluded")
+    if excluded_rows:
+        print_table(excluded_rows, headers=["id", "scope", "kind", "authority", "tokens", "reason"])
+    else:
+        print("(none)")
+    print("")
+
+    print("Totals")
+    print("------")
+    print(f"Admitted artifacts: {len(merged)}")
+    print(f"Admitted tokens:    {sum(counter.count(a.content) for a in merged)}")
+    print(f"Excluded artifacts: {len(excluded_rows)}")
+    print("")
+
+    print("Operator reminder")
+    print("-----------------")
+    print("Per-scope budgets stop one scope from crowding out another; they do not prove content stays in scope.")
+    print("Run a leak test before trusting a split, and escalate if a denied scope's content appears anywhere.")
+    print("")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Purpose: Test a bundle (or an admitted context) for text leaking across scopes
+Spec: 30-control-mechanisms/isolation
+Note: Illustrative script. Not production code. Authority: human-supervised execution.
+Implementation: context_core/leaks.py (also: python -m context_core.leaks)
+
+What this script does
+- Streams a context bundle (JSON or JSON Lines) from a file path or stdin
+- Fingerprints every window of N words of each scoped artifact with a
+  rolling (Rabin-Karp) hash, once, into a single table
+- Scans the bundle itself, or the admitted context given with --admitted,
+  looking each window up once (linear in total content, no pairwise search)
+- Reports every span of one scope's text found in another scope's artifact
+  (or in unscoped shared context), with character offsets on both sides
+- Exits 1 if any leak is found, so it can gate a pipeline
+
+What this script does not do
+- It does not detect paraphrased or summarized leaks (only verbatim or
+  re-cased / re-punctuated copies of at least N words)
+- It does not decide which scope is authoritative beyond bundle order
+  (the first scope to contain a text owns it)
+- It does not remove leaked spans (see masking and boundary_split_demo.py)
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from context_core.leaks import main  # noqa: E402
+
+if __name__ == "__main__":
+    raise SystemExit(main())
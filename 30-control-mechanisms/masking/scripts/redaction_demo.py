@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Purpose: Demonstrate single-pass PII redaction of artifact content
+Spec: 30-control-mechanisms/masking
+Note: Illustrative script. Not production code. Authority: human-supervised execution.
+
+What this script does
+- Streams a context bundle (JSON or JSON Lines) from a file path or stdin
+- Scans each artifact once with every detector compiled into one pattern
+  (emails, API keys, IBANs, Luhn-checked cards, phone numbers; optionally any 3+ digit run)
+- Reports the detected spans per artifact and prints the masked content
+- Optionally writes the masked bundle as JSON Lines
+
+What this script does not do
+- It does not decide which artifacts are admitted
+- It does not guarantee detection of every PII shape (detectors are heuristics)
+- It does not unmask or store original values
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from context_core.artifact import normalize_artifact  # noqa: E402
+from context_core.bundle_stream import iter_artifact_records  # noqa: E402
+from context_core.redaction import DEFAULT_DETECTORS, DETECTORS, RedactionEngine  # noqa: E402
+
+
+# ----------------------------
+# Output helpers
+# ----------------------------
+
+def print_table(rows: List[List[str]], headers: List[str]) -> None:
+    cols = list(zip(*([headers] + rows))) if rows else [headers]
+    widths = [max(len(str(cell)) for cell in col) for col in cols]
+
+    def _line(parts: List[str]) -> str:
+        return "  ".join(str(p).ljust(w) for p, w in zip(parts, widths))
+
+    print(_line(headers))
+    print(_line(["-" * w for w in widths]))
+    for r in rows:
+        print(_line(r))
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Masking demo: single-pass PII redaction.")
+    parser.add_argument(
+        "--input",
+        "-i",
+        default="-",
+        help="Path to context bundle JSON. Use '-' to read from stdin.",
+    )
+    parser.add_argument(
+        "--detectors",
+        default=",".join(DEFAULT_DETECTORS),
+        help=f"Comma-separated detectors, earlier wins on overlap. Available: {', '.join(DETECTORS)}.",
+    )
+    parser.add_argument(
+        "--placeholder",
+        default="[{kind}]",
+        help="Replacement text; '{kind}' is replaced by the detector name.",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default=None,
+        help="Write masked artifacts as JSON Lines to this path.",
+    )
+    parser.add_argument(
+        "--max-content-preview",
+        type=int,
+        default=80,
+        help="Max characters of masked content to print per artifact.",
+    )
+    args = parser.parse_args()
+
+    try:
+        engine = RedactionEngine([d.strip() for d in args.detectors.split(",") if d.strip()], args.placeholder)
+    except (KeyError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else None
+    rows: List[List[str]] = []
+    totals: Dict[str, int] = {}
+    artifacts = 0
+    try:
+        for i, raw in enumerate(iter_artifact_records(args.input)):
+            a = normalize_artifact(raw, i)
+            masked, spans = engine.redact(a.content)
+            artifacts += 1
+            for s in spans:
+                totals[s.kind] = totals.get(s.kind, 0) + 1
+            if out is not None:
+                record = dict(raw) if isinstance(raw, dict) else {}
+                record["content"] = masked
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if not spans:
+                continue
+            preview = masked[: args.max_content_preview]
+            if len(masked) > args.max_content_preview:
+                preview += "..."
+            rows.append([
+                a.artifact_id,
+                a.kind,
+                ",".join(f"{s.kind}@{s.start}-{s.end}" for s in spans),
+                preview.replace("\n", " "),
+            ])
+    except Exception as e:
+        print(f"ERROR: failed to load/parse context bundle: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if out is not None:
+            out.close()
+
+    if not artifacts:
+        print("No artifacts found in bundle.artifacts", file=sys.stderr)
+        return 1
+
+    print("")
+    print("Redaction Demo (single pass)")
+    print("----------------------------")
+    print(f"Artifacts:          {artifacts}")
+    print(f"With PII:           {len(rows)}")
+    print(f"Detectors:          {', '.join(d.name for d in engine.detectors)}")
+    print("")
+
+    if rows:
+        print_table(rows, headers=["id", "kind", "spans", "masked content"])
+        print("")
+        print("Matches by detector")
+        print_table([[k, str(v)] for k, v in sorted(totals.items())], headers=["detector", "count"])
+    else:
+        print("No PII detected.")
+    print("")
+
+    print("Operator reminder")
+    print("-----------------")
+    print("Detectors are heuristics: review masked output before relying on it.")
+    print("Masking happens before admission; it does not replace scope filtering.")
+    print("")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Purpose: Simulate how admission changes under different precedence (weight) policies
+Spec: 30-control-mechanisms/ordering
+Note: Illustrative script. Not production code. Authority: human-supervised execution.
+
+What this script does
+- Reads a corpus of bundles (files, directories, globs, JSONL-of-bundles)
+  and reduces each to columns: authority/kind codes, priority, tokens
+- Builds weight configurations from policy files (--policy) and/or a grid
+  of single-weight sweeps (--sweep kind.task=90,110,130), each overlaid on
+  the base policy (context_core/precedence.json unless --base is given)
+  and compiled once into lookup arrays
+- Runs admission (score, rank, document cap, first-fit budget) for every
+  configuration over the whole corpus, configurations in parallel worker
+  processes that receive the corpus once
+- Reports, per configuration, how many bundles admit a different set than
+  the base policy, how many artifacts moved in or out, and which kinds
+  gained or lost admissions
+
+What this script does not do
+- It does not filter documents for relevance (precedence only)
+- It does not change any policy; write the winning one to a file and point
+  CONTEXT_PRECEDENCE_POLICY at it (or edit context_core/precedence.json)
+- It does not judge answer quality; a change in admission is not a regression
+  by itself
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from context_core.admission import score_columns, select_greedy  # noqa: E402
+from context_core.artifact import KIND_CODE, KINDS, Weights, normalize_artifact  # noqa: E402
+from context_core.batch import iter_bundle_tasks, load_task_records  # noqa: E402
+from context_core.precedence import DEFAULT_WEIGHTS, load_policy, policy_tables, with_overrides  # noqa: E402
+from context_core.tokens import HeuristicTokenCounter  # noqa: E402
+
+
+class Columns(NamedTuple):
+    """One bundle, reduced to what admission needs."""
+
+    authority: List[int]
+    kind: List[int]
+    priority: List[int]
+    tokens: List[int]
+    is_doc: List[bool]
+
+
+class Outcome(NamedTuple):
+    """One configuration over the corpus, compared with the base policy."""
+
+    changed: int
+    gained: int
+    lost: int
+    tokens: int
+    kind_delta: List[int]
+
+
+# ----------------------------
+# Admission per configuration
+# ----------------------------
+
+# (corpus, budget, max_docs, admitted rows per bundle under the base policy), set once per worker
+_corpus: Optional[Tuple[List[Columns], int, int, List[frozenset]]] = None
+
+
+def share_corpus(corpus: List[Columns], budget: int, max_docs: int, baseline: List[frozenset]) -> None:
+    global _corpus
+    _corpus = (corpus, budget, max_docs, baseline)
+
+
+def admit(c: Columns, weights: Weights, budget: int, max_docs: int) -> List[int]:
+    scores = score_columns(c.authority, c.kind, c.priority, weights).tolist()
+    admitted, _, _ = select_greedy(scores, c.tokens, budget, capped=c.is_doc, cap=max_docs)
+    return admitted
+
+
+def simulate(weights: Weights) -> Outcome:
+    assert _corpus is not None
+    corpus, budget, max_docs, baseline = _corpus
+    changed = gained = lost = tokens = 0
+    kind_delta = [0] * len(KINDS)
+    for c, base in zip(corpus, baseline):
+        rows = frozenset(admit(c, weights, budget, max_docs))
+        tokens += sum(c.tokens[r] for r in rows)
+        if rows == base:
+            continue
+        changed += 1
+        for r in rows - base:
+            gained += 1
+            kind_delta[c.kind[r]] += 1
+        for r in base - rows:
+            lost += 1
+            kind_delta[c.kind[r]] -= 1
+    return Outcome(changed, gained, lost, tokens, kind_delta)
+
+
+# ----------------------------
+# Configurations
+# ----------------------------
+
+def parse_sweep(spec: str) -> Tuple[str, List[str]]:
+    """'kind.task=90,110' -> ('kind.task', ['90', '110'])."""
+    key, sep, values = spec.partition("=")
+    options = [v.strip() for v in values.split(",") if v.strip()]
+    if not sep or not options:
+        raise ValueError(f"expected TABLE.NAME=V1,V2,..., got {spec!r}")
+    return key.strip(), options
+
+
+def build_configs(base: Weights, policies: Sequence[str], sweeps: Sequence[str]) -> List[Tuple[str, Weights]]:
+    """(label, weights) for every policy file and every point of the sweep grid."""
+    configs = [(Path(p).name, load_policy(p, base)) for p in policies]
+    grid = [parse_sweep(s) for s in sweeps]
+    for point in itertools.product(*(options for _, options in grid)) if grid else ():
+        specs = [f"{key}={value}" for (key, _), value in zip(grid, point)]
+        configs.append((" ".join(specs), with_overrides(base, specs)))
+    return configs
+
+
+def describe_changes(base: Weights, weights: Weights) -> str:
+    old, new = policy_tables(base), policy_tables(weights)
+    diffs = [
+        f"{table}.{name} {old[table][name]}->{value}"
+        for table in new
+        for name, value in new[table].items()
+        if value != old[table][name]
+    ]
+    return ", ".join(diffs) or "(same as base)"
+
+
+# ----------------------------
+# Output helpers
+# ----------------------------
+
+def print_table(rows: List[List[str]], headers: List[str]) -> None:
+    cols = list(zip(*([headers] + rows))) if rows else [headers]
+    widths = [max(len(str(cell)) for cell in col) for col in cols]
+
+    def _line(parts: List[str]) -> str:
+        return "  ".join(str(p).ljust(w) for p, w in zip(parts, widths))
+
+    print(_line(headers))
+    print(_line(["-" * w for w in widths]))
+    for r in rows:
+        print(_line(r))
+
+
+def kind_shift(delta: Sequence[int]) -> str:
+    return " ".join(f"{KINDS[k]}{d:+d}" for k, d in enumerate(delta) if d) or "-"
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Ordering demo: sweep precedence weights over a corpus of bundles.")
+    parser.add_argument(
+        "--input",
+        "-i",
+        nargs="+",
+        required=True,
+        help="Bundle files, directories, glob patterns or JSONL-of-bundles files.",
+    )
+    parser.add_argument(
+        "--base",
+        default=None,
+        help="Base policy file (default: the shared policy, context_core/precedence.json).",
+    )
+    parser.add_argument(
+        "--policy",
+        action="append",
+        default=[],
+        help="Policy file (JSON/TOML) to simulate, overlaid on the base. Repeatable.",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="append",
+        default=[],
+        metavar="TABLE.NAME=V1,V2,...",
+        help="Weight values to try (e.g. kind.task=90,110,130). Repeatable; sweeps form a grid.",
+    )
+    parser.add_argument(
+        "--budget",
+        "-b",
+        type=int,
+        default=120,
+        help="Token budget per bundle.",
+    )
+    parser.add_argument(
+        "--max-docs",
+        type=int,
+        default=3,
+        help="Document cap per bundle.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for the configurations (1 = in-process).",
+    )
+    args = parser.parse_args()
+
+    try:
+        base = load_policy(args.base) if args.base else DEFAULT_WEIGHTS
+        configs = build_configs(base, args.policy, args.sweep)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    if not configs:
+        print("ERROR: nothing to simulate (give --policy and/or --sweep)", file=sys.stderr)
+        return 2
+
+    counter = HeuristicTokenCounter()
+    document = KIND_CODE["document"]
+    corpus: List[Columns] = []
+    try:
+        for task in iter_bundle_tasks(args.input):
+            _, records = load_task_records(task)
+            artifacts = [normalize_artifact(raw, i) for i, raw in enumerate(records)]
+            tokens = counter.count_many([a.content for a in artifacts])
+            kinds = [a.kind_code for a in artifacts]
+            corpus.append(Columns(
+                [a.authority_code for a in artifacts], kinds, [a.priority for a in artifacts], tokens,
+                [k == document and t > 0 for k, t in zip(kinds, tokens)],
+            ))
+    except (OSError, ValueError) as e:
+        print(f"ERROR: failed to read corpus: {e}", file=sys.stderr)
+        return 2
+
+    if not corpus:
+        print("No bundles found in the input.", file=sys.stderr)
+        return 1
+
+    baseline = [frozenset(admit(c, base, args.budget, args.max_docs)) for c in corpus]
+    share_corpus(corpus, args.budget, args.max_docs, baseline)
+    weights = [w for _, w in configs]
+    if args.workers > 1 and len(configs) > 1:
+        chunksize = max(1, len(configs) // (args.workers * 4))
+        with ProcessPoolExecutor(
+            args.workers, initializer=share_corpus, initargs=(corpus, args.budget, args.max_docs, baseline)
+        ) as pool:
+            outcomes = list(pool.map(simulate, weights, chunksize=chunksize))
+    else:
+        outcomes = [simulate(w) for w in weights]
+
+    base_tokens = sum(c.tokens[r] for c, rows in zip(corpus, baseline) for r in rows)
+    print("")
+    print("Precedence Simulator")
+    print("--------------------")
+    print(f"Bundles:            {len(corpus)} ({sum(len(c.tokens) for c in corpus)} artifacts)")
+    print(f"Budget:             {args.budget} tokens, at most {args.max_docs} documents per bundle")
+    print(f"Base policy:        {args.base or 'context_core/precedence.json'}")
+    print(f"Base admission:     {sum(map(len, baseline))} artifacts, {base_tokens} tokens")
+    print(f"Configurations:     {len(configs)} ({args.workers} workers)")
+    print("")
+
+    print("Admission vs base policy")
+    print_table(
+        [
+            [label, str(o.changed), f"{o.changed / len(corpus) * 100:.1f}%", f"+{o.gained}", f"-{o.lost}",
+             f"{o.tokens - base_tokens:+d}", kind_shift(o.kind_delta)]
+            for (label, _), o in zip(configs, outcomes)
+        ],
+        headers=["config", "bundles changed", "share", "in", "out", "tokens", "kind shift"],
+    )
+    print("")
+
+    print("Weights changed per configuration")
+    print_table([[label, describe_changes(base, w)] for label, w in configs], headers=["config", "changes"])
+    print("")
+
+    print("Operator reminder")
+    print("-----------------")
+    print("Precedence changes move authority, not just ranking; review every bundle where instructions lose admission.")
+    print("Simulate on recorded traffic before changing the shared policy file.")
+    print("")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
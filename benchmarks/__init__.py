@@ -0,0 +1 @@
+"""Benchmarks: synthetic bundle generator (generator.py) and the timed suite (suite.py)."""
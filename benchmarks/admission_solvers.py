@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Purpose: Compare greedy and knapsack admission on large synthetic bundles
+Note: Illustrative benchmark. Numbers depend on the machine; compare solvers, not runs.
+
+What this script does
+- Generates seeded bundles: system/task/question plus many documents whose
+  sizes mix a few large, high-priority documents with many small ones
+- Gates each bundle with gate_batch(solver="greedy") and solver="knapsack"
+- Reports budget utilization, total admitted score and per-bundle latency
+
+What this script does not do
+- It does not measure retrieval quality; scores stand in for value
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+GATE_SRC = REPO_ROOT / "examples" / "minimal-rag-context-gate" / "src"
+for p in (REPO_ROOT, GATE_SRC):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+from context_core.artifact import Artifact, ArtifactBatch  # noqa: E402
+from gates import WEIGHTS, HeuristicTokenCounter, gate_batch  # type: ignore  # noqa: E402
+
+WORDS = "capital france paris city river seine museum history population europe".split()
+
+
+def make_bundle(rng: random.Random, docs: int) -> List[Artifact]:
+    artifacts = [
+        Artifact("sys", "system", "system", 10, "System", "Answer from the provided documents only."),
+        Artifact("task", "task", "developer", 8, "Task", "Cite the document ids you used."),
+        Artifact("q", "message", "user", 2, "Question", "What is the capital of France and its river?"),
+    ]
+    for i in range(docs):
+        large = rng.random() < 0.1
+        n_words = rng.randint(150, 400) if large else rng.randint(10, 80)
+        priority = rng.randint(5, 9) if large else rng.randint(0, 6)
+        text = " ".join(rng.choice(WORDS) for _ in range(n_words))
+        artifacts.append(Artifact(f"d{i}", "document", "tool", priority, f"Doc {i}", text))
+    rng.shuffle(artifacts)
+    return artifacts
+
+
+def run(bundles: int, docs: int, budget: int, time_limit: float, seed: int) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(seed)
+    counter = HeuristicTokenCounter()
+    stats: Dict[str, Dict[str, List[float]]] = {s: {"util": [], "score": [], "ms": []} for s in ("greedy", "knapsack")}
+    for _ in range(bundles):
+        batch = ArtifactBatch.from_artifacts(make_bundle(rng, docs))
+        tokens = [counter.count(c) for c in batch.contents]
+        for solver in ("greedy", "knapsack"):
+            t0 = time.perf_counter()
+            admitted, _ = gate_batch(
+                batch, budget_tokens=budget, max_docs=docs, counter=counter, solver=solver, time_limit=time_limit
+            )
+            stats[solver]["ms"].append((time.perf_counter() - t0) * 1000)
+            stats[solver]["util"].append(sum(tokens[i] for i in admitted) / budget)
+            stats[solver]["score"].append(sum(WEIGHTS.score(batch.artifact(i)) for i in admitted))
+    return {
+        s: {
+            "utilization": statistics.mean(v["util"]),
+            "score": statistics.mean(v["score"]),
+            "p50_ms": statistics.median(v["ms"]),
+            "max_ms": max(v["ms"]),
+        }
+        for s, v in stats.items()
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark greedy vs knapsack admission.")
+    parser.add_argument("--bundles", type=int, default=20)
+    parser.add_argument("--docs", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--budget", type=int, default=4000)
+    parser.add_argument("--time-limit-ms", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"budget={args.budget} tokens  bundles={args.bundles}  time limit={args.time_limit_ms}ms")
+    print(f"{'docs':>6}  {'solver':<9}  {'util':>6}  {'score':>9}  {'p50 ms':>8}  {'max ms':>8}")
+    for docs in args.docs:
+        result = run(args.bundles, docs, args.budget, args.time_limit_ms / 1000.0, args.seed)
+        for solver, r in result.items():
+            print(
+                f"{docs:>6}  {solver:<9}  {r['utilization'] * 100:>5.1f}%  {r['score']:>9.0f}  "
+                f"{r['p50_ms']:>8.2f}  {r['max_ms']:>8.2f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,151 @@
+"""
+Seeded synthetic bundles and sessions for benchmarks.
+
+Every knob is explicit and the same (config, seed) always yields the same
+records, so timings are comparable across runs and machines:
+
+- artifacts:      number of artifacts (including system/task/question)
+- mean_chars:     mean content length; lengths are log-normal around it
+- length_sigma:   spread of the log-normal (0 = every artifact the same length)
+- duplicate_rate: share of contents copied from an earlier artifact
+                  (half verbatim, half with a few words changed)
+- pii_density:    share of artifacts carrying one email/phone/card/IBAN
+
+Records are plain dicts in the bundle schema, so they can be written out as
+JSON / JSON Lines or fed to any loader.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+WORDS = (
+    "capital france paris city river seine museum history population europe policy billing account "
+    "refund escalate customer request support ticket session context budget token retrieval document "
+    "answer source evidence summary error debug fetched processed completed latency cache index"
+).split()
+
+DOC_KINDS = ("document", "document", "document", "tool_output", "message")
+AUTHORITY_FOR_KIND = {"document": "tool", "tool_output": "tool", "message": "user"}
+
+
+@dataclass(frozen=True)
+class BundleConfig:
+    artifacts: int = 1000
+    mean_chars: int = 200
+    length_sigma: float = 0.6
+    duplicate_rate: float = 0.1
+    pii_density: float = 0.05
+    seed: int = 7
+
+    def __post_init__(self) -> None:
+        if self.artifacts < 0 or self.mean_chars <= 0:
+            raise ValueError("artifacts must be >= 0 and mean_chars > 0")
+        if not (0 <= self.duplicate_rate <= 1 and 0 <= self.pii_density <= 1):
+            raise ValueError("duplicate_rate and pii_density must be within [0, 1]")
+
+
+def _luhn_complete(digits: str) -> str:
+    total = 0
+    for i, c in enumerate(reversed(digits)):
+        d = int(c)
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return digits + str((10 - total % 10) % 10)
+
+
+def _pii(rng: random.Random) -> str:
+    kind = rng.randrange(4)
+    if kind == 0:
+        return f"{rng.choice(WORDS)}.{rng.randrange(1000)}@example.com"
+    if kind == 1:
+        return f"+1 {rng.randrange(200, 999)} {rng.randrange(200, 999)} {rng.randrange(1000, 9999)}"
+    if kind == 2:
+        return _luhn_complete("4" + "".join(str(rng.randrange(10)) for _ in range(14)))
+    return "GB82 WEST 1234 5698 7654 32"
+
+
+class _Content:
+    """Content stream honouring the length, duplicate and PII knobs."""
+
+    def __init__(self, config: BundleConfig, rng: random.Random) -> None:
+        self.config = config
+        self.rng = rng
+        self.seen: List[str] = []
+        # mu such that the log-normal mean equals mean_chars
+        self.mu = math.log(config.mean_chars) - config.length_sigma ** 2 / 2
+
+    def _fresh(self) -> str:
+        rng = self.rng
+        chars = max(1, int(rng.lognormvariate(self.mu, self.config.length_sigma)))
+        words = rng.choices(WORDS, k=max(1, chars // 7))
+        if rng.random() < self.config.pii_density:
+            words.insert(rng.randrange(len(words) + 1), _pii(rng))
+        return " ".join(words)
+
+    def next(self) -> str:
+        rng = self.rng
+        if self.seen and rng.random() < self.config.duplicate_rate:
+            source = rng.choice(self.seen)
+            if rng.random() < 0.5:
+                return source
+            words = source.split(" ")
+            for _ in range(max(1, len(words) // 20)):
+                words[rng.randrange(len(words))] = rng.choice(WORDS)
+            return " ".join(words)
+        text = self._fresh()
+        self.seen.append(text)
+        return text
+
+
+def _header(config: BundleConfig) -> List[Dict[str, Any]]:
+    return [
+        {"id": "sys", "kind": "system", "authority": "system", "priority": 10, "title": "System",
+         "content": "Answer from the provided documents only. Follow company policy."},
+        {"id": "task", "kind": "task", "authority": "developer", "priority": 8, "title": "Task",
+         "content": "Cite the document ids you used."},
+        {"id": "q", "kind": "message", "authority": "user", "priority": 2, "title": "Question",
+         "content": "What is the capital of France and which river crosses the city?"},
+    ][: config.artifacts]
+
+
+def make_bundle(config: BundleConfig) -> Dict[str, Any]:
+    """A retrieval bundle: system, task and question, then documents, tool output and messages."""
+    rng = random.Random(config.seed)
+    content = _Content(config, rng)
+    artifacts = _header(config)
+    for i in range(config.artifacts - len(artifacts)):
+        kind = rng.choice(DOC_KINDS)
+        artifacts.append({
+            "id": f"a{i}",
+            "kind": kind,
+            "authority": AUTHORITY_FOR_KIND[kind],
+            "priority": rng.randrange(10),
+            "title": f"{kind.title()} {i}",
+            "content": content.next(),
+        })
+    return {"id": f"bench-bundle-{config.artifacts}-{config.seed}", "artifacts": artifacts}
+
+
+def make_session(config: BundleConfig) -> Dict[str, Any]:
+    """A long session: system and task, then alternating user/assistant turns with tool logs."""
+    rng = random.Random(config.seed)
+    content = _Content(config, rng)
+    artifacts = _header(config)[:2]
+    for i in range(config.artifacts - len(artifacts)):
+        if rng.random() < 0.25:
+            record = {"kind": "tool_output", "authority": "tool", "title": f"Log {i}",
+                      "content": "DEBUG: " + content.next()}
+        else:
+            speaker = "User" if i % 2 else "Assistant"
+            record = {"kind": "message", "authority": "user", "title": f"Turn {i}",
+                      "content": f"{speaker}: {content.next()}"}
+        record.update(id=f"t{i}", priority=rng.randrange(5))
+        artifacts.append(record)
+    return {"id": f"bench-session-{config.artifacts}-{config.seed}", "artifacts": artifacts}
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Purpose: Time the gates and triage scripts on seeded synthetic bundles, with a regression check
+Note: Illustrative benchmark. Absolute numbers depend on the machine; see "Baselines" below.
+
+What this script does
+- Generates bundles/sessions with benchmarks.generator (artifact count, content
+  length distribution, duplicate rate, PII density, seed)
+- Times gate_bundle, truncate_session, the session validators, near_duplicates
+  (exact and LSH), admission_preview and assemble_context at each size
+- Prints a table and optionally writes the results as JSON
+- Compares against a stored baseline and exits 1 on regressions
+
+Baselines
+- Every run also times a fixed pure-Python calibration loop; results are
+  stored and compared relative to it, so a baseline recorded on one machine
+  stays meaningful on another of a different speed.
+- A benchmark regresses when its relative best time exceeds the baseline's by
+  more than --tolerance and by more than --min-delta-ms in absolute terms.
+
+What this script does not do
+- It does not generate bundles larger than fit in memory
+- It does not measure admission quality (see admission_solvers.py)
+
+    python benchmarks/suite.py --sizes 10 1000 100000 -o results.json
+    python benchmarks/suite.py --update-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import importlib.util
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.generator import BundleConfig, make_bundle, make_session  # noqa: E402
+from context_core.redaction import get_engine  # noqa: E402
+
+EXAMPLES = REPO_ROOT / "examples"
+TRIAGE_SCRIPTS = REPO_ROOT / "skills" / "operator" / "context-triage" / "scripts"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+
+# ----------------------------
+# Loading the code under test
+# ----------------------------
+
+def load_example(name: str, directory: str) -> ModuleType:
+    """An example's src/ as a package under a unique name (they are all called src)."""
+    if name not in sys.modules:
+        src = EXAMPLES / directory / "src"
+        spec = importlib.util.spec_from_file_location(name, src / "__init__.py", submodule_search_locations=[str(src)])
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+def load_script(name: str) -> ModuleType:
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, TRIAGE_SCRIPTS / f"{name}.py")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+def rag(module: str) -> ModuleType:
+    load_example("bench_minimal_rag_gate", "minimal-rag-context-gate")
+    return importlib.import_module(f"bench_minimal_rag_gate.{module}")
+
+
+def harness(module: str) -> ModuleType:
+    load_example("bench_long_session_harness", "long-session-stability-harness")
+    return importlib.import_module(f"bench_long_session_harness.{module}")
+
+
+# ----------------------------
+# Benchmarks
+# ----------------------------
+
+@dataclass(frozen=True)
+class Benchmark:
+    """prepare(config) builds the inputs (untimed); the returned callable is timed."""
+
+    name: str
+    prepare: Callable[[BundleConfig], Callable[[], Any]]
+    max_size: Optional[int] = None
+
+
+def _gate_bundle(config: BundleConfig) -> Callable[[], Any]:
+    gates = rag("gates")
+    bundle = make_bundle(config)
+    return lambda: gates.gate_bundle(bundle, budget_tokens=4000, max_docs=20)
+
+
+def _truncate_session(config: BundleConfig) -> Callable[[], Any]:
+    truncator = harness("truncator")
+    session = make_session(config)
+    return lambda: truncator.truncate_session(session, budget_tokens=4000)
+
+
+def _validators(config: BundleConfig) -> Callable[[], Any]:
+    truncator, validator = harness("truncator"), harness("validator")
+    # Masked as the truncator leaves them, so no check stops at the first PII hit.
+    artifacts = [truncator.masked(a) for a in truncator.load_bundle(make_session(config))]
+    engine = get_engine(validator.PII_DETECTORS)
+
+    def run() -> Any:
+        engine._spans.clear()  # measure scanning, not the span cache
+        return (
+            validator.validate_no_pii(artifacts),
+            validator.validate_budget(artifacts, 4000),
+            validator.validate_authority_order(artifacts),
+        )
+
+    return run
+
+
+def _near_duplicates(config: BundleConfig) -> Callable[[], Any]:
+    demo = load_script("duplicate_scan_demo")
+    artifacts = demo.normalize_bundle(make_bundle(config))
+    return lambda: demo.near_duplicates(artifacts, threshold=0.8, shingle_k=3, max_pairs=10**9)
+
+
+def _near_duplicates_lsh(config: BundleConfig) -> Callable[[], Any]:
+    demo = load_script("duplicate_scan_demo")
+    artifacts = demo.normalize_bundle(make_bundle(config))
+    return lambda: demo.near_duplicates_lsh(artifacts, threshold=0.8, shingle_k=3, bands=16, rows=4)
+
+
+def _admission_preview(config: BundleConfig) -> Callable[[], Any]:
+    report = load_script("context_budget_report")
+    artifacts = [report.normalize_artifact(a, i) for i, a in enumerate(make_bundle(config)["artifacts"])]
+    counter = report.HeuristicTokenCounter()
+    return lambda: report.admission_preview(artifacts, counter, budget_tokens=4000)
+
+
+def _assemble_context(config: BundleConfig) -> Callable[[], Any]:
+    gates, assembler = rag("gates"), rag("context_assembler")
+    artifacts = gates.load_bundle(make_bundle(config))
+    return lambda: assembler.assemble_context(artifacts)
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    b.name: b
+    for b in (
+        Benchmark("gate_bundle", _gate_bundle),
+        Benchmark("truncate_session", _truncate_session),
+        Benchmark("validators", _validators),
+        # Pairwise in the worst case: keep it to sizes that finish.
+        Benchmark("near_duplicates", _near_duplicates, max_size=2000),
+        Benchmark("near_duplicates_lsh", _near_duplicates_lsh),
+        Benchmark("admission_preview", _admission_preview),
+        Benchmark("assemble_context", _assemble_context),
+    )
+}
+
+
+# ----------------------------
+# Timing
+# ----------------------------
+
+def calibrate(repeat: int = 5) -> float:
+    """Best-of time (ms) of a fixed pure-Python workload: the unit results are stored in."""
+    rng = random.Random(0)
+    data = [rng.random() for _ in range(50000)]
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        counts: Dict[int, int] = {}
+        for x in sorted(data):
+            k = int(x * 1000)
+            counts[k] = counts.get(k, 0) + 1
+        best = min(best, (time.perf_counter() - t0) * 1000)
+    return best
+
+
+def time_call(fn: Callable[[], Any], repeat: int) -> List[float]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return times
+
+
+def run_suite(names: List[str], sizes: List[int], repeat: int, base: BundleConfig, calibration_ms: float) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for name in names:
+        bench = BENCHMARKS[name]
+        for size in sizes:
+            if bench.max_size is not None and size > bench.max_size:
+                results.append({"name": name, "size": size, "skipped": f"above max size {bench.max_size}"})
+                continue
+            config = BundleConfig(size, base.mean_chars, base.length_sigma, base.duplicate_rate, base.pii_density, base.seed)
+            fn = bench.prepare(config)
+            fn()  # warm-up: imports, compiled patterns, first-touch allocations
+            times = time_call(fn, repeat)
+            best = min(times)
+            results.append({
+                "name": name,
+                "size": size,
+                "best_ms": round(best, 4),
+                "median_ms": round(statistics.median(times), 4),
+                # Best-of is the least noisy estimate of the code's own cost.
+                "relative": round(best / calibration_ms, 6),
+            })
+    return results
+
+
+# ----------------------------
+# Baseline comparison
+# ----------------------------
+
+def find_regressions(
+    results: List[Dict[str, Any]],
+    baseline: Dict[str, Any],
+    calibration_ms: float,
+    tolerance: float,
+    min_delta_ms: float,
+) -> List[Dict[str, Any]]:
+    """Results slower than the baseline's (relative) best time beyond both thresholds."""
+    known = {(r["name"], r["size"]): r for r in baseline.get("results", []) if "relative" in r}
+    regressions = []
+    for r in results:
+        b = known.get((r["name"], r["size"]))
+        if b is None or "relative" not in r:
+            continue
+        expected_ms = b["relative"] * calibration_ms
+        if r["relative"] > b["relative"] * (1 + tolerance) and r["best_ms"] - expected_ms > min_delta_ms:
+            regressions.append({**r, "baseline_ms": round(expected_ms, 4), "ratio": round(r["relative"] / b["relative"], 3)})
+    return regressions
+
+
+# ----------------------------
+# Output helpers
+# ----------------------------
+
+def print_table(rows: List[List[str]], headers: List[str]) -> None:
+    cols = list(zip(*([headers] + rows))) if rows else [headers]
+    widths = [max(len(str(cell)) for cell in col) for col in cols]
+
+    def _line(parts: List[str]) -> str:
+        return "  ".join(str(p).ljust(w) for p, w in zip(parts, widths))
+
+    print(_line(headers))
+    print(_line(["-" * w for w in widths]))
+    for r in rows:
+        print(_line(r))
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark gates and triage scripts on synthetic bundles.")
+    parser.add_argument("--bench", nargs="+", default=list(BENCHMARKS), help=f"Benchmarks ({', '.join(BENCHMARKS)}).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Artifact counts (10 .. 1000000).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark and size.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--mean-chars", type=int, default=200, help="Mean content length (log-normal).")
+    parser.add_argument("--length-sigma", type=float, default=0.6, help="Log-normal spread of content length.")
+    parser.add_argument("--duplicate-rate", type=float, default=0.1, help="Share of duplicated contents.")
+    parser.add_argument("--pii-density", type=float, default=0.05, help="Share of artifacts carrying PII.")
+    parser.add_argument("--output", "-o", default=None, help="Write results as JSON to this path.")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON to compare against.")
+    parser.add_argument("--no-baseline", action="store_true", help="Skip the regression check.")
+    parser.add_argument("--update-baseline", action="store_true", help="Write these results as the baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed relative slowdown (0.5 = 50%%).")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Ignore slowdowns smaller than this.")
+    args = parser.parse_args(argv)
+
+    unknown = [b for b in args.bench if b not in BENCHMARKS]
+    if unknown:
+        print(f"ERROR: unknown benchmark(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    try:
+        base = BundleConfig(0, args.mean_chars, args.length_sigma, args.duplicate_rate, args.pii_density, args.seed)
+        if args.repeat <= 0 or any(s < 0 for s in args.sizes):
+            raise ValueError("--repeat must be > 0 and sizes >= 0")
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+
+    calibration_ms = calibrate()
+    results = run_suite(args.bench, args.sizes, args.repeat, base, calibration_ms)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "calibration_ms": round(calibration_ms, 4),
+            "repeat": args.repeat,
+            "config": {k: v for k, v in asdict(base).items() if k != "artifacts"},
+        },
+        "results": results,
+    }
+
+    print("")
+    print(f"Benchmark Suite (calibration {calibration_ms:.2f} ms)")
+    print("--------------------------------")
+    print_table(
+        [
+            [r["name"], str(r["size"]), r.get("skipped") or f"{r['median_ms']:.3f}",
+             "" if "skipped" in r else f"{r['best_ms']:.3f}", "" if "skipped" in r else f"{r['relative']:.4f}"]
+            for r in results
+        ],
+        headers=["benchmark", "size", "median ms", "best ms", "relative"],
+    )
+    print("")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if args.update_baseline:
+        Path(args.baseline).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written: {args.baseline}")
+        return 0
+    if args.no_baseline or not Path(args.baseline).exists():
+        return 0
+
+    try:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        print(f"ERROR: failed to read baseline: {e}", file=sys.stderr)
+        return 2
+    regressions = find_regressions(results, baseline, calibration_ms, args.tolerance, args.min_delta_ms)
+    if regressions:
+        # Confirm with a fresh calibration and twice the runs: one noisy
+        # neighbour should not fail the check.
+        calibration_ms = calibrate()
+        retimed = [
+            r
+            for suspect in regressions
+            for r in run_suite([suspect["name"]], [suspect["size"]], args.repeat * 2, base, calibration_ms)
+        ]
+        regressions = find_regressions(retimed, baseline, calibration_ms, args.tolerance, args.min_delta_ms)
+    if not regressions:
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+        return 0
+    print(f"Regressions against {args.baseline}")
+    print_table(
+        [[r["name"], str(r["size"]), f"{r['best_ms']:.3f}", f"{r['baseline_ms']:.3f}", f"{r['ratio']:.2f}x"]
+         for r in regressions],
+        headers=["benchmark", "size", "best ms", "baseline ms", "ratio"],
+    )
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
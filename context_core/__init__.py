@@ -0,0 +1,6 @@
+"""
+Shared building blocks for the example gates and operator scripts.
+
+Modules here are stdlib-only so scripts can import them after putting the
+repository root on sys.path.
+"""
@@ -0,0 +1,19 @@
+"""Output helpers shared by the command-line entry points in context_core."""
+
+from __future__ import annotations
+
+from typing import List
+
+
+def print_table(rows: List[List[str]], headers: List[str]) -> None:
+    """Prints `rows` under `headers` as left-aligned, two-space-separated columns."""
+    cols = list(zip(*([headers] + rows))) if rows else [headers]
+    widths = [max(len(str(cell)) for cell in col) for col in cols]
+
+    def _line(parts: List[str]) -> str:
+        return "  ".join(str(p).ljust(w) for p, w in zip(parts, widths))
+
+    print(_line(headers))
+    print(_line(["-" * w for w in widths]))
+    for r in rows:
+        print(_line(r))
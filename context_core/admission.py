@@ -0,0 +1,353 @@
+"""
+Columnar admission primitives: batch scoring, stable ranking, greedy
+budget packing over parallel arrays, and an optimal (knapsack) packer.
+
+NumPy is used when installed; otherwise the same results are produced with
+the stdlib array module. Both paths reproduce the scalar gates exactly:
+ties keep input order, and an artifact is admitted iff it fits the budget
+left after everything ranked above it.
+"""
+
+from __future__ import annotations
+
+import heapq
+import time
+from array import array
+from bisect import bisect_right
+from typing import Any, List, Optional, Sequence, Tuple
+
+from .artifact import AUTHORITY_CODE, Weights
+
+try:  # optional acceleration
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+
+HAVE_NUMPY = np is not None
+
+# Rows the knapsack solver never trades off: system/developer authority.
+PINNED_AUTHORITIES = frozenset({AUTHORITY_CODE["system"], AUTHORITY_CODE["developer"]})
+
+
+def score_columns(
+    authority: Sequence[int],
+    kind: Sequence[int],
+    priority: Sequence[int],
+    weights: Weights,
+) -> Any:
+    """authority weight + kind weight + priority for every row."""
+    if HAVE_NUMPY:
+        aw = np.asarray(weights.authority, dtype=np.int64)
+        kw = np.asarray(weights.kind, dtype=np.int64)
+        return (
+            aw[np.asarray(authority, dtype=np.intp)]
+            + kw[np.asarray(kind, dtype=np.intp)]
+            + np.asarray(priority, dtype=np.int64)
+        )
+    aws, kws = weights.authority, weights.kind
+    return array("q", [aws[a] + kws[k] + p for a, k, p in zip(authority, kind, priority)])
+
+
+def rank_desc(scores: Any, rows: Optional[Sequence[int]] = None) -> List[int]:
+    """
+    Row indices ordered by score, highest first; ties keep input order
+    (same as sorted(..., reverse=True)). Restrict to `rows` if given.
+    """
+    if HAVE_NUMPY:
+        s = np.asarray(scores)
+        if rows is None:
+            return np.argsort(-s, kind="stable").tolist()
+        r = np.asarray(rows, dtype=np.intp)
+        return r[np.argsort(-s[r], kind="stable")].tolist()
+    candidates = range(len(scores)) if rows is None else rows
+    return sorted(candidates, key=scores.__getitem__, reverse=True)
+
+
+def pack_greedy(
+    order: Sequence[int],
+    tokens: Sequence[int],
+    budget: int,
+    blocked: Optional[Sequence[bool]] = None,
+) -> bytearray:
+    """
+    First-fit greedy packing in `order`. Returns admitted flags per row.
+
+    Rows with zero tokens or blocked[row] set are never admitted. The NumPy
+    path admits whole runs at once: a cumulative sum finds the prefix that
+    fits, the first overflowing row is rejected, and a masked pass drops
+    every row larger than the remaining budget before the next round.
+    """
+    n = len(tokens)
+    admitted = bytearray(n)
+    if not len(order):
+        return admitted
+
+    if HAVE_NUMPY:
+        o = np.asarray(order, dtype=np.intp)
+        t = np.asarray(tokens, dtype=np.int64)[o]
+        alive = t > 0
+        if blocked is not None:
+            alive &= ~np.asarray(blocked, dtype=bool)[o]
+        idx = np.flatnonzero(alive)
+        used = 0
+        flags = np.zeros(n, dtype=np.uint8)
+        while idx.size:
+            remaining = budget - used
+            idx = idx[t[idx] <= remaining]
+            if not idx.size:
+                break
+            csum = np.cumsum(t[idx])
+            k = int(np.searchsorted(csum, remaining, side="right"))
+            flags[o[idx[:k]]] = 1
+            used += int(csum[k - 1])
+            idx = idx[k + 1 :]
+        return bytearray(flags.tobytes())
+
+    used = 0
+    for row in order:
+        tk = tokens[row]
+        if tk == 0 or (blocked is not None and blocked[row]):
+            continue
+        if used + tk <= budget:
+            admitted[row] = 1
+            used += tk
+    return admitted
+
+
+def cap_rows(order: Sequence[int], flagged: Sequence[bool], limit: int) -> bytearray:
+    """
+    Marks flagged rows that come after the first `limit` flagged rows in
+    `order` (e.g. documents beyond max_docs). Returns capped flags per row.
+    """
+    n = len(flagged)
+    if HAVE_NUMPY:
+        capped = np.zeros(n, dtype=np.uint8)
+        if len(order):
+            o = np.asarray(order, dtype=np.intp)
+            f = np.asarray(flagged, dtype=bool)[o]
+            capped[o[f & (np.cumsum(f) > limit)]] = 1
+        return bytearray(capped.tobytes())
+
+    capped = bytearray(n)
+    seen = 0
+    for row in order:
+        if flagged[row]:
+            seen += 1
+            if seen > limit:
+                capped[row] = 1
+    return capped
+
+
+def select_greedy(
+    scores: Sequence[int],
+    tokens: Sequence[int],
+    budget: int,
+    rows: Optional[Sequence[int]] = None,
+    capped: Optional[Sequence[bool]] = None,
+    cap: Optional[int] = None,
+) -> Tuple[List[int], List[Tuple[int, str]], List[Tuple[int, str]]]:
+    """
+    pack_greedy(rank_desc(scores, rows), ...) without ranking every row.
+
+    Rows are popped from a heap in rank order (ties in input order) and
+    packed first-fit; at most `cap` rows flagged in `capped` are considered,
+    counted in rank order as cap_rows() does. Popping stops as soon as the
+    remaining budget is below the smallest row that could still fit, so the
+    work after an O(n) heapify grows with the number of rows decided rather
+    than with bundle size.
+
+    Returns (admitted rows in rank order, [(row, reason)] for rejected rows
+    in rank order, [(row, reason)] for rows never popped, in input order).
+    Reasons: "empty" (zero tokens), "cap", "budget".
+    """
+    candidates = range(len(tokens)) if rows is None else rows
+    limit = len(tokens) if cap is None or capped is None else cap
+    heap = [(-scores[r], r) for r in candidates]
+    heapq.heapify(heap)
+    # Smallest non-empty token counts still unpopped (lazily cleaned), per cap group.
+    free_min = [(tokens[r], r) for r in candidates if tokens[r] and not (capped is not None and capped[r])]
+    capped_min = [(tokens[r], r) for r in candidates if tokens[r] and capped is not None and capped[r]]
+    heapq.heapify(free_min)
+    heapq.heapify(capped_min)
+    popped = bytearray(len(tokens))
+
+    admitted: List[int] = []
+    rejected: List[Tuple[int, str]] = []
+    used = seen = 0
+    while heap:
+        room = budget - used
+        while free_min and popped[free_min[0][1]]:
+            heapq.heappop(free_min)
+        while capped_min and popped[capped_min[0][1]]:
+            heapq.heappop(capped_min)
+        smallest = free_min[0][0] if free_min else None
+        if capped_min and seen < limit and (smallest is None or capped_min[0][0] < smallest):
+            smallest = capped_min[0][0]
+        if smallest is None or room < smallest:
+            break
+        _, r = heapq.heappop(heap)
+        popped[r] = 1
+        t = tokens[r]
+        if t == 0:
+            rejected.append((r, "empty"))
+            continue
+        if capped is not None and capped[r]:
+            seen += 1
+            if seen > limit:
+                rejected.append((r, "cap"))
+                continue
+        if t <= room:
+            admitted.append(r)
+            used += t
+        else:
+            rejected.append((r, "budget"))
+
+    # Nothing left can fit. Capped rows keep their rank-order cap accounting:
+    # the best-ranked ones still within the cap are budget rejections.
+    rest = [r for r in candidates if not popped[r]]
+    slots = max(0, limit - seen)
+    within_cap = set()
+    if capped is not None and slots:
+        flagged = [r for r in rest if capped[r] and tokens[r]]
+        within_cap = set(heapq.nsmallest(slots, flagged, key=lambda r: (-scores[r], r)))
+    remaining: List[Tuple[int, str]] = []
+    for r in rest:
+        if tokens[r] == 0:
+            remaining.append((r, "empty"))
+        elif capped is not None and capped[r] and r not in within_cap:
+            remaining.append((r, "cap"))
+        else:
+            remaining.append((r, "budget"))
+    return admitted, rejected, remaining
+
+
+def pinned_rows(authority: Sequence[int]) -> List[bool]:
+    """
+    Flags for system/developer authority. Pinning goes by authority only: a
+    system-kind artifact of low authority must not outrank user content.
+    """
+    return [a in PINNED_AUTHORITIES for a in authority]
+
+
+def pack_knapsack(
+    order: Sequence[int],
+    tokens: Sequence[int],
+    values: Sequence[int],
+    budget: int,
+    blocked: Optional[Sequence[bool]] = None,
+    pinned: Optional[Sequence[bool]] = None,
+    capped: Optional[Sequence[bool]] = None,
+    cap: Optional[int] = None,
+    time_limit: float = 0.05,
+) -> bytearray:
+    """
+    0/1 knapsack admission: maximizes the total value of admitted rows.
+
+    First-fit greedy packing over `order` (with the doc cap, as the greedy
+    gate applies it) is computed first. Pinned rows (system/developer
+    instructions) keep greedy's decision, so authority precedence is
+    unchanged; the solver only chooses among the remaining rows for the
+    budget that is left. At most `cap` rows flagged in `capped` are
+    admitted (the document cap). Rows with zero tokens, blocked rows and
+    rows of non-positive value are never chosen.
+
+    Branch and bound over rows sorted by value per token, with the
+    fractional (LP) bound for pruning. Greedy's own admission of the
+    unpinned rows is the starting incumbent (it always fits what the
+    pinned rows leave), so the total value is never below greedy's; when
+    `time_limit` seconds run out the best packing found so far is returned.
+    """
+    n = len(tokens)
+    greedy_blocked = blocked
+    if capped is not None and cap is not None:
+        over = cap_rows(order, capped, cap)
+        greedy_blocked = [bool(over[r]) or (blocked is not None and bool(blocked[r])) for r in range(n)]
+    greedy = pack_greedy(order, tokens, budget, greedy_blocked)
+    admitted = bytearray(n)
+    if pinned is not None:
+        for r in order:
+            if pinned[r] and greedy[r]:
+                admitted[r] = 1
+    capacity = budget - sum(tokens[r] for r in order if admitted[r])
+    used_cap = sum(1 for r in order if admitted[r] and capped is not None and capped[r])
+    limit = n if cap is None or capped is None else max(0, cap - used_cap)
+
+    free = [
+        r for r in order
+        if not (pinned is not None and pinned[r])
+        and not (blocked is not None and blocked[r])
+        and 0 < tokens[r] <= capacity
+        and values[r] > 0
+    ]
+    if not free:
+        return admitted
+
+    # Incumbent: greedy's admission of the free rows.
+    best = [r for r in free if greedy[r]]
+    best_value = sum(values[r] for r in best)
+
+    c_of = (lambda r: bool(capped[r])) if capped is not None else (lambda r: False)
+    # Density order; identical (tokens, value, capped) rows end up adjacent.
+    items = sorted(free, key=lambda r: (-values[r] / tokens[r], tokens[r], values[r], c_of(r)))
+    w = [tokens[r] for r in items]
+    v = [values[r] for r in items]
+    c = [c_of(r) for r in items]
+    m = len(items)
+    # Interchangeable rows: only prefixes of a run are explored, so skipping
+    # one row skips the rest of its run (symmetry breaking).
+    run_end = [m] * m
+    for j in range(m - 2, -1, -1):
+        same = (w[j], v[j], c[j]) == (w[j + 1], v[j + 1], c[j + 1])
+        run_end[j] = run_end[j + 1] if same else j + 1
+    cum_w = [0] * (m + 1)
+    cum_v = [0] * (m + 1)
+    for i in range(m):
+        cum_w[i + 1] = cum_w[i] + w[i]
+        cum_v[i + 1] = cum_v[i] + v[i]
+
+    def bound(i: int, room: int) -> int:
+        """
+        LP relaxation over items i.., rounded down since values are integers
+        (ignores the cap, so it stays an upper bound).
+        """
+        k = bisect_right(cum_w, cum_w[i] + room, i) - 1
+        b = cum_v[k] - cum_v[i]
+        if k < m:
+            b += (room - (cum_w[k] - cum_w[i])) * v[k] // w[k]
+        return b
+
+    deadline = time.perf_counter() + time_limit
+    taken: List[int] = []
+    value, room, slots, i, steps = 0, capacity, limit, 0, 0
+    timed_out = False
+    while True:
+        # Forward: take every item that fits while the bound can beat the incumbent.
+        while i < m:
+            steps += 1
+            if not steps & 1023 and time.perf_counter() > deadline:
+                timed_out = True
+                break
+            if value + bound(i, room) <= best_value:
+                break
+            if w[i] <= room and (not c[i] or slots > 0):
+                taken.append(i)
+                value += v[i]
+                room -= w[i]
+                slots -= c[i]
+            i += 1
+        if value > best_value:
+            # Reached the end, or timed out with a better partial packing.
+            best_value = value
+            best = [items[j] for j in taken]
+        # Backtrack: drop the last taken item and explore without it.
+        if timed_out or not taken:
+            break
+        j = taken.pop()
+        value -= v[j]
+        room += w[j]
+        slots += c[j]
+        i = run_end[j]
+
+    for r in best:
+        admitted[r] = 1
+    return admitted
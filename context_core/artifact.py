@@ -0,0 +1,235 @@
+"""
+Shared artifact model.
+
+Artifact keeps kind/authority as small-int codes (exposed again as strings
+through properties) and uses __slots__, so large batches avoid per-object
+dicts and scoring indexes lookup tables instead of hashing strings.
+ArtifactBatch is the columnar form: parallel arrays, one row per artifact.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+KINDS = ("system", "task", "message", "document", "tool_output", "other")
+AUTHORITIES = ("system", "developer", "user", "tool", "other")
+
+KIND_CODE: Dict[str, int] = {k: i for i, k in enumerate(KINDS)}
+AUTHORITY_CODE: Dict[str, int] = {a: i for i, a in enumerate(AUTHORITIES)}
+
+KIND_OTHER = KIND_CODE["other"]
+AUTHORITY_OTHER = AUTHORITY_CODE["other"]
+
+
+def kind_code(kind: str) -> int:
+    """Unknown kinds collapse to "other"."""
+    return KIND_CODE.get(kind, KIND_OTHER)
+
+
+def authority_code(authority: str) -> int:
+    """Unknown authorities collapse to "other"."""
+    return AUTHORITY_CODE.get(authority, AUTHORITY_OTHER)
+
+
+def safe_int(x: Any, default: int = 0) -> int:
+    try:
+        return int(x)
+    except Exception:
+        return default
+
+
+class Artifact:
+    """
+    kind: system | task | message | document | tool_output | other
+    authority: system | developer | user | tool | other
+    priority: higher means earlier admission
+    """
+
+    __slots__ = (
+        "artifact_id",
+        "kind_code",
+        "authority_code",
+        "priority",
+        "title",
+        "content",
+        "scope",
+        "timestamp",
+    )
+
+    def __init__(
+        self,
+        artifact_id: str,
+        kind: str,
+        authority: str,
+        priority: int,
+        title: str,
+        content: str,
+        scope: Optional[str] = None,
+        timestamp: Optional[str] = None,
+    ) -> None:
+        self.artifact_id = artifact_id
+        self.kind_code = kind_code(kind)
+        self.authority_code = authority_code(authority)
+        self.priority = priority
+        self.title = title
+        self.content = content
+        self.scope = scope
+        self.timestamp = timestamp
+
+    @property
+    def kind(self) -> str:
+        return KINDS[self.kind_code]
+
+    @kind.setter
+    def kind(self, value: str) -> None:
+        self.kind_code = kind_code(value)
+
+    @property
+    def authority(self) -> str:
+        return AUTHORITIES[self.authority_code]
+
+    @authority.setter
+    def authority(self, value: str) -> None:
+        self.authority_code = authority_code(value)
+
+    def replace(self, **changes: Any) -> "Artifact":
+        """Copy with some fields changed, like dataclasses.replace()."""
+        fields = {
+            "artifact_id": self.artifact_id,
+            "kind": self.kind,
+            "authority": self.authority,
+            "priority": self.priority,
+            "title": self.title,
+            "content": self.content,
+            "scope": self.scope,
+            "timestamp": self.timestamp,
+        }
+        fields.update(changes)
+        return Artifact(**fields)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Artifact):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    def __repr__(self) -> str:
+        return (
+            f"Artifact(artifact_id={self.artifact_id!r}, kind={self.kind!r}, "
+            f"authority={self.authority!r}, priority={self.priority!r}, title={self.title!r}, "
+            f"content={self.content!r}, scope={self.scope!r}, timestamp={self.timestamp!r})"
+        )
+
+
+def normalize_artifact(a: Any, i: int) -> Artifact:
+    """
+    Strict normalization used by the operator scripts: records must be
+    objects, strings are stripped, title defaults to the id.
+    """
+    if not isinstance(a, dict):
+        raise ValueError(f"artifact at index {i} must be an object")
+
+    artifact_id = str(a.get("id") or a.get("artifact_id") or f"artifact_{i}")
+    scope = a.get("scope")
+    timestamp = a.get("timestamp")
+    return Artifact(
+        artifact_id=artifact_id,
+        kind=str(a.get("kind") or "other").strip(),
+        authority=str(a.get("authority") or "other").strip(),
+        priority=safe_int(a.get("priority"), default=0),
+        title=str(a.get("title") or artifact_id).strip(),
+        content=str(a.get("content") or "").strip(),
+        scope=str(scope) if scope is not None else None,
+        timestamp=str(timestamp) if timestamp is not None else None,
+    )
+
+
+# ----------------------------
+# Weight tables
+# ----------------------------
+
+class Weights:
+    """
+    Authority/kind weight dicts compiled to lists indexed by code.
+    score() = authority weight + kind weight + priority.
+    """
+
+    __slots__ = ("authority", "kind")
+
+    def __init__(self, authority_weight: Dict[str, int], kind_weight: Dict[str, int]) -> None:
+        self.authority: List[int] = [authority_weight.get(a, 0) for a in AUTHORITIES]
+        self.kind: List[int] = [kind_weight.get(k, 0) for k in KINDS]
+
+    def score(self, a: Artifact) -> int:
+        return self.authority[a.authority_code] + self.kind[a.kind_code] + a.priority
+
+
+# ----------------------------
+# Columnar batches
+# ----------------------------
+
+class ArtifactBatch:
+    """
+    Parallel arrays, one row per artifact. Codes and priorities live in
+    typed arrays so batch scoring never touches per-artifact objects.
+    """
+
+    __slots__ = ("ids", "kind", "authority", "priority", "titles", "contents", "scopes", "timestamps")
+
+    def __init__(self) -> None:
+        self.ids: List[str] = []
+        self.kind = array("B")
+        self.authority = array("B")
+        self.priority = array("q")
+        self.titles: List[str] = []
+        self.contents: List[str] = []
+        self.scopes: List[Optional[str]] = []
+        self.timestamps: List[Optional[str]] = []
+
+    @classmethod
+    def from_artifacts(cls, artifacts: Iterable[Artifact]) -> "ArtifactBatch":
+        batch = cls()
+        for a in artifacts:
+            batch.append(a)
+        return batch
+
+    def append(self, a: Artifact) -> None:
+        self.ids.append(a.artifact_id)
+        self.kind.append(a.kind_code)
+        self.authority.append(a.authority_code)
+        self.priority.append(a.priority)
+        self.titles.append(a.title)
+        self.contents.append(a.content)
+        self.scopes.append(a.scope)
+        self.timestamps.append(a.timestamp)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def artifact(self, i: int) -> Artifact:
+        a = Artifact(
+            artifact_id=self.ids[i],
+            kind="other",
+            authority="other",
+            priority=self.priority[i],
+            title=self.titles[i],
+            content=self.contents[i],
+            scope=self.scopes[i],
+            timestamp=self.timestamps[i],
+        )
+        a.kind_code = self.kind[i]
+        a.authority_code = self.authority[i]
+        return a
+
+    def __iter__(self) -> Iterator[Artifact]:
+        return (self.artifact(i) for i in range(len(self)))
+
+    def take(self, rows: Sequence[int]) -> List[Artifact]:
+        return [self.artifact(i) for i in rows]
+
+    def scores(self, weights: Weights) -> array:
+        aw, kw = weights.authority, weights.kind
+        return array(
+            "q",
+            [aw[a] + kw[k] + p for a, k, p in zip(self.authority, self.kind, self.priority)],
+        )
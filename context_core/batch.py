@@ -0,0 +1,179 @@
+"""
+Batch processing of many bundles.
+
+Sources are enumerated lazily as small tasks (a file path, or one line of a
+JSONL-of-bundles file) so the parent never parses bundles itself; workers
+load, process and return one result record per bundle. Work is submitted
+to a process pool in chunks with a bounded number of chunks in flight, so
+millions of bundles stream through in constant memory and results come
+back in input order.
+
+Input specs:
+- a directory: every *.json / *.jsonl / *.ctxb file below it
+- a glob pattern: every matching file
+- a file
+
+A .jsonl file is always one bundle object per line, however it was found
+(a line that is not a bundle is reported as an error, never dropped); any
+other file is one bundle.
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .bundle_stream import is_columnar, iter_artifact_records
+from .columnar import ColumnarBundle
+
+BUNDLE_SUFFIXES = (".json", ".jsonl", ".ctxb")
+DEFAULT_CHUNK_SIZE = 64
+
+# (source id, "file" | "line", path or the line's JSON text)
+BundleTask = Tuple[str, str, str]
+ChunkFn = Callable[[List[BundleTask]], List[Dict[str, Any]]]
+
+
+def _walk_bundle_files(root: str) -> Iterator[str]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.endswith(BUNDLE_SUFFIXES):
+                yield os.path.join(dirpath, name)
+
+
+def _file_tasks(path: str) -> Iterator[BundleTask]:
+    """One task per file, or one per non-blank line of a .jsonl file."""
+    if not path.endswith(".jsonl"):
+        yield path, "file", path
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, start=1):
+            if line.strip():
+                yield f"{path}:{lineno}", "line", line
+
+
+def iter_bundle_tasks(specs: Iterable[str]) -> Iterator[BundleTask]:
+    """Expands input specs (see module docstring) into bundle tasks, lazily."""
+    for spec in specs:
+        if os.path.isdir(spec):
+            for path in _walk_bundle_files(spec):
+                yield from _file_tasks(path)
+        elif glob.has_magic(spec):
+            for path in sorted(glob.iglob(spec, recursive=True)):
+                if os.path.isfile(path):
+                    yield from _file_tasks(path)
+        elif os.path.isfile(spec):
+            yield from _file_tasks(spec)
+        else:
+            raise FileNotFoundError(f"no such bundle, directory or pattern: {spec}")
+
+
+def load_task_records(task: BundleTask) -> Tuple[str, Iterable[Any]]:
+    """
+    Raw artifact records for one task. For JSONL lines, a bundle "id" (if
+    present) replaces the file:line source id; a line object without
+    "artifacts" (e.g. an artifact record) is rejected.
+    """
+    source, kind, payload = task
+    if kind == "file":
+        return source, iter_artifact_records(payload)
+    bundle = json.loads(payload)
+    if isinstance(bundle, list):
+        return source, bundle
+    if not isinstance(bundle, dict) or "artifacts" not in bundle:
+        raise ValueError("each .jsonl line must be a bundle: an object with 'artifacts' or a list of artifacts")
+    artifacts = bundle["artifacts"]
+    if not isinstance(artifacts, list):
+        raise ValueError("bundle.artifacts must be a list")
+    return str(bundle.get("id") or source), artifacts
+
+
+def process_tasks(
+    tasks: List[BundleTask],
+    fn: Callable[[Iterable[Any]], Dict[str, Any]],
+    columnar_fn: Optional[Callable[[ColumnarBundle], Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Applies fn(records) -> result fields to each task, or columnar_fn(bundle)
+    to columnar (.ctxb) files when given, so they are not decoded in full.
+    A bundle that fails to load or process yields {"source", "error"}
+    instead of aborting the chunk.
+    """
+    out: List[Dict[str, Any]] = []
+    for task in tasks:
+        source = task[0]
+        try:
+            if columnar_fn is not None and task[1] == "file" and is_columnar(task[2]):
+                with ColumnarBundle(task[2]) as bundle:
+                    out.append({"source": source, **columnar_fn(bundle)})
+                continue
+            source, records = load_task_records(task)
+            out.append({"source": source, **fn(records)})
+        except Exception as e:
+            out.append({"source": source, "error": f"{type(e).__name__}: {e}"})
+    return out
+
+
+def _chunks(tasks: Iterable[BundleTask], size: int) -> Iterator[List[BundleTask]]:
+    chunk: List[BundleTask] = []
+    for task in tasks:
+        chunk.append(task)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_batch(
+    tasks: Iterable[BundleTask],
+    chunk_fn: ChunkFn,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_pending: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields chunk_fn's records for every task, in input order.
+
+    chunk_fn must be a module-level function (it is pickled to workers).
+    workers=1 runs in-process; otherwise at most `max_pending` chunks
+    (default 4 per worker) are queued at a time.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(tasks, max(1, chunk_size))
+    if workers <= 1:
+        for chunk in chunks:
+            yield from chunk_fn(chunk)
+        return
+
+    max_pending = max_pending or workers * 4
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in chunks:
+            pending.append(pool.submit(chunk_fn, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_jsonl(records: Iterable[Dict[str, Any]], path: Optional[str] = None) -> Tuple[int, int]:
+    """Writes one JSON object per line to `path` (stdout if None or "-"). Returns (records, errors)."""
+    n = errors = 0
+    f = sys.stdout if path in (None, "-") else open(path, "w", encoding="utf-8")
+    try:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+            n += 1
+            errors += "error" in record
+    finally:
+        if f is not sys.stdout:
+            f.close()
+    return n, errors
@@ -0,0 +1,194 @@
+"""
+Incremental reader for context bundles.
+
+Accepted inputs (detected from content, not file extension):
+- a bundle object: {"artifacts": [ {...}, {...} ], ...} (a lone object
+  without "artifacts" is a bundle with no artifacts)
+- a bare JSON array of artifact objects
+- JSON Lines (or concatenated JSON): one artifact object per value, two or
+  more values
+- a columnar .ctxb file (context_core.columnar), when given as a path
+
+As with json.load, anything after a bundle object or array is an error.
+
+Only one artifact is decoded and held at a time, so multi-GB bundles can be
+scanned in constant memory. Records are yielded raw; callers normalize them
+with their own rules.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, TextIO, Tuple, Union
+
+Source = Union[str, Path, TextIO, None]
+
+CHUNK_CHARS = 1 << 20
+COLUMNAR_MAGIC = b"CTXB"
+_WS = " \t\r\n"
+
+
+class _Reader:
+    """Character buffer over a text stream with incremental JSON decoding."""
+
+    def __init__(self, f: TextIO, chunk_chars: int = CHUNK_CHARS) -> None:
+        self.f = f
+        self.chunk_chars = chunk_chars
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_chars)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos:
+            self.buf = self.buf[self.pos :]
+            self.pos = 0
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or '' at end of input."""
+        while True:
+            n = len(self.buf)
+            while self.pos < n and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < n:
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"expected {ch!r} but found {got or 'end of input'!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decodes the next JSON value, reading more input until it is complete."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A value touching the buffer edge (e.g. a number) may continue.
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def _iter_array(r: _Reader) -> Iterator[Any]:
+    r.expect("[")
+    if r.peek() == "]":
+        r.pos += 1
+        return
+    while True:
+        yield r.value()
+        ch = r.peek()
+        r.pos += 1
+        if ch == "]":
+            return
+        if ch != ",":
+            raise ValueError(f"expected ',' or ']' in array but found {ch or 'end of input'!r}")
+
+
+def _end(r: _Reader, what: str) -> None:
+    """Raises ValueError if anything but whitespace follows `what` (as json.load would)."""
+    if r.peek():
+        raise ValueError(f"extra data after the {what}")
+
+
+def _iter_records(r: _Reader) -> Iterator[Any]:
+    first = r.peek()
+    if first == "":
+        return
+    if first == "[":
+        yield from _iter_array(r)
+        _end(r, "artifact array")
+        return
+    if first != "{":
+        raise ValueError("bundle must be a JSON object, array or JSON Lines of objects")
+
+    # Walk the first object key by key so a large "artifacts" array is never
+    # materialized. If it has no "artifacts" key and more top-level values
+    # follow, it was itself an artifact (JSON Lines) and so is every value
+    # after it; alone, it is a bundle without artifacts.
+    r.expect("{")
+    seen: Dict[str, Any] = {}
+    found = False
+    if r.peek() == "}":
+        r.pos += 1
+    else:
+        while True:
+            key = r.value()
+            r.expect(":")
+            if key == "artifacts" and not found:
+                found = True
+                if r.peek() != "[":
+                    raise ValueError("bundle.artifacts must be a list")
+                yield from _iter_array(r)
+            else:
+                seen[key] = r.value()
+            ch = r.peek()
+            r.pos += 1
+            if ch == "}":
+                break
+            if ch != ",":
+                raise ValueError(f"expected ',' or '}}' in object but found {ch or 'end of input'!r}")
+
+    if found:
+        _end(r, "bundle object")
+        return
+    if not r.peek():
+        return
+    if seen:
+        yield seen
+    while r.peek():
+        yield r.value()
+
+
+def _open(source: Source) -> Tuple[TextIO, bool]:
+    if source is None or source == "-":
+        return sys.stdin, False
+    if isinstance(source, (str, Path)):
+        return open(source, "r", encoding="utf-8"), True
+    return source, False
+
+
+def is_columnar(path: Union[str, Path]) -> bool:
+    """True if `path` is a file starting with the columnar (.ctxb) magic."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(COLUMNAR_MAGIC)) == COLUMNAR_MAGIC
+    except OSError:
+        return False
+
+
+def iter_artifact_records(source: Source, chunk_chars: int = CHUNK_CHARS) -> Iterator[Any]:
+    """
+    Yields raw artifact records one at a time from a path, '-' (stdin) or text stream.
+    Raises ValueError for malformed input, like the json.load based loaders.
+    """
+    if isinstance(source, (str, Path)) and source != "-" and is_columnar(source):
+        from .columnar import ColumnarBundle  # columnar imports this module
+
+        with ColumnarBundle(source) as bundle:
+            yield from bundle.records()
+        return
+    f, owned = _open(source)
+    try:
+        yield from _iter_records(_Reader(f, chunk_chars))
+    finally:
+        if owned:
+            f.close()
@@ -0,0 +1,385 @@
+"""
+Columnar binary bundle format (.ctxb), opened through mmap.
+
+Layout (little-endian):
+
+    header    magic "CTXB", u16 version, u16 reserved, u64 artifact count,
+              then (u64 offset, u64 size) for each section in SECTIONS
+    meta      JSON: code tables for kind/authority, bundle-level fields
+    kind, authority          u8 code per artifact
+    priority                 i64 per artifact
+    has_scope, has_timestamp u8 flag per artifact (null vs string)
+    <name>_offsets           u64 byte offsets (count + 1) into <name>_blob,
+    <name>_blob              one UTF-8 blob, for id, title, scope, timestamp, content
+    content_lengths          u64 content length in characters
+
+Sections start 8-byte aligned. Opening a file reads the header and the
+small metadata columns; strings are decoded from the mapping only when a
+row is accessed, so a gate that counts tokens from content_lengths touches
+just the content it actually reads (the question, documents it checks for
+relevance, what it admits).
+
+Records round-trip through normalize_artifact(): converting JSON to .ctxb
+and back yields the normalized form of every artifact.
+
+    python -m context_core.columnar pack bundle.json bundle.ctxb
+    python -m context_core.columnar unpack bundle.ctxb bundle.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .artifact import AUTHORITIES, KINDS, Artifact, ArtifactBatch, normalize_artifact
+from .bundle_stream import COLUMNAR_MAGIC as MAGIC
+from .bundle_stream import iter_artifact_records
+
+VERSION = 1
+SUFFIX = ".ctxb"
+
+STRING_COLUMNS = ("id", "title", "scope", "timestamp", "content")
+SECTIONS: Tuple[str, ...] = (
+    "meta", "kind", "authority", "priority", "has_scope", "has_timestamp", "content_lengths",
+) + tuple(f"{c}_{part}" for c in STRING_COLUMNS for part in ("offsets", "blob"))
+
+_HEAD = struct.Struct("<4sHHQ")
+_SECTION = struct.Struct("<QQ")
+HEADER_SIZE = _HEAD.size + _SECTION.size * len(SECTIONS)
+_BIG_ENDIAN = sys.byteorder == "big"
+
+PathLike = Union[str, Path]
+
+
+# ----------------------------
+# Writing
+# ----------------------------
+
+def _le(a: array) -> bytes:
+    if _BIG_ENDIAN:
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+
+def write_columnar(artifacts: Iterable[Artifact], path: PathLike, bundle_meta: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Writes artifacts as a .ctxb file and returns how many were written.
+    Content is spooled to a temporary file, so memory holds the metadata
+    columns but not the content.
+    """
+    kind, authority, priority = array("B"), array("B"), array("q")
+    present = {"scope": array("B"), "timestamp": array("B")}
+    lengths = array("Q")
+    offsets = {c: array("Q", [0]) for c in STRING_COLUMNS}
+    blobs: Dict[str, List[bytes]] = {c: [] for c in STRING_COLUMNS if c != "content"}
+
+    with tempfile.TemporaryFile() as content_blob:
+        for a in artifacts:
+            kind.append(a.kind_code)
+            authority.append(a.authority_code)
+            priority.append(a.priority)
+            values = {"id": a.artifact_id, "title": a.title, "scope": a.scope, "timestamp": a.timestamp}
+            for column in ("scope", "timestamp"):
+                present[column].append(values[column] is not None)
+            for column, value in values.items():
+                data = (value or "").encode("utf-8")
+                blobs[column].append(data)
+                offsets[column].append(offsets[column][-1] + len(data))
+            data = a.content.encode("utf-8")
+            content_blob.write(data)
+            offsets["content"].append(offsets["content"][-1] + len(data))
+            lengths.append(len(a.content))
+
+        meta = {"kinds": list(KINDS), "authorities": list(AUTHORITIES), "bundle": bundle_meta or {}}
+        sections: Dict[str, Any] = {
+            "meta": json.dumps(meta, ensure_ascii=False).encode("utf-8"),
+            "kind": kind.tobytes(),
+            "authority": authority.tobytes(),
+            "priority": _le(priority),
+            "has_scope": present["scope"].tobytes(),
+            "has_timestamp": present["timestamp"].tobytes(),
+            "content_lengths": _le(lengths),
+        }
+        for column in STRING_COLUMNS:
+            sections[f"{column}_offsets"] = _le(offsets[column])
+            sections[f"{column}_blob"] = b"".join(blobs[column]) if column != "content" else content_blob
+
+        table: List[Tuple[int, int]] = []
+        pos = HEADER_SIZE
+        for name in SECTIONS:
+            pos += -pos % 8
+            size = offsets["content"][-1] if name == "content_blob" else len(sections[name])
+            table.append((pos, size))
+            pos += size
+
+        with open(path, "wb") as out:
+            out.write(_HEAD.pack(MAGIC, VERSION, 0, len(kind)))
+            for entry in table:
+                out.write(_SECTION.pack(*entry))
+            for name, (offset, _) in zip(SECTIONS, table):
+                out.write(b"\0" * (offset - out.tell()))
+                if name == "content_blob":
+                    content_blob.seek(0)
+                    shutil.copyfileobj(content_blob, out)
+                else:
+                    out.write(sections[name])
+    return len(kind)
+
+
+def pack_bundle(source: Any, path: PathLike) -> int:
+    """Converts a JSON / JSON Lines bundle (path, '-' or stream) to .ctxb; returns the artifact count."""
+    return write_columnar((normalize_artifact(a, i) for i, a in enumerate(iter_artifact_records(source))), path)
+
+
+# ----------------------------
+# Reading
+# ----------------------------
+
+class StringColumn(Sequence[Optional[str]]):
+    """Read-only view of one string column; each access decodes one slice of the mapping."""
+
+    def __init__(self, buf: memoryview, offsets: Sequence[int], base: int, present: Optional[Sequence[int]] = None) -> None:
+        self._buf = buf
+        self._offsets = offsets
+        self._base = base
+        self._present = present
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: Any) -> Any:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if self._present is not None and not self._present[i]:
+            return None
+        start, end = self._base + self._offsets[i], self._base + self._offsets[i + 1]
+        return str(self._buf[start:end], "utf-8")
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        return (self[i] for i in range(len(self)))
+
+
+class ContentColumn(StringColumn):
+    """Contents, plus their lengths in characters (readable without decoding)."""
+
+    def __init__(self, buf: memoryview, offsets: Sequence[int], base: int, char_lengths: Sequence[int]) -> None:
+        super().__init__(buf, offsets, base)
+        self.char_lengths = char_lengths
+
+
+class ColumnarBundle:
+    """
+    A memory-mapped .ctxb bundle. Numeric columns are loaded on open;
+    strings are decoded per access. Use as a context manager (or close()).
+    """
+
+    def __init__(self, path: PathLike) -> None:
+        self.path = str(path)
+        self._file: BinaryIO = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path}: empty file is not a columnar bundle") from None
+        try:
+            self._load()
+        except Exception:
+            self.close()
+            raise
+
+    def _load(self) -> None:
+        buf = self._buf = memoryview(self._map)
+        if len(buf) < HEADER_SIZE:
+            raise ValueError(f"{self.path}: truncated header")
+        magic, version, _, n = _HEAD.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path}: not a columnar bundle")
+        if version != VERSION:
+            raise ValueError(f"{self.path}: unsupported columnar bundle version {version}")
+        self._sections: Dict[str, Tuple[int, int]] = {}
+        for i, name in enumerate(SECTIONS):
+            offset, size = _SECTION.unpack_from(buf, _HEAD.size + i * _SECTION.size)
+            if offset + size > len(buf):
+                raise ValueError(f"{self.path}: section {name} runs past the end of the file")
+            self._sections[name] = (offset, size)
+        self._n = n
+
+        self.meta: Dict[str, Any] = json.loads(str(self._section("meta"), "utf-8"))
+        self.kind = self._codes("kind", self.meta.get("kinds", KINDS), KINDS)
+        self.authority = self._codes("authority", self.meta.get("authorities", AUTHORITIES), AUTHORITIES)
+        self.priority = self._numbers("priority", "q", n)
+        self.content_lengths = self._numbers("content_lengths", "Q", n)
+        has_scope, has_timestamp = self._numbers("has_scope", "B", n), self._numbers("has_timestamp", "B", n)
+
+        def column(name: str, present: Optional[array] = None) -> StringColumn:
+            offsets = self._numbers(f"{name}_offsets", "Q", n + 1)
+            base, size = self._sections[f"{name}_blob"]
+            if offsets[-1] > size:
+                raise ValueError(f"{self.path}: {name} offsets run past their blob")
+            if name == "content":
+                return ContentColumn(buf, offsets, base, self.content_lengths)
+            return StringColumn(buf, offsets, base, present)
+
+        self.id_column = column("id")
+        self.titles = column("title")
+        self.scopes = column("scope", has_scope)
+        self.timestamps = column("timestamp", has_timestamp)
+        self.contents = column("content")
+        self._ids: Optional[List[str]] = None
+
+    def _section(self, name: str) -> memoryview:
+        offset, size = self._sections[name]
+        return self._buf[offset : offset + size]
+
+    def _numbers(self, name: str, typecode: str, n: int) -> array:
+        values = array(typecode)
+        values.frombytes(self._section(name))
+        if _BIG_ENDIAN and values.itemsize > 1:
+            values.byteswap()
+        if len(values) != n:
+            raise ValueError(f"{self.path}: section {name} has {len(values)} entries, expected {n}")
+        return values
+
+    def _codes(self, name: str, stored: Sequence[str], current: Sequence[str]) -> array:
+        codes = self._numbers(name, "B", self._n)
+        if list(stored) != list(current):
+            other = current.index("other")
+            remap = [current.index(v) if v in current else other for v in stored]
+            codes = array("B", (remap[c] for c in codes))
+        return codes
+
+    # ---- access ----
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def ids(self) -> List[str]:
+        """All artifact ids (decoded once; they are short)."""
+        if self._ids is None:
+            self._ids = list(self.id_column)  # type: ignore[arg-type]
+        return self._ids
+
+    def artifact(self, i: int) -> Artifact:
+        a = Artifact(
+            artifact_id=self.id_column[i],
+            kind="other",
+            authority="other",
+            priority=self.priority[i],
+            title=self.titles[i],
+            content=self.contents[i],
+            scope=self.scopes[i],
+            timestamp=self.timestamps[i],
+        )
+        a.kind_code = self.kind[i]
+        a.authority_code = self.authority[i]
+        return a
+
+    def __iter__(self) -> Iterator[Artifact]:
+        return (self.artifact(i) for i in range(self._n))
+
+    def take(self, rows: Sequence[int]) -> List[Artifact]:
+        return [self.artifact(i) for i in rows]
+
+    def batch(self) -> ArtifactBatch:
+        """An ArtifactBatch over this file: codes/priorities copied, strings decoded on access."""
+        batch = ArtifactBatch()
+        batch.ids = self.ids
+        batch.kind, batch.authority, batch.priority = self.kind, self.authority, self.priority
+        batch.titles = self.titles  # type: ignore[assignment]
+        batch.contents = self.contents  # type: ignore[assignment]
+        batch.scopes = self.scopes  # type: ignore[assignment]
+        batch.timestamps = self.timestamps  # type: ignore[assignment]
+        return batch
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """Artifacts in the JSON bundle shape (normalize_artifact-compatible)."""
+        for a in self:
+            record: Dict[str, Any] = {
+                "id": a.artifact_id,
+                "kind": a.kind,
+                "authority": a.authority,
+                "priority": a.priority,
+                "title": a.title,
+                "content": a.content,
+            }
+            if a.scope is not None:
+                record["scope"] = a.scope
+            if a.timestamp is not None:
+                record["timestamp"] = a.timestamp
+            yield record
+
+    def to_bundle(self) -> Dict[str, Any]:
+        return {**self.meta.get("bundle", {}), "artifacts": list(self.records())}
+
+    def close(self) -> None:
+        buf = getattr(self, "_buf", None)
+        if buf is not None:
+            buf.release()
+            self._buf = None  # type: ignore[assignment]
+        if getattr(self, "_map", None) is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass  # a StringColumn still references the mapping; it closes with it
+        self._file.close()
+
+    def __enter__(self) -> "ColumnarBundle":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def unpack_bundle(path: PathLike, out: Optional[PathLike] = None) -> int:
+    """Writes a .ctxb file back as a JSON bundle (stdout if out is None or '-'); returns the count."""
+    with ColumnarBundle(path) as bundle:
+        data = bundle.to_bundle()
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    if out in (None, "-"):
+        sys.stdout.write(text + "\n")
+    else:
+        Path(out).write_text(text + "\n", encoding="utf-8")
+    return len(data["artifacts"])
+
+
+# ----------------------------
+# CLI
+# ----------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert context bundles between JSON and the columnar .ctxb format.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    pack = sub.add_parser("pack", help="JSON / JSON Lines bundle -> .ctxb")
+    pack.add_argument("input", help="Bundle path, or '-' for stdin.")
+    pack.add_argument("output", help=".ctxb path to write.")
+    unpack = sub.add_parser("unpack", help=".ctxb -> JSON bundle")
+    unpack.add_argument("input", help=".ctxb path.")
+    unpack.add_argument("output", nargs="?", default="-", help="JSON path (default: stdout).")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "pack":
+            n = pack_bundle(args.input, args.output)
+        else:
+            n = unpack_bundle(args.input, args.output)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    print(f"Artifacts: {n}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
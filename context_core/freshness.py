@@ -0,0 +1,417 @@
+"""
+Freshness gating: per-kind lifetimes enforced through an expiry index.
+
+Timestamps are parsed once, when an artifact is added, into epoch seconds;
+from then on the index holds only integers. Each scope keeps a min-heap of
+(expires_at, artifact): adding or replacing an artifact costs O(log n),
+and expire(now) pops exactly the artifacts that have gone stale, so a
+session that advances turn by turn never rescans what it already holds.
+
+Kinds without a TTL (system and task by default) never expire. An
+artifact whose kind has a TTL but whose timestamp is missing or
+unparsable cannot be checked: freshness_gate() keeps it or rejects it as
+"unknown" depending on `missing`.
+
+    python -m context_core.freshness -i bundle.json --ttl tool_output=15m   # replay + decisions
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import math
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+
+from ._cli import print_table
+from .artifact import Artifact, normalize_artifact
+from .bundle_stream import iter_artifact_records
+
+# Seconds; None = never expires.
+DEFAULT_TTLS: Dict[str, Optional[int]] = {
+    "system": None,
+    "task": None,
+    "message": 24 * 3600,
+    "document": 7 * 24 * 3600,
+    "tool_output": 3600,
+    "other": 24 * 3600,
+}
+
+MISSING_POLICIES = ("keep", "reject")
+
+
+def parse_timestamp(value: Any) -> Optional[int]:
+    """
+    Epoch seconds from an ISO-8601 string (naive = UTC, "Z" allowed), or
+    from epoch seconds given as a number or numeric string. None if the
+    value is missing or not a timestamp.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value) if math.isfinite(value) else None
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        number = float(text)
+    except ValueError:
+        pass
+    else:
+        return int(number) if math.isfinite(number) else None
+    if text.endswith(("Z", "z")):
+        text = text[:-1] + "+00:00"
+    try:
+        dt = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def parse_ttl(value: str) -> Optional[int]:
+    """'90', '90s', '15m', '2h', '7d' -> seconds; 'none' -> None (never expires)."""
+    text = value.strip().lower()
+    if text in ("none", "never", "inf"):
+        return None
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    scale = units.get(text[-1:], None)
+    number = text[:-1] if scale else text
+    try:
+        seconds = int(float(number) * (scale or 1))
+    except ValueError:
+        raise ValueError(f"bad TTL {value!r} (expected e.g. 90, 15m, 2h, 7d or none)") from None
+    if seconds < 0:
+        raise ValueError(f"TTL must be >= 0, got {value!r}")
+    return seconds
+
+
+def parse_ttl_overrides(
+    specs: Iterable[str], base: Optional[Mapping[str, Optional[int]]] = None
+) -> Dict[str, Optional[int]]:
+    """`base` (default: DEFAULT_TTLS) updated from 'kind=duration' strings."""
+    ttls = dict(DEFAULT_TTLS if base is None else base)
+    for spec in specs:
+        kind, sep, value = spec.partition("=")
+        if not sep or not kind.strip():
+            raise ValueError(f"bad TTL override {spec!r} (expected kind=duration, e.g. tool_output=15m)")
+        ttls[kind.strip()] = parse_ttl(value)
+    return ttls
+
+
+class FreshnessIndex:
+    """
+    Expiry index over artifacts, one heap per scope (None is a scope too).
+
+    Entries are keyed by artifact id unless add() is given another key.
+    Replacing or discarding a key leaves its old heap entry behind to be
+    skipped on pop; a heap is rebuilt once such dead entries outnumber the
+    live ones, so memory stays O(live).
+    """
+
+    def __init__(self, ttls: Optional[Mapping[str, Optional[int]]] = None) -> None:
+        self.ttls: Dict[str, Optional[int]] = dict(DEFAULT_TTLS if ttls is None else ttls)
+        # scope -> heap of (expires_at, seq, key); seq breaks ties in insertion order
+        self._heaps: Dict[Optional[str], List[Tuple[int, int, Hashable]]] = {}
+        # key -> (expires_at, seq, scope) for live entries
+        self._live: Dict[Hashable, Tuple[int, int, Optional[str]]] = {}
+        self._dead: Dict[Optional[str], int] = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._live
+
+    def ttl(self, kind: str) -> Optional[int]:
+        return self.ttls.get(kind, self.ttls.get("other"))
+
+    def expires_at(self, a: Artifact) -> Optional[int]:
+        """When `a` goes stale, or None if it never does (or has no usable timestamp)."""
+        ttl = self.ttl(a.kind)
+        if ttl is None:
+            return None
+        ts = parse_timestamp(a.timestamp)
+        return None if ts is None else ts + ttl
+
+    def add(self, a: Artifact, key: Optional[Hashable] = None) -> Optional[int]:
+        """Indexes (or re-indexes) `a`; returns its expiry, None if it is not tracked."""
+        key = a.artifact_id if key is None else key
+        self.discard(key)
+        expires = self.expires_at(a)
+        if expires is None:
+            return None
+        self._seq += 1
+        heapq.heappush(self._heaps.setdefault(a.scope, []), (expires, self._seq, key))
+        self._live[key] = (expires, self._seq, a.scope)
+        return expires
+
+    def discard(self, key: Hashable) -> None:
+        entry = self._live.pop(key, None)
+        if entry is None:
+            return
+        scope = entry[2]
+        dead = self._dead.get(scope, 0) + 1
+        heap = self._heaps[scope]
+        if dead * 2 > len(heap):
+            self._heaps[scope] = heap = [e for e in heap if self._is_live(e)]
+            heapq.heapify(heap)
+            dead = 0
+        self._dead[scope] = dead
+
+    def _is_live(self, entry: Tuple[int, int, Hashable]) -> bool:
+        live = self._live.get(entry[2])
+        return live is not None and live[1] == entry[1]
+
+    def _pop_dead(self, scope: Optional[str]) -> List[Tuple[int, int, Hashable]]:
+        heap = self._heaps[scope]
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
+            self._dead[scope] = max(0, self._dead.get(scope, 0) - 1)
+        return heap
+
+    def next_expiry(self, scope: Any = ...) -> Optional[int]:
+        """Earliest expiry in `scope` (default: any scope), or None if nothing is tracked."""
+        scopes = self._heaps if scope is ... else [scope] if scope in self._heaps else []
+        heads = [heap[0][0] for heap in (self._pop_dead(s) for s in scopes) if heap]
+        return min(heads) if heads else None
+
+    def expire(self, now: int, scope: Any = ...) -> List[Hashable]:
+        """
+        Removes and returns the keys that are stale at `now` (expires_at <= now),
+        earliest first, from `scope` (default: every scope).
+        """
+        scopes = list(self._heaps) if scope is ... else [scope] if scope in self._heaps else []
+        stale: List[Tuple[int, int, Hashable]] = []
+        for s in scopes:
+            heap = self._pop_dead(s)
+            while heap and heap[0][0] <= now:
+                entry = heapq.heappop(heap)
+                del self._live[entry[2]]
+                stale.append(entry)
+                heap = self._pop_dead(s)
+        stale.sort(key=lambda e: e[:2])
+        return [key for _, _, key in stale]
+
+    def is_stale(self, key: Hashable, now: int) -> bool:
+        entry = self._live.get(key)
+        return entry is not None and entry[0] <= now
+
+
+def latest_timestamp(artifacts: Iterable[Artifact]) -> Optional[int]:
+    """The newest parsable timestamp among `artifacts` (a reproducible 'now' for replays)."""
+    stamps = [t for t in (parse_timestamp(a.timestamp) for a in artifacts) if t is not None]
+    return max(stamps) if stamps else None
+
+
+def freshness_gate(
+    artifacts: List[Artifact],
+    now: int,
+    ttls: Optional[Mapping[str, Optional[int]]] = None,
+    missing: str = "keep",
+) -> Tuple[List[Artifact], List[Tuple[Artifact, str]]]:
+    """
+    Splits `artifacts` into (fresh, [(artifact, reason)]), both in input order.
+
+    Reasons: "stale" (older than its kind's TTL at `now`) and, with
+    missing="reject", "unknown" (TTL applies but no usable timestamp).
+    """
+    if missing not in MISSING_POLICIES:
+        raise ValueError(f"missing must be one of {', '.join(MISSING_POLICIES)}")
+    index = FreshnessIndex(ttls)
+    unknown = set()
+    for i, a in enumerate(artifacts):
+        if index.add(a, key=i) is None and missing == "reject" and index.ttl(a.kind) is not None:
+            unknown.add(i)
+    stale = set(index.expire(now))
+    fresh: List[Artifact] = []
+    rejected: List[Tuple[Artifact, str]] = []
+    for i, a in enumerate(artifacts):
+        if i in unknown:
+            rejected.append((a, "unknown"))
+        elif i in stale:
+            rejected.append((a, "stale"))
+        else:
+            fresh.append(a)
+    return fresh, rejected
+
+
+# ----------------------------
+# CLI: replay a bundle through the gate
+# ----------------------------
+
+def fmt_time(epoch: Optional[int]) -> str:
+    if epoch is None:
+        return "-"
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def fmt_age(seconds: Optional[int]) -> str:
+    if seconds is None:
+        return "-"
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if abs(seconds) >= size:
+            return f"{seconds / size:.1f}{unit}"
+    return f"{seconds}s"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Freshness gate: replay a bundle with per-kind TTLs.")
+    parser.add_argument(
+        "--input",
+        "-i",
+        default="-",
+        help="Path to context bundle JSON. Use '-' to read from stdin.",
+    )
+    parser.add_argument(
+        "--ttl",
+        action="append",
+        default=[],
+        metavar="KIND=DURATION",
+        help="Override a kind's TTL (e.g. tool_output=15m, document=7d, message=none). Repeatable.",
+    )
+    parser.add_argument(
+        "--now",
+        default=None,
+        help="Evaluation time (ISO-8601 or epoch seconds). Default: the newest timestamp in the bundle.",
+    )
+    parser.add_argument(
+        "--missing",
+        choices=MISSING_POLICIES,
+        default="reject",
+        help="What to do with artifacts whose kind has a TTL but that carry no usable timestamp.",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default=None,
+        help="Write the artifacts still valid at --now as JSON Lines to this path.",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        ttls = parse_ttl_overrides(args.ttl)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    now: Optional[int] = None
+    if args.now is not None:
+        now = parse_timestamp(args.now)
+        if now is None:
+            print(f"ERROR: --now {args.now!r} is not a timestamp", file=sys.stderr)
+            return 2
+
+    index = FreshnessIndex(ttls)
+    records: List[Any] = []
+    artifacts = []
+    expires: List[Optional[int]] = []
+    stamps: List[Optional[int]] = []
+    timeline: List[List[str]] = []
+    clock: Optional[int] = None
+    try:
+        for i, raw in enumerate(iter_artifact_records(args.input)):
+            a = normalize_artifact(raw, i)
+            records.append(raw)
+            artifacts.append(a)
+            expires.append(index.add(a, key=i))
+            ts = parse_timestamp(a.timestamp)
+            stamps.append(ts)
+            if ts is not None and (clock is None or ts > clock):
+                clock = ts
+                evicted = index.expire(clock)
+                if evicted:
+                    timeline.append([
+                        str(i), a.artifact_id, fmt_time(clock), str(len(evicted)),
+                        ", ".join(artifacts[k].artifact_id for k in evicted[:6]) + (" ..." if len(evicted) > 6 else ""),
+                    ])
+    except (OSError, ValueError) as e:
+        print(f"ERROR: failed to read bundle: {e}", file=sys.stderr)
+        return 2
+
+    if not artifacts:
+        print("No artifacts found in bundle.artifacts", file=sys.stderr)
+        return 1
+
+    if now is None:
+        now = clock
+    # A fresh index: --now may lie before the replay clock.
+    final = FreshnessIndex(ttls)
+    for i, a in enumerate(artifacts):
+        final.add(a, key=i)
+    stale = set(final.expire(now)) if now is not None else set()
+
+    rows: List[List[str]] = []
+    states: Dict[str, int] = {}
+    kept: List[int] = []
+    for i, a in enumerate(artifacts):
+        ttl, ts = final.ttl(a.kind), stamps[i]
+        if ttl is None:
+            state = "VALID"
+        elif ts is None:
+            state = "UNKNOWN"
+        elif i in stale:
+            state = "STALE"
+        else:
+            state = "VALID"
+        states[state] = states.get(state, 0) + 1
+        if state == "VALID" or (state == "UNKNOWN" and args.missing == "keep"):
+            kept.append(i)
+        rows.append([
+            state,
+            a.artifact_id,
+            a.kind,
+            a.scope or "-",
+            fmt_time(ts),
+            fmt_age(now - ts if now is not None and ts is not None else None),
+            fmt_age(ttl) if ttl is not None else "never",
+            fmt_time(expires[i]),
+        ])
+
+    print("")
+    print("Freshness Gate")
+    print("--------------")
+    print(f"Artifacts:          {len(artifacts)}")
+    print(f"Evaluated at:       {fmt_time(now)}")
+    print(f"Missing timestamps: {args.missing}")
+    print("TTLs:               " + ", ".join(f"{k}={fmt_age(v) if v is not None else 'never'}" for k, v in ttls.items()))
+    print("")
+
+    print("Eviction timeline (replay in bundle order)")
+    if timeline:
+        print_table(timeline, headers=["turn", "at artifact", "clock", "evicted", "ids"])
+    else:
+        print("(nothing went stale during the replay)")
+    print("")
+
+    print(f"Decisions at {fmt_time(now)}")
+    print_table(rows, headers=["state", "id", "kind", "scope", "timestamp", "age", "ttl", "expires"])
+    print("")
+
+    print("Totals")
+    print("------")
+    for state in ("VALID", "STALE", "UNKNOWN"):
+        print(f"{state + ':':<20}{states.get(state, 0)}")
+    print(f"{'Kept:':<20}{len(kept)}")
+    print("")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            for i in kept:
+                out.write(json.dumps(records[i], ensure_ascii=False) + "\n")
+        print(f"Wrote {len(kept)} artifacts to {args.output}")
+        print("")
+
+    print("Operator reminder")
+    print("-----------------")
+    print("Freshness is one validation check; a VALID artifact may still fail provenance or scope checks.")
+    print("UNKNOWN is treated as not valid unless --missing keep is chosen deliberately.")
+    print("")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,384 @@
+"""
+Shuffle-invariance checks: does a gate give the same answer for every
+input order of the same bundle?
+
+A check runs `fn` (raw records -> anything comparable, typically the
+admitted ids) on the bundle as given and on many seeded permutations of
+it, in parallel worker processes. The parsed records are shared with the
+workers once (inherited through fork where available, else sent once per
+worker as initializer arguments); each task is then only a range of
+seeds, and workers send back only the permutations that changed the
+result.
+
+Some order dependence is by design (the question is the first message,
+truncation keeps the latest two messages). Declare it with `keep_order`:
+records it matches keep their relative order in every permutation, while
+everything else moves freely around them.
+
+A failing permutation is shrunk to a minimal bundle: records are removed
+(halves, then quarters, ... then one at a time) for as long as the same
+permutation, restricted to what is left, still changes the result.
+
+    python -m context_core.invariance -i bundle.json --target gate --runs 500 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import importlib.util
+import json
+import multiprocessing
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from ._cli import print_table
+from .bundle_stream import iter_artifact_records
+
+Record = Dict[str, Any]
+Target = Callable[[List[Record]], Any]
+KeepOrder = Callable[[Record], bool]
+
+
+class Violation(NamedTuple):
+    """Permutation `seed` (record indices in `order`) changed `expected` into `actual`."""
+
+    seed: int
+    order: List[int]
+    expected: Any
+    actual: Any
+
+
+def with_ids(records: Sequence[Any]) -> List[Record]:
+    """
+    Object records with their default a{i} id made explicit, so an
+    artifact keeps its id wherever a permutation moves it.
+    """
+    out: List[Record] = []
+    for i, raw in enumerate(records):
+        if isinstance(raw, dict):
+            out.append(raw if raw.get("id") else {**raw, "id": f"a{i}"})
+    return out
+
+
+def shuffled_order(n: int, seed: int, pinned: Sequence[int] = ()) -> List[int]:
+    """
+    A seeded permutation of range(n) in which the `pinned` indices
+    (ascending) keep their relative order.
+    """
+    order = list(range(n))
+    random.Random(seed).shuffle(order)
+    if pinned:
+        pinned_set = set(pinned)
+        slots = [pos for pos, i in enumerate(order) if i in pinned_set]
+        for pos, i in zip(slots, pinned):
+            order[pos] = i
+    return order
+
+
+def pinned_indices(records: Sequence[Record], keep_order: Optional[KeepOrder]) -> List[int]:
+    return [i for i, r in enumerate(records) if keep_order(r)] if keep_order else []
+
+
+# ----------------------------
+# Parallel runs
+# ----------------------------
+
+# (fn, records, pinned indices, expected result), set once per worker process
+_shared: Optional[Tuple[Target, List[Record], List[int], Any]] = None
+
+
+def _share(fn: Target, records: List[Record], pinned: List[int], expected: Any) -> None:
+    global _shared
+    _shared = (fn, records, pinned, expected)
+
+
+def _run_seeds(seeds: range) -> List[Tuple[int, Any]]:
+    """(seed, result) for the permutations in `seeds` whose result differs."""
+    assert _shared is not None
+    fn, records, pinned, expected = _shared
+    failures = []
+    for seed in seeds:
+        order = shuffled_order(len(records), seed, pinned)
+        actual = fn([records[i] for i in order])
+        if actual != expected:
+            failures.append((seed, actual))
+    return failures
+
+
+def find_violations(
+    fn: Target,
+    records: Sequence[Record],
+    seeds: Sequence[int],
+    keep_order: Optional[KeepOrder] = None,
+    workers: int = 1,
+    chunk: int = 16,
+) -> List[Violation]:
+    """
+    Runs `fn` on every permutation in `seeds` and returns those whose
+    result differs from `fn(records)`, in seed order. With workers > 1,
+    `chunk` seeds go to a worker at a time.
+    """
+    records = list(records)
+    pinned = pinned_indices(records, keep_order)
+    expected = fn(records)
+    batches = [seeds[i : i + chunk] for i in range(0, len(seeds), max(1, chunk))]
+    global _shared
+    saved = _shared
+    _share(fn, records, pinned, expected)
+    try:
+        if workers > 1 and len(batches) > 1:
+            if "fork" in multiprocessing.get_all_start_methods():
+                pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork"))
+            else:
+                pool = ProcessPoolExecutor(workers, initializer=_share, initargs=(fn, records, pinned, expected))
+            with pool:
+                results = list(pool.map(_run_seeds, batches))
+        else:
+            results = [_run_seeds(b) for b in batches]
+    finally:
+        _shared = saved
+    return [
+        Violation(seed, shuffled_order(len(records), seed, pinned), expected, actual)
+        for failures in results
+        for seed, actual in failures
+    ]
+
+
+# ----------------------------
+# Shrinking
+# ----------------------------
+
+def shrink(fn: Target, records: Sequence[Record], order: Sequence[int]) -> Tuple[List[int], List[int]]:
+    """
+    A 1-minimal subset of record indices (ascending) on which `order`,
+    restricted to the subset, still changes fn's result; returned with
+    that restricted order. Removing any single remaining record makes the
+    two orders agree.
+    """
+
+    def fails(keep: List[int]) -> bool:
+        kept = set(keep)
+        return fn([records[i] for i in keep]) != fn([records[i] for i in order if i in kept])
+
+    keep = list(range(len(records)))
+    size = len(keep) // 2
+    while size >= 1:
+        start, removed = 0, False
+        while start < len(keep):
+            trial = keep[:start] + keep[start + size :]
+            if trial and fails(trial):
+                keep, removed = trial, True
+            else:
+                start += size
+        if not removed:
+            size //= 2
+    kept = set(keep)
+    return keep, [i for i in order if i in kept]
+
+
+# ----------------------------
+# CLI: check the example gates
+# ----------------------------
+
+EXAMPLES = Path(__file__).resolve().parents[1] / "examples"
+
+# target -> (example directory, module, kinds whose order matters by design)
+TARGETS = {
+    "gate": ("minimal-rag-context-gate", "gates", ("message",)),
+    "truncate": ("long-session-stability-harness", "truncator", ("message",)),
+}
+
+
+def load_example(directory: str, module: str) -> ModuleType:
+    """An example's src/ loaded as a package under a unique name (they are all called src)."""
+    name = "shuffle_" + directory.replace("-", "_")
+    if name not in sys.modules:
+        src = EXAMPLES / directory / "src"
+        spec = importlib.util.spec_from_file_location(name, src / "__init__.py", submodule_search_locations=[str(src)])
+        package = importlib.util.module_from_spec(spec)
+        sys.modules[name] = package
+        spec.loader.exec_module(package)
+    return importlib.import_module(f"{name}.{module}")
+
+
+def admitted_ids(target: str, budget: int, max_docs: int, unordered: bool, records: List[Dict[str, Any]]) -> Any:
+    directory, module, _ = TARGETS[target]
+    code = load_example(directory, module)
+    bundle = {"artifacts": records}
+    if target == "gate":
+        admitted, _ = code.gate_bundle(bundle, budget_tokens=budget, max_docs=max_docs)
+    else:
+        admitted, _ = code.truncate_session(bundle, budget_tokens=budget)
+    ids = [a.artifact_id for a in admitted]
+    return sorted(ids) if unordered else ids
+
+
+class KindIn:
+    """keep_order predicate: record kind is one of `kinds` (picklable, unlike a lambda)."""
+
+    def __init__(self, kinds: Sequence[str]) -> None:
+        self.kinds = frozenset(kinds)
+
+    def __call__(self, record: Dict[str, Any]) -> bool:
+        return str(record.get("kind") or "other") in self.kinds
+
+
+def _diff(expected: List[str], actual: List[str]) -> Tuple[str, str]:
+    """(ids only admitted originally, ids only admitted after the shuffle); 'order' if the sets agree."""
+    lost = [i for i in expected if i not in actual]
+    gained = [i for i in actual if i not in expected]
+    if not lost and not gained:
+        return "order", "order"
+    return ", ".join(lost) or "-", ", ".join(gained) or "-"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Shuffle invariance: admitted context must not depend on input order.")
+    parser.add_argument(
+        "--input",
+        "-i",
+        default="-",
+        help="Path to context bundle JSON. Use '-' to read from stdin.",
+    )
+    parser.add_argument(
+        "--target",
+        choices=sorted(TARGETS),
+        default="gate",
+        help="Code under test: gate_bundle (gate) or truncate_session (truncate).",
+    )
+    parser.add_argument(
+        "--budget",
+        "-b",
+        type=int,
+        default=None,
+        help="Token budget (default: the target's own default).",
+    )
+    parser.add_argument(
+        "--max-docs",
+        type=int,
+        default=3,
+        help="Document cap for the gate target.",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=200,
+        help="Number of seeded permutations to test.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="First permutation seed.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes (1 = in-process).",
+    )
+    parser.add_argument(
+        "--keep-order",
+        action="append",
+        default=None,
+        metavar="KIND",
+        help="Kind whose relative order is significant by design (default: message). Repeatable.",
+    )
+    parser.add_argument(
+        "--shuffle-all",
+        action="store_true",
+        help="Declare no order dependence (shuffle every artifact).",
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="Compare admitted id sets instead of sequences.",
+    )
+    parser.add_argument(
+        "--save-failure",
+        default=None,
+        help="Write the shrunk failing bundle (original order) to this JSON path.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.runs <= 0:
+        print("ERROR: --runs must be > 0", file=sys.stderr)
+        return 2
+    try:
+        records = with_ids(list(iter_artifact_records(args.input)))
+    except (OSError, ValueError) as e:
+        print(f"ERROR: failed to read bundle: {e}", file=sys.stderr)
+        return 2
+
+    if not records:
+        print("No artifacts found in bundle.artifacts", file=sys.stderr)
+        return 1
+
+    budget = args.budget if args.budget is not None else (120 if args.target == "gate" else 400)
+    kinds: Tuple[str, ...] = () if args.shuffle_all else tuple(args.keep_order or TARGETS[args.target][2])
+    fn = partial(admitted_ids, args.target, budget, args.max_docs, args.unordered)
+    keep_order: Optional[KindIn] = KindIn(kinds) if kinds else None
+    seeds = range(args.seed, args.seed + args.runs)
+    violations = find_violations(fn, records, seeds, keep_order=keep_order, workers=args.workers)
+
+    print("")
+    print("Shuffle Invariance Test")
+    print("-----------------------")
+    print(f"Target:             {args.target} (budget {budget})")
+    print(f"Artifacts:          {len(records)}")
+    print(f"Order kept for:     {', '.join(kinds) if kinds else '(nothing)'}")
+    print(f"Permutations:       {args.runs} (seeds {seeds.start}..{seeds.stop - 1}, {args.workers} workers)")
+    print(f"Compared:           admitted id {'sets' if args.unordered else 'sequences'}")
+    print(f"Changed results:    {len(violations)}")
+    print("")
+
+    if not violations:
+        print("Result: PASS (every permutation admitted the same context)")
+        print("")
+    else:
+        print("Changed results (first 10)")
+        print_table(
+            [[str(v.seed), *_diff(v.expected, v.actual), str(len(v.actual))] for v in violations[:10]],
+            headers=["seed", "lost", "gained", "admitted"],
+        )
+        print("")
+
+        first = violations[0]
+        keep, order = shrink(fn, records, first.order)
+        minimal = [records[i] for i in keep]
+        shuffled = [records[i] for i in order]
+        print(f"Minimal failing bundle (shrunk from seed {first.seed}: {len(records)} -> {len(keep)} artifacts)")
+        print_table(
+            [[r["id"], str(r.get("kind") or "other"), str(r.get("authority") or "other"), str(r.get("priority") or 0)]
+             for r in minimal],
+            headers=["id", "kind", "authority", "priority"],
+        )
+        print("")
+        print(f"Original order:     {' '.join(r['id'] for r in minimal)} -> admits {fn(minimal)}")
+        print(f"Failing order:      {' '.join(r['id'] for r in shuffled)} -> admits {fn(shuffled)}")
+        print("")
+        if args.save_failure:
+            Path(args.save_failure).write_text(
+                json.dumps({"artifacts": minimal, "failing_order": [r["id"] for r in shuffled]}, indent=2) + "\n"
+            )
+            print(f"Saved to:           {args.save_failure}")
+            print("")
+        print("Result: FAIL")
+        print("")
+
+    print("Operator reminder")
+    print("-----------------")
+    print("Order dependence you rely on must be declared (--keep-order), not discovered in production.")
+    print("Ties in score are the usual cause; break them explicitly before trusting a gate's output order.")
+    print("")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,112 @@
+"""
+Scope isolation: partition a bundle by scope and gate each scope on its own.
+
+Each scope is admitted against its own token budget, so one tenant's
+artifacts can never spend (or be ranked against) another's. Scopes
+outside the allowlist are rejected whole. Unscoped artifacts (system,
+task, the question) form the global partition, which is always allowed
+and has its own budget.
+
+Partitions are independent, so they can be gated in any order or in
+parallel (pass an Executor); the admitted lists are then merged by
+authority (system first), highest score first within an authority, with
+ties kept in partition order.
+"""
+
+from __future__ import annotations
+
+import heapq
+from concurrent.futures import Executor
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, TypeVar
+
+from .artifact import Artifact, Weights
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+GLOBAL_SCOPE: Optional[str] = None
+
+
+class ScopePolicy:
+    """
+    Per-scope token budgets and an optional scope allowlist.
+
+    budgets:        scope -> budget; other scopes get `default_budget`
+    allowed:        scopes that may be admitted at all (None = every scope)
+    global_budget:  budget of the unscoped partition (default: default_budget)
+    """
+
+    __slots__ = ("budgets", "default_budget", "allowed", "global_budget")
+
+    def __init__(
+        self,
+        budgets: Optional[Mapping[str, int]] = None,
+        default_budget: int = 120,
+        allowed: Optional[Iterable[str]] = None,
+        global_budget: Optional[int] = None,
+    ) -> None:
+        self.budgets: Dict[str, int] = dict(budgets or {})
+        self.default_budget = default_budget
+        self.allowed = None if allowed is None else frozenset(allowed)
+        self.global_budget = default_budget if global_budget is None else global_budget
+
+    def allows(self, scope: Optional[str]) -> bool:
+        return scope is GLOBAL_SCOPE or self.allowed is None or scope in self.allowed
+
+    def budget(self, scope: Optional[str]) -> int:
+        if scope is GLOBAL_SCOPE:
+            return self.global_budget
+        return self.budgets.get(scope, self.default_budget)
+
+
+def partition_by_scope(scopes: Iterable[Optional[str]]) -> Dict[Optional[str], List[int]]:
+    """scope -> row indices, in one pass; scopes in first-seen order, rows ascending."""
+    parts: Dict[Optional[str], List[int]] = {}
+    for i, scope in enumerate(scopes):
+        rows = parts.get(scope)
+        if rows is None:
+            parts[scope] = [i]
+        else:
+            rows.append(i)
+    return parts
+
+
+def map_partitions(
+    fn: Callable[[T], R], tasks: Sequence[T], executor: Optional[Executor] = None, chunksize: int = 4
+) -> List[R]:
+    """
+    fn over every task, results in task order. With an executor the tasks
+    run in parallel (fn and tasks must pickle for a process pool), sent
+    `chunksize` at a time so small scopes are not dominated by IPC.
+    """
+    if executor is None or len(tasks) <= 1:
+        return [fn(t) for t in tasks]
+    return list(executor.map(fn, tasks, chunksize=max(1, chunksize)))
+
+
+def merge_by_authority(parts: Iterable[Sequence[Artifact]], weights: Weights) -> List[Artifact]:
+    """
+    Merges per-scope admitted lists into one: authority first (system ...
+    other), then score descending; ties keep partition order, then row order.
+    """
+
+    def key(a: Artifact) -> Tuple[int, int]:
+        return a.authority_code, -weights.score(a)
+
+    return list(heapq.merge(*(sorted(p, key=key) for p in parts), key=key))
+
+
+def parse_scope_budgets(specs: Iterable[str]) -> Dict[str, int]:
+    """'scope=tokens' strings -> {scope: tokens}."""
+    budgets: Dict[str, int] = {}
+    for spec in specs:
+        scope, sep, value = spec.rpartition("=")
+        try:
+            tokens = int(value)
+        except ValueError:
+            tokens = -1
+        if not sep or not scope.strip() or tokens < 0:
+            raise ValueError(f"bad scope budget {spec!r} (expected scope=tokens, e.g. billing=200)")
+        budgets[scope.strip()] = tokens
+    return budgets
+
@@ -0,0 +1,301 @@
+"""
+Cross-scope leak detection with rolling-hash fingerprints.
+
+Content is tokenized into words (lowercased, punctuation and whitespace
+ignored, so reflowed or re-cased copies still match) and every window of
+`window` consecutive words is fingerprinted with a Rabin-Karp rolling
+hash: one multiply-add per word, whatever the window size. Fingerprints
+of every scoped artifact go into one table; scanning a context then looks
+each of its windows up once, so a whole bundle is checked in time linear
+in its total content instead of comparing artifacts pairwise.
+
+A window is owned by the scope of the first scoped source artifact (in
+bundle order) that contains it; it is a leak wherever it appears in an
+artifact of any other scope. Unscoped artifacts are shared context: any
+window that occurs in one (instructions, a shared policy document quoted
+by several scopes) is public and never reported, whichever scope quotes
+it first. Scoped text found in an unscoped artifact that is not itself a
+source (e.g. in an admitted context) is reported. Hits are verified word
+by word (no false positives from hash collisions) and adjacent hits from
+the same source are merged into spans with character offsets on both
+sides.
+
+Fingerprints use Python's string hash, so they are only comparable
+within one process.
+
+    python -m context_core.leaks -i bundle.json [--admitted context.jsonl]   # exit 1 on leaks
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from ._cli import print_table
+from .artifact import Artifact, normalize_artifact
+from .bundle_stream import iter_artifact_records
+
+DEFAULT_WINDOW = 8
+
+_WORD = re.compile(r"\w+")
+_MOD = (1 << 61) - 1
+_BASE = 1_000_003
+
+# (scope, row, word position) of a window's first occurrence
+_Location = Tuple[Optional[str], int, int]
+
+
+class LeakSpan(NamedTuple):
+    """Text of `source_id` (scope `source_scope`) found in `artifact_id` (scope `scope`)."""
+
+    artifact_id: str
+    scope: Optional[str]
+    start: int
+    end: int
+    source_id: str
+    source_scope: Optional[str]
+    source_start: int
+    source_end: int
+
+
+class _Words(NamedTuple):
+    hashes: List[int]
+    starts: List[int]
+    ends: List[int]
+
+
+def _words(text: str) -> _Words:
+    hashes: List[int] = []
+    starts: List[int] = []
+    ends: List[int] = []
+    for m in _WORD.finditer(text):
+        hashes.append(hash(m.group().lower()) % _MOD)
+        starts.append(m.start())
+        ends.append(m.end())
+    return _Words(hashes, starts, ends)
+
+
+def rolling_hashes(tokens: Sequence[int], window: int) -> List[int]:
+    """Rabin-Karp hash of every run of `window` consecutive tokens (one per start position)."""
+    n = len(tokens)
+    if window <= 0 or n < window:
+        return []
+    top = pow(_BASE, window - 1, _MOD)
+    h = 0
+    for t in tokens[:window]:
+        h = (h * _BASE + t) % _MOD
+    out = [h]
+    for i in range(window, n):
+        h = ((h - tokens[i - window] * top) * _BASE + tokens[i]) % _MOD
+        out.append(h)
+    return out
+
+
+class LeakIndex:
+    """
+    Fingerprint table over source artifacts: window hash -> where the
+    window first occurred in a scoped artifact, plus the public windows
+    of unscoped (shared) artifacts.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        if window <= 0:
+            raise ValueError("window must be > 0")
+        self.window = window
+        self.sources: List[Artifact] = []
+        self._words: List[_Words] = []
+        self._first: Dict[int, _Location] = {}
+        self._public: Set[int] = set()
+
+    @classmethod
+    def build(cls, artifacts: Iterable[Artifact], window: int = DEFAULT_WINDOW) -> "LeakIndex":
+        index = cls(window)
+        for a in artifacts:
+            index.add(a)
+        return index
+
+    def add(self, a: Artifact) -> None:
+        row = len(self.sources)
+        words = _words(a.content)
+        self.sources.append(a)
+        self._words.append(words)
+        if a.scope is not None:
+            first = self._first
+            for pos, h in enumerate(rolling_hashes(words.hashes, self.window)):
+                if h not in first:
+                    first[h] = (a.scope, row, pos)
+        else:
+            self._public.update(rolling_hashes(words.hashes, self.window))
+
+    def _foreign(self, h: int, scope: Optional[str]) -> Optional[_Location]:
+        """Where window `h` first occurred, if that was in a scope other than `scope`."""
+        seen = self._first.get(h)
+        if seen is None or seen[0] == scope or h in self._public:
+            return None
+        return seen
+
+    def scan(self, a: Artifact) -> List[LeakSpan]:
+        """Spans of `a` that occur in artifacts of other scopes, in text order."""
+        k = self.window
+        words = _words(a.content)
+        spans: List[LeakSpan] = []
+        # current run: target word range, source row and source word range
+        run: Optional[List[int]] = None
+
+        def close() -> None:
+            if run is not None:
+                t0, t1, row, s0, s1 = run
+                src = self.sources[row]
+                sw = self._words[row]
+                spans.append(LeakSpan(
+                    a.artifact_id, a.scope, words.starts[t0], words.ends[t1 - 1],
+                    src.artifact_id, src.scope, sw.starts[s0], sw.ends[s1 - 1],
+                ))
+
+        for pos, h in enumerate(rolling_hashes(words.hashes, k)):
+            loc = self._foreign(h, a.scope)
+            if loc is None:
+                continue
+            _, row, src_pos = loc
+            if self._words[row].hashes[src_pos:src_pos + k] != words.hashes[pos:pos + k]:
+                continue  # hash collision
+            if run is not None and run[2] == row and pos <= run[1] and src_pos - run[3] == pos - run[0]:
+                run[1], run[4] = pos + k, src_pos + k
+                continue
+            close()
+            run = [pos, pos + k, row, src_pos, src_pos + k]
+        close()
+        return spans
+
+
+def find_leaks(
+    sources: Sequence[Artifact],
+    targets: Optional[Iterable[Artifact]] = None,
+    window: int = DEFAULT_WINDOW,
+) -> List[LeakSpan]:
+    """
+    Fingerprints `sources` (typically the whole bundle, denied scopes
+    included) and scans `targets` (default: the sources themselves; pass
+    an admitted context to check only what reaches the model). Each target
+    is judged by its own scope; in unscoped targets, any scoped text that
+    is not also in an unscoped source is a leak.
+    """
+    index = LeakIndex.build(sources, window)
+    out: List[LeakSpan] = []
+    for a in sources if targets is None else targets:
+        out.extend(index.scan(a))
+    return out
+
+
+# ----------------------------
+# CLI: scan a bundle or an admitted context
+# ----------------------------
+
+def _label(scope: Optional[str]) -> str:
+    return "(global)" if scope is None else scope
+
+
+def _load(path: str) -> List[Artifact]:
+    return [normalize_artifact(raw, i) for i, raw in enumerate(iter_artifact_records(path))]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Cross-scope leak test: find text of one scope inside another.")
+    parser.add_argument(
+        "--input",
+        "-i",
+        default="-",
+        help="Path to context bundle JSON (all scopes). Use '-' to read from stdin.",
+    )
+    parser.add_argument(
+        "--admitted",
+        default=None,
+        help="Admitted context to scan (JSON / JSON Lines). Default: scan the bundle itself.",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=DEFAULT_WINDOW,
+        help="Shortest leak reported, in words.",
+    )
+    parser.add_argument(
+        "--max-excerpt",
+        type=int,
+        default=60,
+        help="Max characters of leaked text to print per span.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.window <= 0:
+        print("ERROR: --window must be > 0", file=sys.stderr)
+        return 2
+    try:
+        sources = _load(args.input)
+        targets = _load(args.admitted) if args.admitted else sources
+    except (OSError, ValueError) as e:
+        print(f"ERROR: failed to read bundle: {e}", file=sys.stderr)
+        return 2
+
+    if not sources:
+        print("No artifacts found in bundle.artifacts", file=sys.stderr)
+        return 1
+
+    index = LeakIndex.build(sources, args.window)
+    rows: List[List[str]] = []
+    flows: Dict[Tuple[Optional[str], Optional[str]], int] = {}
+    leaked_artifacts = set()
+    for a in targets:
+        for span in index.scan(a):
+            leaked_artifacts.add(a.artifact_id)
+            key = (span.source_scope, span.scope)
+            flows[key] = flows.get(key, 0) + 1
+            excerpt = a.content[span.start:span.end]
+            if len(excerpt) > args.max_excerpt:
+                excerpt = excerpt[: args.max_excerpt] + "..."
+            rows.append([
+                span.artifact_id,
+                _label(span.scope),
+                f"{span.start}-{span.end}",
+                span.source_id,
+                _label(span.source_scope),
+                f"{span.source_start}-{span.source_end}",
+                excerpt.replace("\n", " "),
+            ])
+
+    scopes = {a.scope for a in sources}
+    print("")
+    print("Cross-Domain Leak Test")
+    print("----------------------")
+    print(f"Source artifacts:   {len(sources)} in {len(scopes)} scopes")
+    print(f"Scanned artifacts:  {len(targets)}{' (admitted context)' if args.admitted else ''}")
+    print(f"Window (words):     {args.window}")
+    print(f"Leaked spans:       {len(rows)} in {len(leaked_artifacts)} artifacts")
+    print("")
+
+    if rows:
+        print("Flows (source scope -> scope it appeared in)")
+        print_table(
+            [[_label(src), _label(dst), str(n)] for (src, dst), n in sorted(flows.items(), key=lambda kv: -kv[1])],
+            headers=["from", "into", "spans"],
+        )
+        print("")
+        print("Leaked spans (character offsets)")
+        print_table(rows, headers=["id", "scope", "span", "source", "source scope", "source span", "text"])
+        print("")
+        print("Result: FAIL")
+    else:
+        print("Result: PASS (no cross-scope spans found)")
+    print("")
+
+    print("Operator reminder")
+    print("-----------------")
+    print("A PASS only rules out copied text; paraphrased or summarized leaks need review.")
+    print("Treat any leak into shared (global) context as affecting every scope.")
+    print("")
+    return 1 if rows else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+"""
+Precedence policy: the authority and kind weights behind every admission score.
+
+A policy is a JSON or TOML file (TOML needs Python 3.11+) with an
+"authority" and a "kind" table of integer weights:
+
+    {"authority": {"system": 1000, "developer": 800, ...},
+     "kind": {"system": 120, "task": 110, ...}}
+
+load_policy() validates it and compiles it once into Weights (integer
+lists indexed by authority/kind code), so scoring stays two list lookups
+per artifact however the policy was written. Names a policy leaves out
+keep the base policy's weight, so a file can change a single entry.
+
+DEFAULT_WEIGHTS is compiled at import from precedence.json next to this
+module, with the file named by the CONTEXT_PRECEDENCE_POLICY environment
+variable (if set) overlaid on it; the example gates and the operator
+scripts all score with it. A policy file that cannot be read or is invalid
+is reported with a warning and the packaged policy is used instead.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import warnings
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional, Union
+
+from .artifact import AUTHORITIES, KINDS, Weights
+
+try:  # TOML policies
+    import tomllib
+except ImportError:  # pragma: no cover - Python < 3.11
+    tomllib = None
+
+DEFAULT_POLICY = Path(__file__).resolve().with_name("precedence.json")
+POLICY_ENV = "CONTEXT_PRECEDENCE_POLICY"
+
+_TABLES = {"authority": AUTHORITIES, "kind": KINDS}
+
+
+def policy_tables(weights: Weights) -> Dict[str, Dict[str, int]]:
+    """Weights back as a policy mapping (every name, in code order)."""
+    return {
+        "authority": dict(zip(AUTHORITIES, weights.authority)),
+        "kind": dict(zip(KINDS, weights.kind)),
+    }
+
+
+def _weight(table: str, name: str, value: Any) -> int:
+    if name not in _TABLES[table]:
+        raise ValueError(f"unknown {table} {name!r} (expected one of: {', '.join(_TABLES[table])})")
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"{table}.{name} must be an integer, got {value!r}")
+    return value
+
+
+def parse_policy(data: Any, base: Optional[Weights] = None) -> Weights:
+    """Compiles a policy mapping over `base` (default: all weights 0). Raises ValueError."""
+    if not isinstance(data, Mapping):
+        raise ValueError("policy must be an object with 'authority' and/or 'kind' tables")
+    tables = policy_tables(base) if base is not None else {t: dict.fromkeys(names, 0) for t, names in _TABLES.items()}
+    for table, entries in data.items():
+        if table not in _TABLES:
+            raise ValueError(f"unknown policy table {table!r} (expected 'authority' or 'kind')")
+        if not isinstance(entries, Mapping):
+            raise ValueError(f"policy table {table!r} must be an object")
+        for name, value in entries.items():
+            tables[table][name] = _weight(table, name, value)
+    return Weights(tables["authority"], tables["kind"])
+
+
+def read_policy(path: Union[str, Path]) -> Any:
+    """Raw policy mapping from a .json or .toml file."""
+    path = Path(path)
+    if path.suffix == ".toml":
+        if tomllib is None:
+            raise ValueError(f"{path}: TOML policies need Python 3.11+ (use JSON)")
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_policy(path: Union[str, Path], base: Optional[Weights] = None) -> Weights:
+    """Compiled policy file over `base`. Raises ValueError (unreadable or invalid file)."""
+    try:
+        return parse_policy(read_policy(path), base)
+    except OSError as e:
+        raise ValueError(f"{path}: cannot read policy: {e.strerror or e}") from None
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
+
+
+def with_overrides(weights: Weights, specs: Iterable[str]) -> Weights:
+    """`weights` with TABLE.NAME=VALUE overrides applied (e.g. kind.task=100)."""
+    data: Dict[str, Dict[str, Any]] = {}
+    for spec in specs:
+        key, sep, value = spec.partition("=")
+        table, dot, name = key.strip().partition(".")
+        if not sep or not dot:
+            raise ValueError(f"expected TABLE.NAME=VALUE, got {spec!r}")
+        try:
+            data.setdefault(table, {})[name] = int(value)
+        except ValueError:
+            raise ValueError(f"{key}: weight must be an integer, got {value.strip()!r}") from None
+    return parse_policy(data, weights)
+
+
+def _default_weights() -> Weights:
+    weights = load_policy(DEFAULT_POLICY)
+    override = os.environ.get(POLICY_ENV)
+    if not override:
+        return weights
+    try:
+        return load_policy(override, weights)
+    except ValueError as e:
+        warnings.warn(f"{POLICY_ENV} ignored, using {DEFAULT_POLICY.name}: {e}", RuntimeWarning, stacklevel=2)
+        return weights
+
+
+DEFAULT_WEIGHTS = _default_weights()
@@ -0,0 +1,259 @@
+"""
+Single-pass PII redaction.
+
+All detectors are compiled into one alternation of named groups, so a text
+is scanned once whatever the number of detectors. A cheap trigger search
+(digits, "@", key prefixes) picks the few positions where that alternation
+is tried at all. Shapes that need more
+than a regex (card numbers, IBANs) are verified on match; a failed check
+falls through to the next detector at the same position instead of
+rescanning. Scans return spans, which are memoized per text so that
+validation after masking reuses them rather than scanning again.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class Span(NamedTuple):
+    start: int
+    end: int
+    kind: str
+
+
+def luhn_ok(number: str) -> bool:
+    digits = [ord(c) - 48 for c in number if "0" <= c <= "9"]
+    if len(digits) < 13:
+        return False
+    total = 0
+    for i, d in enumerate(reversed(digits)):
+        if i % 2:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+
+def iban_ok(iban: str) -> bool:
+    s = iban.replace(" ", "")
+    if not 15 <= len(s) <= 34:
+        return False
+    rearranged = s[4:] + s[:4]
+    return int("".join(str(int(c, 36)) for c in rearranged)) % 97 == 1
+
+
+ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _phone_ok(text: str) -> bool:
+    return 7 <= sum(c.isdigit() for c in text) <= 15 and not ISO_DATE_RE.fullmatch(text)
+
+
+class Detector:
+    """
+    A named regex (without capturing groups), an optional verifier, and a
+    trigger: a short pattern every match contains in its first
+    whitespace-delimited token (a digit, "@", a key prefix).
+    """
+
+    __slots__ = ("name", "pattern", "trigger", "verify")
+
+    def __init__(
+        self,
+        name: str,
+        pattern: str,
+        trigger: str = r"\d",
+        verify: Optional[Callable[[str], bool]] = None,
+    ) -> None:
+        self.name = name
+        self.pattern = pattern
+        self.trigger = trigger
+        self.verify = verify
+
+
+DETECTORS: Dict[str, Detector] = {
+    d.name: d
+    for d in (
+        Detector("email", r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}", trigger="@"),
+        Detector(
+            "api_key",
+            r"\b(?:(?:sk|pk|rk)-[A-Za-z0-9_-]{16,}|AKIA[0-9A-Z]{16}|gh[pousr]_[A-Za-z0-9]{36}"
+            r"|xox[abprs]-[A-Za-z0-9-]{10,}|AIza[0-9A-Za-z_-]{35})",
+            trigger=r"[spr]k-|AKIA|gh[pousr]_|xox[abprs]-|AIza",
+        ),
+        Detector("iban", r"\b[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){2,7}(?: ?[A-Z0-9]{1,3})?\b", verify=iban_ok),
+        Detector("card", r"\b\d(?:[ -]?\d){12,18}\b", verify=luhn_ok),
+        Detector(
+            "phone",
+            r"(?<![\w+])(?:\+\d{1,3}[ .-]?)?(?:\(\d{1,4}\)[ .-]?)?\d{2,4}(?:[ .-]?\d{2,4}){1,4}(?!\w)",
+            verify=_phone_ok,
+        ),
+        # Catch-all used by the long-session harness: any run of 3+ digits.
+        Detector("digits", r"[0-9]{3,}"),
+    )
+}
+
+DEFAULT_DETECTORS: Tuple[str, ...] = ("email", "api_key", "iban", "card", "phone")
+
+
+class RedactionEngine:
+    """
+    Scans with every detector in one pass; earlier detectors win at the
+    same position. `placeholder` may contain "{kind}".
+    """
+
+    def __init__(
+        self,
+        detectors: Sequence[str] = DEFAULT_DETECTORS,
+        placeholder: str = "[REDACTED]",
+        cache_size: int = 4096,
+    ) -> None:
+        unknown = [d for d in detectors if d not in DETECTORS]
+        if unknown:
+            raise ValueError(f"unknown detector(s): {', '.join(unknown)}")
+        if not detectors:
+            raise ValueError("at least one detector is required")
+        self.detectors = [DETECTORS[d] for d in detectors]
+        self.placeholder = placeholder
+        self.cache_size = cache_size
+        self._index = {d.name: i for i, d in enumerate(self.detectors)}
+        # _tails[i] matches detectors i.. only (fallback after a failed verify)
+        self._tails = [self._compile(self.detectors[i:]) for i in range(len(self.detectors))]
+        self.regex = self._tails[0]
+        self.triggers = re.compile("|".join(sorted({d.trigger for d in self.detectors})))
+        # Bracketed, PII-free placeholders cannot join neighbouring text into
+        # a new match, so masked output can be cached as clean.
+        self._masked_is_clean = re.fullmatch(r"[\[<{].*[\]>}]", placeholder) is not None and not any(
+            self._scan(placeholder.format(kind=d.name)) for d in self.detectors
+        )
+        self._spans: "OrderedDict[str, Tuple[Span, ...]]" = OrderedDict()
+
+    @staticmethod
+    def _compile(detectors: Sequence[Detector]) -> "re.Pattern[str]":
+        return re.compile("|".join(f"(?P<{d.name}>{d.pattern})" for d in detectors))
+
+    def _verified(self, text: str, m: "re.Match[str]") -> Optional["re.Match[str]"]:
+        """m, or the first later detector that matches and verifies at m's start."""
+        while m is not None:
+            i = self._index[m.lastgroup]
+            verify = self.detectors[i].verify
+            if verify is None or verify(m.group()):
+                return m
+            if i + 1 == len(self.detectors):
+                return None
+            m = self._tails[i + 1].match(text, m.start())
+        return None
+
+    def _scan(self, text: str) -> Tuple[Span, ...]:
+        """
+        Finds trigger hits with one cheap search, then tries the combined
+        pattern only from the start of each hit's token up to the hit.
+        Text without triggers is never touched by the full alternation.
+        """
+        spans: List[Span] = []
+        find_trigger = self.triggers.search
+        match = self.regex.match
+        pos = 0
+        while True:
+            t = find_trigger(text, pos)
+            if t is None:
+                break
+            hit = t.start()
+            q = max(pos, text.rfind(" ", pos, hit) + 1, text.rfind("\n", pos, hit) + 1, text.rfind("\t", pos, hit) + 1)
+            pos = hit + 1
+            while q <= hit:
+                m = match(text, q)
+                v = self._verified(text, m) if m is not None else None
+                if v is None or v.end() == v.start():
+                    q += 1
+                    continue
+                spans.append(Span(v.start(), v.end(), v.lastgroup))
+                pos = v.end()
+                break
+        return tuple(spans)
+
+    def _remember(self, text: str, spans: Tuple[Span, ...]) -> None:
+        cache = self._spans
+        cache[text] = spans
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def scan(self, text: str) -> Tuple[Span, ...]:
+        """Non-overlapping PII spans, left to right."""
+        spans = self._spans.get(text)
+        if spans is None:
+            spans = self._scan(text)
+            self._remember(text, spans)
+        else:
+            self._spans.move_to_end(text)
+        return spans
+
+    def view(self, text: str) -> "MaskedView":
+        """Spans over the original text; the masked string is built on first use."""
+        return MaskedView(self, text, self.scan(text))
+
+    def _render(self, text: str, spans: Tuple[Span, ...]) -> str:
+        if not spans:
+            return text
+        parts: List[str] = []
+        pos = 0
+        for s in spans:
+            parts.append(text[pos : s.start])
+            parts.append(self.placeholder.format(kind=s.kind))
+            pos = s.end
+        parts.append(text[pos:])
+        masked = "".join(parts)
+        if self._masked_is_clean:
+            # Validating the masked text later is a cache lookup, not a scan.
+            self._remember(masked, ())
+        return masked
+
+    def redact(self, text: str) -> Tuple[str, Tuple[Span, ...]]:
+        """(masked text, spans in the original text)."""
+        spans = self.scan(text)
+        return self._render(text, spans), spans
+
+    def mask(self, text: str) -> str:
+        return self.redact(text)[0]
+
+    def is_clean(self, text: str) -> bool:
+        return not self.scan(text)
+
+
+class MaskedView:
+    """
+    Copy-free masking overlay: the original text plus redaction spans.
+    Nothing is allocated until `text` is read, and only once.
+    """
+
+    __slots__ = ("engine", "source", "spans", "_text")
+
+    def __init__(self, engine: RedactionEngine, source: str, spans: Tuple[Span, ...]) -> None:
+        self.engine = engine
+        self.source = source
+        self.spans = spans
+        self._text: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.engine._render(self.source, self.spans)
+        return self._text
+
+    def __str__(self) -> str:
+        return self.text
+
+
+@lru_cache(maxsize=None)
+def _shared_engine(detectors: Tuple[str, ...], placeholder: str) -> RedactionEngine:
+    return RedactionEngine(detectors, placeholder)
+
+
+def get_engine(detectors: Sequence[str] = DEFAULT_DETECTORS, placeholder: str = "[REDACTED]") -> RedactionEngine:
+    """Shared engine per configuration, so masking and validation share one span cache."""
+    return _shared_engine(tuple(detectors), placeholder)
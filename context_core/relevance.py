@@ -0,0 +1,113 @@
+"""
+Relevance primitives for retrieval gating.
+
+Terms are whitespace tokens longer than two characters, lowercased (the
+rule the example gate has always used). The question is tokenized once;
+documents are either scanned with an early exit or looked up in a
+prebuilt InvertedIndex that also carries BM25 statistics.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+
+def terms(text: str) -> FrozenSet[str]:
+    return frozenset(t.lower() for t in text.split() if len(t) > 2)
+
+
+def has_overlap(text: str, query: FrozenSet[str]) -> bool:
+    """
+    True if any term of `text` is in `query`.
+
+    A substring test on the lowercased text rejects most off-topic documents
+    without tokenizing them; otherwise tokens are lowercased lazily and the
+    scan stops at the first hit.
+    """
+    if not query:
+        return False
+    lowered = text.lower()
+    if not any(q in lowered for q in query):
+        return False
+    return not query.isdisjoint(t.lower() for t in text.split() if len(t) > 2)
+
+
+class InvertedIndex:
+    """
+    term -> {doc_id: term frequency}, plus document lengths for BM25.
+
+    Build once per corpus (e.g. at retrieval time) and pass it to the gate,
+    which then decides relevance from postings instead of document text.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_len: Dict[str, int] = {}
+        self.total_len = 0
+
+    @classmethod
+    def build(cls, docs: Iterable[Tuple[str, str]], k1: float = 1.2, b: float = 0.75) -> "InvertedIndex":
+        index = cls(k1=k1, b=b)
+        for doc_id, text in docs:
+            index.add(doc_id, text)
+        return index
+
+    def add(self, doc_id: str, text: str) -> None:
+        if doc_id in self.doc_len:
+            raise ValueError(f"document {doc_id!r} already indexed")
+        n = 0
+        for t in text.split():
+            if len(t) > 2:
+                tf = self.postings.setdefault(t.lower(), {})
+                tf[doc_id] = tf.get(doc_id, 0) + 1
+                n += 1
+        self.doc_len[doc_id] = n
+        self.total_len += n
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self.doc_len
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def matching(self, query: FrozenSet[str]) -> Set[str]:
+        """Ids of documents sharing at least one term with the query."""
+        hits: Set[str] = set()
+        for q in query:
+            hits.update(self.postings.get(q, ()))
+        return hits
+
+    def overlap(self, query: FrozenSet[str]) -> Dict[str, int]:
+        """Number of distinct query terms per matching document."""
+        counts: Dict[str, int] = {}
+        for q in query:
+            for doc_id in self.postings.get(q, ()):
+                counts[doc_id] = counts.get(doc_id, 0) + 1
+        return counts
+
+    def bm25(self, query: FrozenSet[str], doc_ids: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """Okapi BM25 score per matching document (optionally restricted to doc_ids)."""
+        n_docs = len(self.doc_len)
+        if not n_docs:
+            return {}
+        avgdl = self.total_len / n_docs or 1.0
+        allowed = set(doc_ids) if doc_ids is not None else None
+        scores: Dict[str, float] = {}
+        for q in query:
+            posting = self.postings.get(q)
+            if not posting:
+                continue
+            idf = math.log(1.0 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id, tf in posting.items():
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                norm = self.k1 * (1.0 - self.b + self.b * self.doc_len[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+        return scores
+
+    def ranked(self, query: FrozenSet[str], limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        ranked = sorted(self.bm25(query).items(), key=lambda kv: (-kv[1], kv[0]))
+        return ranked if limit is None else ranked[:limit]
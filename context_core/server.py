@@ -0,0 +1,310 @@
+"""
+Long-lived gate service: a small asyncio HTTP/1.1 front end (TCP or Unix
+domain socket) over warm, module-level handlers.
+
+Each route maps a path to handler(body, params) -> result dict, where
+body is the request body as text and params the query string. Handlers
+parse the bundle themselves, so with a process pool the event loop never
+touches bundle JSON. Requests go through a bounded queue drained by one
+consumer per worker; when the queue is full the request is answered
+503 with Retry-After immediately instead of piling up. Connections are
+kept alive, so a client pays connection setup once, not per turn.
+
+    POST /<route>?budget=200     body: bundle JSON   -> 200 result JSON
+    GET  /healthz                                    -> {"ok", "queued"}
+
+Handler errors: ValueError (bad JSON, bad parameters) -> 400, anything
+else -> 500; the body is {"error": "..."} either way.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import errno
+import json
+import os
+import signal
+import stat
+from concurrent.futures import Executor, ProcessPoolExecutor
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from .trace import enable_jsonl
+
+Handler = Callable[[str, Dict[str, str]], Dict[str, Any]]
+
+DEFAULT_QUEUE_SIZE = 256
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_HEADER_LINES = 100
+
+# Errors raised before the body was consumed.
+_CLOSES_CONNECTION = {
+    HTTPStatus.BAD_REQUEST,
+    HTTPStatus.LENGTH_REQUIRED,
+    HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+    HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+}
+
+# (handler, body, params, future for the result)
+_Job = Tuple[Handler, str, Dict[str, str], "asyncio.Future[Dict[str, Any]]"]
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class GateServer:
+    """
+    Serves `routes` over HTTP. workers=0 runs handlers on the event loop
+    (lowest latency for small bundles, one request at a time); otherwise
+    a process pool of `workers` (default: CPU count) runs them, each
+    process keeping its own warm counters and caches. `initializer(*initargs)`
+    runs once in every process that runs handlers (e.g. to enable tracing).
+    """
+
+    def __init__(
+        self,
+        routes: Dict[str, Handler],
+        workers: Optional[int] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        max_body: int = MAX_BODY_BYTES,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple[Any, ...] = (),
+    ) -> None:
+        if queue_size <= 0:
+            raise ValueError("queue_size must be > 0")
+        self.routes = {"/" + path.strip("/"): handler for path, handler in routes.items()}
+        self.workers = (os.cpu_count() or 1) if workers is None else max(0, workers)
+        self.queue_size = queue_size
+        self.max_body = max_body
+        self.initializer = initializer
+        self.initargs = initargs
+        self._queue: Optional["asyncio.Queue[_Job]"] = None
+        self._pool: Optional[Executor] = None
+        self._consumers: List["asyncio.Task[None]"] = []
+        self._servers: List[asyncio.AbstractServer] = []
+
+    # ---- lifecycle ----
+
+    async def start(self, host: Optional[str] = "127.0.0.1", port: int = 8080, unix_path: Optional[str] = None) -> None:
+        """
+        Listens on host:port (host=None to skip TCP) and/or a Unix socket
+        path. A socket left at the path by an earlier run is replaced; any
+        other file there raises FileExistsError.
+        """
+        if unix_path is not None:
+            remove_socket(unix_path)
+        self._queue = asyncio.Queue(self.queue_size)
+        if self.workers:
+            self._pool = ProcessPoolExecutor(self.workers, initializer=self.initializer, initargs=self.initargs)
+        elif self.initializer is not None:
+            self.initializer(*self.initargs)
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(max(1, self.workers))]
+        if host is not None:
+            self._servers.append(await asyncio.start_server(self._connection, host, port))
+        if unix_path is not None:
+            self._servers.append(await asyncio.start_unix_server(self._connection, unix_path))
+        if not self._servers:
+            raise ValueError("nothing to listen on: give a host/port or a unix socket path")
+
+    @property
+    def addresses(self) -> List[Any]:
+        return [sock.getsockname() for server in self._servers for sock in server.sockets]
+
+    async def close(self) -> None:
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+        self._servers, self._consumers, self._pool = [], [], None
+
+    # ---- work ----
+
+    async def _consume(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            handler, body, params, fut = await self._queue.get()
+            try:
+                if self._pool is None:
+                    result = handler(body, params)
+                else:
+                    result = await loop.run_in_executor(self._pool, handler, body, params)
+            except Exception as e:
+                if not fut.done():
+                    fut.set_exception(e)
+            else:
+                if not fut.done():
+                    fut.set_result(result)
+            finally:
+                self._queue.task_done()
+
+    async def submit(self, handler: Handler, body: str, params: Dict[str, str]) -> Dict[str, Any]:
+        """Queues one call; raises HttpError(503) at once if the queue is full."""
+        assert self._queue is not None, "server not started"
+        fut: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((handler, body, params, fut))
+        except asyncio.QueueFull:
+            raise HttpError(HTTPStatus.SERVICE_UNAVAILABLE, "server busy, retry later") from None
+        return await fut
+
+    # ---- HTTP ----
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                keep_alive = True
+                try:
+                    method, target, version, headers = await self._read_head(request_line, reader)
+                    keep_alive = _keep_alive(version, headers)
+                    status, payload = await self._dispatch(method, target, headers, reader)
+                except HttpError as e:
+                    status, payload = e.status, {"error": str(e)}
+                    # The rest of a malformed or unread request cannot be skipped reliably.
+                    keep_alive = keep_alive and e.status not in _CLOSES_CONNECTION
+                except ValueError as e:
+                    status, payload = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+                except Exception as e:
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"}
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_head(
+        self, request_line: bytes, reader: asyncio.StreamReader
+    ) -> Tuple[str, str, str, Dict[str, str]]:
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "malformed request line") from None
+        headers: Dict[str, str] = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return method, target, version, headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "too many headers")
+
+    async def _dispatch(
+        self, method: str, target: str, headers: Dict[str, str], reader: asyncio.StreamReader
+    ) -> Tuple[int, Dict[str, Any]]:
+        url = urlsplit(target)
+        body = await self._read_body(headers, reader)
+        if url.path == "/healthz":
+            assert self._queue is not None
+            return HTTPStatus.OK, {"ok": True, "queued": self._queue.qsize(), "routes": sorted(self.routes)}
+        handler = self.routes.get(url.path)
+        if handler is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"no route {url.path}")
+        if method != "POST":
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, "use POST with a bundle body")
+        params = dict(parse_qsl(url.query))
+        return HTTPStatus.OK, await self.submit(handler, body.decode("utf-8"), params)
+
+    async def _read_body(self, headers: Dict[str, str], reader: asyncio.StreamReader) -> bytes:
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HttpError(HTTPStatus.LENGTH_REQUIRED, "chunked bodies are not supported; send Content-Length")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "bad Content-Length") from None
+        if length > self.max_body:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"body over {self.max_body} bytes")
+        return await reader.readexactly(length) if length > 0 else b""
+
+
+def _keep_alive(version: str, headers: Dict[str, str]) -> bool:
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+def _write_response(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], keep_alive: bool) -> None:
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    status = HTTPStatus(status)
+    head = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    if status == HTTPStatus.SERVICE_UNAVAILABLE:
+        head.append("Retry-After: 1")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+
+def int_param(params: Dict[str, str], name: str, default: int) -> int:
+    """An integer query parameter; ValueError (-> 400) if it is not one."""
+    value = params.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+
+
+def flag_param(params: Dict[str, str], name: str) -> bool:
+    return params.get(name, "").lower() in ("1", "true", "yes")
+
+
+def remove_socket(path: str) -> None:
+    """Unlinks a Unix socket at `path` if there is one; raises FileExistsError for anything else."""
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(errno.EEXIST, "exists and is not a socket; refusing to replace it", path)
+    os.unlink(path)
+
+
+def serve(
+    routes: Dict[str, Handler],
+    host: Optional[str] = "127.0.0.1",
+    port: int = 8080,
+    unix_path: Optional[str] = None,
+    workers: Optional[int] = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    trace_path: Optional[str] = None,
+) -> None:
+    """Runs a GateServer until SIGINT/SIGTERM; `trace_path` appends per-stage traces (JSON lines)."""
+
+    async def _main() -> None:
+        server = GateServer(
+            routes, workers=workers, queue_size=queue_size,
+            initializer=enable_jsonl if trace_path else None, initargs=(trace_path,) if trace_path else (),
+        )
+        await server.start(host, port, unix_path)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        for address in server.addresses:
+            print(f"Listening on {address}", flush=True)
+        try:
+            await stop.wait()
+        finally:
+            await server.close()
+            if unix_path is not None:
+                remove_socket(unix_path)
+
+    asyncio.run(_main())
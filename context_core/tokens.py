@@ -0,0 +1,479 @@
+"""
+Token counting interface, backends and caching.
+
+Gates and scripts only need `count(text) -> int` (and optionally
+`count_many(texts)`). ArtifactTokenCounter adds per-artifact framing
+overhead on top of a backend: the chars-per-token heuristic, a fast
+byte-pair approximation, or exact BPE from a local vocabulary file.
+CachedTokenCounter puts an in-process LRU (and optionally a SQLite file
+shared across runs) in front of any counter, keyed by a hash of the
+content plus the counter's configuration, so an expensive tokenizer runs
+once per distinct text. The SQLite file is written in batches; close (or
+flush) the DiskTokenCache to persist the tail.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import re
+import sqlite3
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Sequence, Tuple, Union
+
+
+class TokenCounter(Protocol):
+    def count(self, text: str) -> int: ...
+
+
+def content_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def counter_namespace(counter: Any) -> str:
+    """
+    Identifies a counter and its configuration, so cached counts from a
+    different backend or setting are never reused.
+    """
+    explicit = getattr(counter, "cache_namespace", None)
+    if explicit:
+        return str(explicit)
+    cls = type(counter)
+    config = sorted(vars(counter).items()) if hasattr(counter, "__dict__") else []
+    return f"{cls.__module__}.{cls.__qualname__}:{config!r}"
+
+
+class DiskTokenCache:
+    """
+    content hash -> count, stored in a SQLite file that survives runs.
+    Writes are buffered and committed `flush_every` entries at a time (and
+    on flush()/close()), so a cold run is not one transaction per text.
+    """
+
+    _BATCH = 500  # stays under SQLite's bound-parameter limit
+
+    def __init__(self, path: Union[str, Path], flush_every: int = 4096) -> None:
+        self.path = str(path)
+        self.flush_every = max(1, flush_every)
+        self._unsaved: Dict[Tuple[str, bytes], int] = {}
+        self.conn = sqlite3.connect(self.path)
+        try:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS token_counts ("
+                " namespace TEXT NOT NULL, digest BLOB NOT NULL, count INTEGER NOT NULL,"
+                " PRIMARY KEY (namespace, digest)) WITHOUT ROWID"
+            )
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.close()
+            raise
+
+    def get_many(self, namespace: str, digests: Sequence[bytes]) -> Dict[bytes, int]:
+        found: Dict[bytes, int] = {}
+        if self._unsaved:
+            for d in digests:
+                v = self._unsaved.get((namespace, d))
+                if v is not None:
+                    found[d] = v
+            digests = [d for d in digests if d not in found]
+        for lo in range(0, len(digests), self._BATCH):
+            chunk = digests[lo : lo + self._BATCH]
+            marks = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT digest, count FROM token_counts WHERE namespace = ? AND digest IN ({marks})",
+                (namespace, *chunk),
+            )
+            found.update(rows)
+        return found
+
+    def put_many(self, namespace: str, items: Dict[bytes, int]) -> None:
+        for d, c in items.items():
+            self._unsaved[(namespace, d)] = c
+        if len(self._unsaved) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._unsaved:
+            return
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO token_counts (namespace, digest, count) VALUES (?, ?, ?)",
+            ((ns, d, c) for (ns, d), c in self._unsaved.items()),
+        )
+        self.conn.commit()
+        self._unsaved.clear()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+
+    def __enter__(self) -> "DiskTokenCache":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class CachedTokenCounter:
+    """
+    Wraps a counter with an LRU of `maxsize` entries and an optional
+    DiskTokenCache. Worth it for real tokenizers; the len()-based heuristic
+    is cheaper than hashing the text.
+    """
+
+    def __init__(
+        self,
+        counter: TokenCounter,
+        maxsize: int = 65536,
+        disk: Optional[DiskTokenCache] = None,
+        namespace: Optional[str] = None,
+    ) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be > 0")
+        self.counter = counter
+        self.maxsize = maxsize
+        self.disk = disk
+        self.namespace = namespace or counter_namespace(counter)
+        self._lru: "OrderedDict[bytes, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, key: bytes, value: int) -> None:
+        self._lru[key] = value
+        if len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def count(self, text: str) -> int:
+        key = content_key(text)
+        cached = self._lru.get(key)
+        if cached is not None:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return cached
+        if self.disk is not None:
+            stored = self.disk.get_many(self.namespace, [key]).get(key)
+            if stored is not None:
+                self.hits += 1
+                self._remember(key, stored)
+                return stored
+        self.misses += 1
+        value = self.counter.count(text)
+        self._remember(key, value)
+        if self.disk is not None:
+            self.disk.put_many(self.namespace, {key: value})
+        return value
+
+    def count_many(self, texts: Iterable[str]) -> List[int]:
+        """Counts a batch with one disk lookup and one inner batch call."""
+        texts = list(texts)
+        keys = [content_key(t) for t in texts]
+        known: Dict[bytes, int] = {}
+        pending: Dict[bytes, str] = {}
+        for k, t in zip(keys, texts):
+            v = self._lru.get(k)
+            if v is not None:
+                self._lru.move_to_end(k)
+                known[k] = v
+            elif k not in known:
+                pending[k] = t
+        loaded: Dict[bytes, int] = {}
+        if pending and self.disk is not None:
+            loaded = self.disk.get_many(self.namespace, list(pending))
+            for k in loaded:
+                del pending[k]
+        if pending:
+            inner_many = getattr(self.counter, "count_many", None)
+            pending_texts = list(pending.values())
+            values = inner_many(pending_texts) if inner_many else [self.counter.count(t) for t in pending_texts]
+            fresh = dict(zip(pending, values))
+            if self.disk is not None:
+                self.disk.put_many(self.namespace, fresh)
+            loaded.update(fresh)
+        self.misses += len(pending)
+        self.hits += len(keys) - len(pending)
+        for k, v in loaded.items():
+            self._remember(k, v)
+        known.update(loaded)
+        return [known[k] for k in keys]
+
+
+# ----------------------------
+# Backends
+# ----------------------------
+
+# GPT-style pre-tokenization (contractions, words, 1-3 digit groups,
+# punctuation runs, whitespace). Stdlib `re` has no \p{L}, so letters are
+# matched as [^\W\d_].
+PRETOKEN_RE = re.compile(r"""'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+""")
+
+PARALLEL_MIN_CHUNK = 256
+
+# The backend a worker process counts with, set once per worker
+_worker_backend: Optional["TokenBackend"] = None
+
+
+def _share_backend(backend: "TokenBackend") -> None:
+    global _worker_backend
+    _worker_backend = backend
+
+
+def _count_shared(texts: List[str]) -> List[int]:
+    assert _worker_backend is not None
+    return _worker_backend._count_chunk(texts)
+
+
+class TokenBackend(ABC):
+    """
+    Counts tokens in raw text. Subclasses implement count_text(); `name`
+    identifies the backend and its configuration (used in cache
+    namespaces). count_many() can fan large batches out to worker
+    processes: the pool is started on first use, receives the backend once
+    per worker and is reused by later calls until close().
+    """
+
+    name = "backend"
+    _pool: Optional[ProcessPoolExecutor] = None
+    _pool_workers = 0
+
+    @abstractmethod
+    def count_text(self, text: str) -> int: ...
+
+    def _count_chunk(self, texts: List[str]) -> List[int]:
+        return [self.count_text(t) for t in texts]
+
+    def _executor(self, workers: int) -> ProcessPoolExecutor:
+        if self._pool is None or self._pool_workers != workers:
+            self.close()
+            self._pool = ProcessPoolExecutor(workers, initializer=_share_backend, initargs=(self,))
+            self._pool_workers = workers
+        return self._pool
+
+    def count_many(self, texts: Iterable[str], workers: int = 1) -> List[int]:
+        texts = list(texts)
+        if workers <= 1 or len(texts) < 2 * PARALLEL_MIN_CHUNK:
+            return self._count_chunk(texts)
+        size = max(PARALLEL_MIN_CHUNK, -(-len(texts) // (workers * 4)))
+        chunks = [texts[i : i + size] for i in range(0, len(texts), size)]
+        return [n for part in self._executor(workers).map(_count_shared, chunks) for n in part]
+
+    def close(self) -> None:
+        """Stops the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> "TokenBackend":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        state.pop("_pool", None)
+        state.pop("_pool_workers", None)
+        return state
+
+
+class HeuristicBackend(TokenBackend):
+    """len(text) // chars_per_token; with min_one, non-empty text costs at least 1."""
+
+    def __init__(self, chars_per_token: int = 4, min_one: bool = False) -> None:
+        self.chars_per_token = max(1, chars_per_token)
+        self.min_one = min_one
+        self.name = f"heuristic:{self.chars_per_token}:{int(min_one)}"
+
+    def count_text(self, text: str) -> int:
+        n = len(text) // self.chars_per_token
+        if n == 0 and self.min_one and text:
+            return 1
+        return n
+
+    def count_lengths(self, lengths: Iterable[int]) -> List[int]:
+        """Counts from text lengths alone (e.g. a columnar bundle's length column)."""
+        cpt = self.chars_per_token
+        if self.min_one:
+            return [max(1, n // cpt) if n else 0 for n in lengths]
+        return [n // cpt for n in lengths]
+
+    def _count_chunk(self, texts: List[str]) -> List[int]:
+        cpt = self.chars_per_token
+        if self.min_one:
+            return [max(1, len(t) // cpt) if t else 0 for t in texts]
+        return [len(t) // cpt for t in texts]
+
+
+class ApproxBPEBackend(TokenBackend):
+    """
+    Fast byte-pair approximation without a vocabulary: pre-tokenizes like a
+    GPT tokenizer and charges each piece what BPE typically does (common
+    words ~1 token, long words one more per `letters_per_token` letters,
+    non-ASCII by UTF-8 bytes, punctuation in pairs).
+    """
+
+    def __init__(self, letters_per_token: int = 8, bytes_per_token: int = 3) -> None:
+        self.letters_per_token = max(1, letters_per_token)
+        self.bytes_per_token = max(1, bytes_per_token)
+        self.name = f"approx-bpe:{self.letters_per_token}:{self.bytes_per_token}"
+
+    def count_text(self, text: str) -> int:
+        total = 0
+        for m in PRETOKEN_RE.finditer(text):
+            piece = m.group()
+            core = piece[1:] if piece[0] == " " and len(piece) > 1 else piece
+            if core.isspace() or core[0] == "'" or core.isdigit():
+                total += 1
+            elif core.isalpha():
+                if core.isascii():
+                    total += 1 + (len(core) - 1) // self.letters_per_token
+                else:
+                    total += 1 + (len(core.encode("utf-8")) - 1) // self.bytes_per_token
+            else:
+                total += (len(core) + 1) // 2
+        return total
+
+
+class BPEBackend(TokenBackend):
+    """
+    Exact byte-level BPE against a locally stored vocabulary in the
+    tiktoken ranks format: one "<base64 token> <rank>" per line. Merges
+    always apply the lowest-ranked adjacent pair; per-piece results are
+    memoized because pieces repeat heavily across a bundle.
+    """
+
+    def __init__(self, ranks: Dict[bytes, int], name: str = "bpe", piece_cache_size: int = 1 << 16) -> None:
+        self.ranks = ranks
+        self.name = name
+        self.piece_cache_size = piece_cache_size
+        self._pieces: Dict[bytes, int] = {}
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "BPEBackend":
+        data = Path(path).read_bytes()
+        ranks: Dict[bytes, int] = {}
+        for lineno, line in enumerate(data.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                token, rank = line.split()
+                ranks[base64.b64decode(token)] = int(rank)
+            except Exception as e:
+                raise ValueError(f"{path}:{lineno}: expected '<base64 token> <rank>'") from e
+        digest = hashlib.blake2b(data, digest_size=8).hexdigest()
+        return cls(ranks, name=f"bpe:{digest}")
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = super().__getstate__()
+        state["_pieces"] = {}
+        return state
+
+    def _merge_count(self, piece: bytes) -> int:
+        ranks = self.ranks
+        if piece in ranks:
+            return 1
+        parts = [piece[i : i + 1] for i in range(len(piece))]
+        while len(parts) > 1:
+            best_rank = None
+            best_i = -1
+            for i in range(len(parts) - 1):
+                r = ranks.get(parts[i] + parts[i + 1])
+                if r is not None and (best_rank is None or r < best_rank):
+                    best_rank, best_i = r, i
+            if best_rank is None:
+                break
+            parts[best_i : best_i + 2] = [parts[best_i] + parts[best_i + 1]]
+        return len(parts)
+
+    def count_text(self, text: str) -> int:
+        pieces = self._pieces
+        total = 0
+        for m in PRETOKEN_RE.finditer(text):
+            piece = m.group().encode("utf-8")
+            n = pieces.get(piece)
+            if n is None:
+                n = self._merge_count(piece)
+                if len(pieces) >= self.piece_cache_size:
+                    pieces.clear()
+                pieces[piece] = n
+            total += n
+        return total
+
+
+class ArtifactTokenCounter:
+    """
+    TokenCounter over a backend: tokens an artifact costs, i.e. its text
+    plus a fixed framing overhead (empty text costs nothing).
+    """
+
+    def __init__(self, backend: TokenBackend, per_artifact_overhead: int = 8, workers: int = 1) -> None:
+        self.backend = backend
+        self.per_artifact_overhead = per_artifact_overhead
+        self.workers = workers
+
+    @property
+    def cache_namespace(self) -> str:
+        return f"{self.backend.name}+{self.per_artifact_overhead}"
+
+    def count(self, text: str) -> int:
+        base = self.backend.count_text(text)
+        if base == 0:
+            return 0
+        return base + self.per_artifact_overhead
+
+    def count_many(self, texts: Iterable[str]) -> List[int]:
+        overhead = self.per_artifact_overhead
+        return [n + overhead if n else 0 for n in self.backend.count_many(texts, workers=self.workers)]
+
+    def count_lengths(self, lengths: Iterable[int]) -> Optional[List[int]]:
+        """count_many() from text lengths, or None if the backend needs the text itself."""
+        by_length = getattr(self.backend, "count_lengths", None)
+        if by_length is None:
+            return None
+        overhead = self.per_artifact_overhead
+        return [n + overhead if n else 0 for n in by_length(lengths)]
+
+    def close(self) -> None:
+        """Stops the backend's worker pool (count_many with workers > 1)."""
+        self.backend.close()
+
+    def __enter__(self) -> "ArtifactTokenCounter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class HeuristicTokenCounter(ArtifactTokenCounter):
+    """
+    The stable ~4 chars/token heuristic shared by the example gates; keeps
+    tests predictable.
+    """
+
+    def __init__(self, chars_per_token: int = 4, per_artifact_overhead: int = 8, min_one: bool = False) -> None:
+        super().__init__(HeuristicBackend(chars_per_token, min_one=min_one), max(0, per_artifact_overhead))
+        self.chars_per_token = self.backend.chars_per_token
+
+
+def make_counter(
+    tokenizer: str = "heuristic",
+    vocab: Optional[Union[str, Path]] = None,
+    chars_per_token: int = 4,
+    per_artifact_overhead: int = 8,
+    workers: int = 1,
+) -> ArtifactTokenCounter:
+    """Builds a counter by backend name: heuristic | approx | bpe (needs vocab)."""
+    if tokenizer == "heuristic":
+        backend: TokenBackend = HeuristicBackend(chars_per_token)
+    elif tokenizer == "approx":
+        backend = ApproxBPEBackend()
+    elif tokenizer == "bpe":
+        if not vocab:
+            raise ValueError("the bpe tokenizer needs a vocabulary file")
+        backend = BPEBackend.from_file(vocab)
+    else:
+        raise ValueError(f"unknown tokenizer {tokenizer!r} (expected heuristic, approx or bpe)")
+    return ArtifactTokenCounter(backend, per_artifact_overhead, workers=workers)
@@ -0,0 +1,251 @@
+"""
+Opt-in per-stage instrumentation for gate pipelines.
+
+Pipelines call start_trace() once; it returns None unless tracing is on,
+so a disabled run costs one context-variable lookup per call and a
+`if trace:` test per stage, with no clock reads or allocations. Pipelines
+that hand start_trace() a token source check tracing_enabled() first, so
+the source is only built for a traced run. When on,
+each lap() records a stage's wall time and the artifacts/tokens that
+entered and left it, and finish() hands the trace to every active tracer.
+
+Tracers are plain callables taking a finished Trace (hooks). Two ship here:
+- JsonlTraceWriter: one JSON line per trace (safe to share between processes)
+- StageAggregator: in-memory percentiles per pipeline stage
+
+    with tracing(JsonlTraceWriter("trace.jsonl"), aggregator):
+        gate_bundle(bundle)
+    aggregator.summary()
+
+    python -m context_core.trace trace.jsonl   # percentile table of a trace file
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ._cli import print_table
+
+Tracer = Callable[["Trace"], None]
+TokenSource = Union[int, Callable[[], int], None]
+
+_TRACERS: ContextVar[Tuple[Tracer, ...]] = ContextVar("context_core_tracers", default=())
+
+
+class Trace:
+    """One pipeline run: stages in order, each {stage, ms, artifacts_in/out, tokens_in/out}."""
+
+    __slots__ = ("pipeline", "stages", "total_ms", "_tracers", "_t0", "_last", "_artifacts", "_tokens")
+
+    def __init__(self, pipeline: str, tracers: Tuple[Tracer, ...], artifacts: Optional[int], tokens: Optional[int]) -> None:
+        self.pipeline = pipeline
+        self.stages: List[Dict[str, Any]] = []
+        self.total_ms = 0.0
+        self._tracers = tracers
+        self._artifacts = artifacts
+        self._tokens = tokens
+        self._t0 = self._last = time.perf_counter()
+
+    def lap(self, stage: str, artifacts: Optional[int] = None, tokens: TokenSource = None) -> None:
+        """
+        Closes `stage` at the current time. `tokens` may be a callable: it is
+        evaluated off the clock, so counting for the trace is not charged to
+        any stage.
+        """
+        now = time.perf_counter()
+        if callable(tokens):
+            tokens = tokens()
+        self.stages.append({
+            "stage": stage,
+            "ms": (now - self._last) * 1000,
+            "artifacts_in": self._artifacts,
+            "artifacts_out": artifacts,
+            "tokens_in": self._tokens,
+            "tokens_out": tokens,
+        })
+        self._artifacts, self._tokens = artifacts, tokens
+        self._t0 += time.perf_counter() - now
+        self._last = time.perf_counter()
+
+    def finish(self) -> None:
+        self.total_ms = (self._last - self._t0) * 1000
+        for tracer in self._tracers:
+            tracer(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"pipeline": self.pipeline, "total_ms": self.total_ms, "stages": self.stages}
+
+
+def tracing_enabled() -> bool:
+    """True if start_trace() would return a Trace; lets callers skip building its inputs."""
+    return bool(_TRACERS.get())
+
+
+def start_trace(pipeline: str, artifacts: Optional[int] = None, tokens: TokenSource = None) -> Optional[Trace]:
+    """A new Trace if any tracer is active, else None (`tokens` is only evaluated when tracing)."""
+    tracers = _TRACERS.get()
+    if not tracers:
+        return None
+    return Trace(pipeline, tracers, artifacts, tokens() if callable(tokens) else tokens)
+
+
+@contextmanager
+def tracing(*tracers: Tracer) -> Iterator[None]:
+    """Enables `tracers` (in addition to any already active) for the enclosed code."""
+    token = _TRACERS.set(_TRACERS.get() + tracers)
+    try:
+        yield
+    finally:
+        _TRACERS.reset(token)
+
+
+def enable(*tracers: Tracer) -> None:
+    """Enables tracers for the rest of the current context (e.g. a worker process)."""
+    _TRACERS.set(_TRACERS.get() + tracers)
+
+
+def enable_jsonl(path: str) -> None:
+    """Process-pool initializer: append this process's traces to `path`."""
+    enable(JsonlTraceWriter(path))
+
+
+# ----------------------------
+# Tracers
+# ----------------------------
+
+class JsonlTraceWriter:
+    """
+    Appends one JSON line per trace. Each line is written and flushed in
+    one call on a file opened for append, so several processes can share
+    the file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, trace: Trace) -> None:
+        self._file.write(json.dumps(trace.to_dict(), separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values (q in 0..100)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class StageAggregator:
+    """
+    Per (pipeline, stage) timing percentiles and mean artifacts/tokens
+    removed. Keeps at most `max_samples` timings per stage (a uniform
+    reservoir sample), so memory stays bounded under real traffic.
+    """
+
+    def __init__(self, max_samples: int = 10000, seed: int = 0) -> None:
+        self.max_samples = max_samples
+        self._rng = random.Random(seed)
+        self._samples: Dict[Tuple[str, str], List[float]] = {}
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._removed: Dict[Tuple[str, str], List[int]] = {}
+
+    def __call__(self, trace: Trace) -> None:
+        self.add(trace.to_dict())
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """Adds one trace (Trace.to_dict() or a parsed JSONL line)."""
+        pipeline = record["pipeline"]
+        stages = list(record["stages"])
+        total = {"stage": "total", "ms": record["total_ms"]}
+        if stages:
+            for field in ("artifacts", "tokens"):
+                # A leading load stage has no input count: its output is the pipeline's input.
+                first = (s.get(f"{field}_{side}") for s in stages for side in ("in", "out"))
+                total[f"{field}_in"] = next((v for v in first if v is not None), None)
+                total[f"{field}_out"] = stages[-1].get(f"{field}_out")
+        stages.append(total)
+        for s in stages:
+            key = (pipeline, s["stage"])
+            n = self._counts.get(key, 0) + 1
+            self._counts[key] = n
+            samples = self._samples.setdefault(key, [])
+            if len(samples) < self.max_samples:
+                samples.append(s["ms"])
+            else:
+                j = self._rng.randrange(n)
+                if j < self.max_samples:
+                    samples[j] = s["ms"]
+            removed = self._removed.setdefault(key, [0, 0])
+            for i, field in enumerate(("artifacts", "tokens")):
+                before, after = s.get(f"{field}_in"), s.get(f"{field}_out")
+                if before is not None and after is not None:
+                    removed[i] += before - after
+
+    def summary(self, percentiles: Sequence[float] = (50, 90, 99)) -> List[Dict[str, Any]]:
+        """One row per (pipeline, stage), in first-seen order."""
+        rows = []
+        for key, samples in self._samples.items():
+            ordered = sorted(samples)
+            n = self._counts[key]
+            row: Dict[str, Any] = {"pipeline": key[0], "stage": key[1], "count": n}
+            for q in percentiles:
+                row[f"p{q:g}_ms"] = percentile(ordered, q)
+            row["max_ms"] = ordered[-1]
+            row["artifacts_removed"] = self._removed[key][0] / n
+            row["tokens_removed"] = self._removed[key][1] / n
+            rows.append(row)
+        return rows
+
+
+# ----------------------------
+# CLI: summarize a JSONL trace
+# ----------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-stage percentiles of a JSON-lines gate trace.")
+    parser.add_argument("traces", nargs="+", help="Trace files written by JsonlTraceWriter.")
+    parser.add_argument("--pipeline", default=None, help="Only this pipeline.")
+    args = parser.parse_args(argv)
+
+    aggregator = StageAggregator(max_samples=1_000_000)
+    try:
+        for path in args.traces:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        if args.pipeline in (None, record["pipeline"]):
+                            aggregator.add(record)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"ERROR: failed to read trace: {e}", file=sys.stderr)
+        return 2
+
+    rows = aggregator.summary()
+    if not rows:
+        print("No traces found.", file=sys.stderr)
+        return 1
+    print_table(
+        [
+            [r["pipeline"], r["stage"], str(r["count"]), f"{r['p50_ms']:.3f}", f"{r['p90_ms']:.3f}",
+             f"{r['p99_ms']:.3f}", f"{r['max_ms']:.3f}", f"{r['artifacts_removed']:.1f}", f"{r['tokens_removed']:.1f}"]
+            for r in rows
+        ],
+        headers=["pipeline", "stage", "count", "p50 ms", "p90 ms", "p99 ms", "max ms", "artifacts -", "tokens -"],
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
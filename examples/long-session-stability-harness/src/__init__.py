@@ -1 +1,3 @@
+from .stabilizer import IncrementalStabilizer, SessionStabilizer, StabilityResult
 
+__all__ = ["IncrementalStabilizer", "SessionStabilizer", "StabilityResult"]
@@ -0,0 +1,98 @@
+"""
+Stabilize many session bundles in one process pool.
+
+    python -m src.batch sessions/ day.jsonl -o results.jsonl --workers 8
+
+Writes one JSON record per bundle, in input order:
+{"source", "kept": [ids], "tokens", "pii_ok", "budget_ok", "order_ok"}
+or {"source", "error"} if the bundle could not be read.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from collections import OrderedDict
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from context_core.batch import (  # noqa: E402
+    DEFAULT_CHUNK_SIZE,
+    BundleTask,
+    iter_bundle_tasks,
+    process_tasks,
+    run_batch,
+    write_jsonl,
+)
+
+from .stabilizer import SessionStabilizer  # noqa: E402
+
+# One stabilizer (and token cache) per worker process and budget: system
+# prompts and tasks repeat across bundles. The budget comes from clients on
+# the server, so only the most recently used few are kept warm.
+MAX_STABILIZERS = 8
+_STABILIZERS: "OrderedDict[int, SessionStabilizer]" = OrderedDict()
+
+
+def _stabilizer(budget: int) -> SessionStabilizer:
+    stabilizer = _STABILIZERS.get(budget)
+    if stabilizer is None:
+        stabilizer = _STABILIZERS[budget] = SessionStabilizer(budget)
+        if len(_STABILIZERS) > MAX_STABILIZERS:
+            _STABILIZERS.popitem(last=False)
+    else:
+        _STABILIZERS.move_to_end(budget)
+    return stabilizer
+
+
+def stabilize_records(records: Iterable[Any], budget: int = 400, with_content: bool = False) -> Dict[str, Any]:
+    stabilizer = _stabilizer(budget)
+    stabilized, result = stabilizer.stabilize_records(records)
+    out: Dict[str, Any] = {
+        "kept": [a.artifact_id for a in stabilized],
+        "tokens": result.used,
+        "pii_ok": result.pii_ok,
+        "budget_ok": result.budget_ok,
+        "order_ok": result.order_ok,
+    }
+    if with_content:
+        # Aligned with "kept"; messages are already masked.
+        out["content"] = [a.content for a in stabilized]
+    return out
+
+
+def stabilize_chunk(tasks: List[BundleTask], budget: int = 400) -> List[Dict[str, Any]]:
+    return process_tasks(tasks, partial(stabilize_records, budget=budget))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Truncate and validate many session bundles in parallel.")
+    parser.add_argument("inputs", nargs="+", help="Bundle files, directories, glob patterns or JSONL of bundles.")
+    parser.add_argument("-o", "--output", default="-", help="Result JSONL path (default: stdout).")
+    parser.add_argument("-b", "--budget", type=int, default=400, help="Token budget per session.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Bundles per submitted task.")
+    args = parser.parse_args(argv)
+
+    records = run_batch(
+        iter_bundle_tasks(args.inputs),
+        partial(stabilize_chunk, budget=args.budget),
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+    try:
+        n, errors = write_jsonl(records, args.output)
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    print(f"Bundles: {n}  Errors: {errors}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,28 +1,31 @@
 from __future__ import annotations
 
-import json
-from importlib.machinery import SourceFileLoader
+import sys
 from pathlib import Path
-from typing import Tuple
+from typing import Iterable, Iterator, Optional, Union
 
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
-def load_bundle(path: Path) -> dict:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+from context_core.tokens import TokenCounter  # noqa: E402
 
+if __package__:
+    from .stabilizer import SessionStabilizer, StabilityResult  # noqa: E402
+else:  # run as a script (python3 examples/long-session-stability-harness/src/runner.py)
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from src.stabilizer import SessionStabilizer, StabilityResult  # noqa: E402
 
-def run(path: Path, budget: int = 400) -> Tuple[int, bool, bool, bool]:
-    truncator = SourceFileLoader("truncator", str(Path(__file__).parent / "truncator.py")).load_module()
-    validator = SourceFileLoader("validator", str(Path(__file__).parent / "validator.py")).load_module()
 
-    bundle = load_bundle(path)
-    stabilized, used = truncator.truncate_session(bundle, budget_tokens=budget)
-    return (
-        used,
-        validator.validate_no_pii(stabilized),
-        validator.validate_budget(stabilized, budget),
-        validator.validate_authority_order(stabilized),
-    )
+def run(path: Path, budget: int = 400, counter: Optional[TokenCounter] = None) -> StabilityResult:
+    return SessionStabilizer(budget, counter).run(path)
+
+
+def run_many(
+    paths: Iterable[Union[str, Path]], budget: int = 400, counter: Optional[TokenCounter] = None
+) -> Iterator[StabilityResult]:
+    """Stabilizes many sessions with one stabilizer (and one token cache)."""
+    return SessionStabilizer(budget, counter).run_many(paths)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+"""
+Serve session stabilization over HTTP (or a Unix socket) with warm caches.
+
+    python -m src.server --port 8081 --workers 4
+    python -m src.server --unix /tmp/stabilizer.sock --workers 0
+
+    curl -s --data-binary @fixtures/session.json 'localhost:8081/stabilize?budget=400&content=1'
+
+POST /stabilize takes a session bundle (object with "artifacts", or a
+list), truncates it (truncate_session) and validates the result:
+{"source", "kept": [ids], "tokens", "pii_ok", "budget_ok", "order_ok"}
+plus "content" (kept artifacts' masked content, aligned with "kept")
+when content=1. Query parameters: budget (default 400), content.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from context_core.batch import load_task_records  # noqa: E402
+from context_core.server import DEFAULT_QUEUE_SIZE, flag_param, int_param, serve  # noqa: E402
+
+from .batch import stabilize_records  # noqa: E402
+
+
+def stabilize_request(body: str, params: Dict[str, str]) -> Dict[str, Any]:
+    source, records = load_task_records(("request", "line", body))
+    result = stabilize_records(
+        records, budget=int_param(params, "budget", 400), with_content=flag_param(params, "content")
+    )
+    return {"source": source, **result}
+
+
+ROUTES = {"/stabilize": stabilize_request}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve session stabilization over HTTP or a Unix socket.")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8081, help="TCP port (default: 8081).")
+    parser.add_argument("--unix", default=None, help="Serve on this Unix socket path instead of TCP.")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Worker processes (default: CPU count; 0 = run on the event loop)."
+    )
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Requests queued before 503.")
+    parser.add_argument(
+        "--trace", default=None, help="Append per-stage traces as JSON lines (summarize: python -m context_core.trace)."
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        serve(
+            ROUTES,
+            host=None if args.unix else args.host,
+            port=args.port,
+            unix_path=args.unix,
+            workers=args.workers,
+            queue_size=args.queue_size,
+            trace_path=args.trace,
+        )
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
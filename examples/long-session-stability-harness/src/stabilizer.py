@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from context_core.bundle_stream import iter_artifact_records  # noqa: E402
+from context_core.tokens import CachedTokenCounter, TokenCounter  # noqa: E402
+
+from . import truncator, validator  # noqa: E402
+from .truncator import Artifact  # noqa: E402
+
+
+class StabilityResult(NamedTuple):
+    used: int
+    pii_ok: bool
+    budget_ok: bool
+    order_ok: bool
+
+
+class SessionStabilizer:
+    """
+    Truncates and validates sessions with modules and regexes loaded once.
+
+    One (cached) counter is shared by truncation and validation, and across
+    sessions, so repeated system prompts and tasks are counted once per
+    stabilizer rather than once per call.
+    """
+
+    def __init__(self, budget_tokens: int = 400, counter: Optional[TokenCounter] = None) -> None:
+        self.budget_tokens = budget_tokens
+        self.counter = counter or CachedTokenCounter(truncator.HeuristicTokenCounter())
+
+    def stabilize(self, artifacts: List[Artifact]) -> Tuple[List[Artifact], StabilityResult]:
+        stabilized, used = truncator.truncate_artifacts(
+            artifacts, budget_tokens=self.budget_tokens, counter=self.counter
+        )
+        return stabilized, StabilityResult(
+            used,
+            validator.validate_no_pii(stabilized),
+            validator.validate_budget(stabilized, self.budget_tokens, counter=self.counter),
+            validator.validate_authority_order(stabilized),
+        )
+
+    def stabilize_records(self, records: Iterable[Any]) -> Tuple[List[Artifact], StabilityResult]:
+        return self.stabilize(list(truncator.iter_artifacts(records)))
+
+    def run(self, path: Union[str, Path]) -> StabilityResult:
+        """Streams one bundle (JSON or JSON Lines) and stabilizes it."""
+        return self.stabilize_records(iter_artifact_records(path))[1]
+
+    def run_many(self, paths: Iterable[Union[str, Path]]) -> Iterator[StabilityResult]:
+        for path in paths:
+            yield self.run(path)
+
+    def incremental(self) -> "IncrementalStabilizer":
+        """A per-session stabilizer for appended turns, sharing this budget and counter."""
+        return IncrementalStabilizer(self.budget_tokens, self.counter)
+
+
+class IncrementalStabilizer:
+    """
+    Stabilizes a growing session turn by turn. Appended artifacts are
+    masked and counted once; check() returns the same result as
+    SessionStabilizer.stabilize() over the whole session so far.
+    """
+
+    def __init__(self, budget_tokens: int = 400, counter: Optional[TokenCounter] = None) -> None:
+        self.budget_tokens = budget_tokens
+        self.counter = counter or CachedTokenCounter(truncator.HeuristicTokenCounter())
+        self.truncator = truncator.IncrementalTruncator(budget_tokens, self.counter)
+
+    def append(self, artifacts: Iterable[Artifact]) -> None:
+        self.truncator.extend(artifacts)
+
+    def append_records(self, records: Iterable[Any]) -> None:
+        self.truncator.append_records(records)
+
+    def check(self) -> Tuple[List[Artifact], StabilityResult]:
+        stabilized, used = self.truncator.result()
+        return stabilized, StabilityResult(
+            used,
+            validator.validate_no_pii(stabilized),
+            used <= self.budget_tokens,
+            validator.validate_authority_order(stabilized),
+        )
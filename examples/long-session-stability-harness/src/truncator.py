@@ -1,89 +1,120 @@
 from __future__ import annotations
 
-import re
-from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple
+import sys
+from array import array
+from bisect import bisect_right
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
 
-@dataclass
-class Artifact:
-    artifact_id: str
-    kind: str
-    authority: str
-    priority: int
-    title: str
-    content: str
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
+from context_core.artifact import Artifact, safe_int  # noqa: E402
+from context_core.redaction import DEFAULT_DETECTORS, get_engine  # noqa: E402
+from context_core.tokens import HeuristicTokenCounter, TokenCounter  # noqa: E402
+from context_core.trace import Trace, start_trace, tracing_enabled  # noqa: E402
 
-def _safe_int(x: Any, default: int = 0) -> int:
-    try:
-        return int(x)
-    except Exception:
-        return default
 
-
-def load_bundle(bundle: Dict[str, Any]) -> List[Artifact]:
-    artifacts: List[Artifact] = []
-    for i, raw in enumerate(bundle.get("artifacts", [])):
+def iter_artifacts(records: Iterable[Any], start: int = 0) -> Iterator[Artifact]:
+    """
+    Normalizes raw artifact records one at a time (non-objects are skipped).
+    `start` offsets the default a{i} ids, for records appended to a session.
+    """
+    for i, raw in enumerate(records, start):
         if not isinstance(raw, dict):
             continue
-        artifacts.append(
-            Artifact(
-                artifact_id=str(raw.get("id") or f"a{i}"),
-                kind=str(raw.get("kind") or "other"),
-                authority=str(raw.get("authority") or "other"),
-                priority=_safe_int(raw.get("priority"), 0),
-                title=str(raw.get("title") or ""),
-                content=str(raw.get("content") or ""),
-            )
+        yield Artifact(
+            artifact_id=str(raw.get("id") or f"a{i}"),
+            kind=str(raw.get("kind") or "other"),
+            authority=str(raw.get("authority") or "other"),
+            priority=safe_int(raw.get("priority"), 0),
+            title=str(raw.get("title") or ""),
+            content=str(raw.get("content") or ""),
         )
-    return artifacts
-
 
-class HeuristicTokenCounter:
-    def __init__(self, chars_per_token: int = 4, overhead: int = 8) -> None:
-        self.chars_per_token = max(1, chars_per_token)
-        self.overhead = max(0, overhead)
 
-    def count(self, text: str) -> int:
-        base = len(text) // self.chars_per_token
-        if base == 0:
-            return 0
-        return base + self.overhead
+def load_bundle(bundle: Dict[str, Any]) -> List[Artifact]:
+    return list(iter_artifacts(bundle.get("artifacts", [])))
 
 
-PII_RE = re.compile(r"[0-9]{3,}")
+# Production detectors plus the harness's catch-all for any 3+ digit run.
+PII_DETECTORS = DEFAULT_DETECTORS + ("digits",)
 
 
 def mask_pii(text: str) -> str:
-    return PII_RE.sub("[REDACTED]", text)
+    return get_engine(PII_DETECTORS).mask(text)
 
 
-def truncate_session(bundle: Dict[str, Any], budget_tokens: int = 400) -> Tuple[List[Artifact], int]:
+def masked(a: Artifact) -> Artifact:
+    """`a` itself if it has no PII, else a masked copy (the caller's object is left as is)."""
+    view = get_engine(PII_DETECTORS).view(a.content)
+    return a.replace(content=view.text) if view.spans else a
+
+
+def truncate_session(
+    bundle: Dict[str, Any],
+    budget_tokens: int = 400,
+    counter: Optional[TokenCounter] = None,
+    trace: Optional[Trace] = None,
+) -> Tuple[List[Artifact], int]:
     """
     Simple stabilizer:
-    - Masks obvious PII
     - Keeps system/task and latest 2 messages
+    - Masks obvious PII in the kept messages (masked copies; inputs are not modified)
     - Drops verbose tool logs if over budget
+
+    With tracing on (context_core.trace), records per-stage time, artifacts
+    and tokens; pass an open `trace` to record into it instead.
     """
+    own = trace is None
+    trace = trace or start_trace("truncate")
     artifacts = load_bundle(bundle)
+    if trace:
+        counter = counter or HeuristicTokenCounter()
+        trace.lap("load", len(artifacts), _token_sum(counter, artifacts))
+    result = truncate_artifacts(artifacts, budget_tokens=budget_tokens, counter=counter, trace=trace)
+    if trace and own:
+        trace.finish()
+    return result
+
+
+def _token_sum(counter: TokenCounter, artifacts: Iterable[Artifact]) -> Callable[[], int]:
+    """Deferred token total for trace laps (evaluated off the stage clock)."""
+    return lambda: sum(counter.count(a.content) for a in artifacts)
+
+
+def truncate_artifacts(
+    artifacts: List[Artifact],
+    budget_tokens: int = 400,
+    counter: Optional[TokenCounter] = None,
+    trace: Optional[Trace] = None,
+) -> Tuple[List[Artifact], int]:
+    """truncate_session() over already-normalized artifacts (e.g. from a streamed bundle)."""
     if not artifacts:
         return [], 0
 
-    counter = HeuristicTokenCounter()
+    counter = counter or HeuristicTokenCounter()
+    own = trace is None
+    if own and tracing_enabled():
+        trace = start_trace("truncate", len(artifacts), _token_sum(counter, artifacts))
     kept: List[Artifact] = []
 
     # Always keep system/task
     system_like = [a for a in artifacts if a.kind in {"system", "task"}]
     messages = [a for a in artifacts if a.kind == "message"]
     others = [a for a in artifacts if a.kind not in {"system", "task", "message"}]
-
-    # Mask PII in messages
-    for m in messages:
-        m.content = mask_pii(m.content)
+    if trace:
+        candidates = system_like + messages[-2:] + others
+        trace.lap("split", len(candidates), _token_sum(counter, candidates))
 
     kept.extend(system_like)
-    kept.extend(messages[-2:])  # keep last 2 messages
+    # Keep last 2 messages; only those are masked.
+    kept.extend(masked(m) for m in messages[-2:])
+    if trace:
+        trace.lap("mask", len(kept) + len(others), _token_sum(counter, kept + others))
 
     used = sum(counter.count(a.content) for a in kept)
     for a in others:
@@ -95,7 +126,185 @@ def truncate_session(bundle: Dict[str, Any], budget_tokens: int = 400) -> Tuple[
             # skip if over budget
             continue
 
+    if trace:
+        trace.lap("pack", len(kept), used)
+
     # Ensure deterministic ordering: system/task first, then remaining by priority
     kept = sorted(kept, key=lambda a: (-1 if a.kind in {"system", "task"} else 0, -a.priority))
-    total_tokens = sum(counter.count(a.content) for a in kept)
-    return kept, total_tokens
+    if trace:
+        trace.lap("order", len(kept), used)
+        if own:
+            trace.finish()
+    # Every kept artifact was counted exactly once above.
+    return kept, used
+
+
+# ----------------------------
+# Incremental truncation
+# ----------------------------
+
+_INF = float("inf")
+
+
+def _by_priority(a: Artifact) -> int:
+    return -a.priority
+
+
+class _MinTree:
+    """Append-only segment tree over token counts: next index with count <= x."""
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.size = 1
+        self.tree = [_INF, _INF]
+
+    def append(self, value: int) -> None:
+        if self.n == self.size:
+            leaves = self.tree[self.size : self.size + self.n]
+            self.size *= 2
+            self.tree = [_INF] * (2 * self.size)
+            self.tree[self.size : self.size + self.n] = leaves
+            for i in range(self.size - 1, 0, -1):
+                self.tree[i] = min(self.tree[2 * i], self.tree[2 * i + 1])
+        i = self.size + self.n
+        self.n += 1
+        self.tree[i] = value
+        i >>= 1
+        while i and self.tree[i] > value:
+            self.tree[i] = value
+            i >>= 1
+
+    def first_at_most(self, lo: int, x: int) -> int:
+        """Smallest index >= lo whose value is <= x, or -1."""
+        if lo >= self.n:
+            return -1
+        tree = self.tree
+        i = lo + self.size
+        while tree[i] > x:
+            while i & 1:
+                i >>= 1
+            if not i:
+                return -1
+            i += 1
+        while i < self.size:
+            i = 2 * i if tree[2 * i] <= x else 2 * i + 1
+        return i - self.size
+
+
+class IncrementalTruncator:
+    """
+    truncate_artifacts() maintained across appends.
+
+    Each appended artifact is counted once and, if it is a message, masked
+    once (as a copy). System/task tokens,
+    the last two messages and the admitted non-message artifacts (with
+    their running token totals) are kept between calls. When the fixed part
+    changes, the first-fit pass over other artifacts restarts from the
+    first decision that can change and jumps straight to the next artifact
+    that fits, so a turn costs O(delta + changed admissions * log n)
+    instead of a full recount. result() equals truncate_artifacts() over
+    everything appended so far.
+    """
+
+    def __init__(self, budget_tokens: int = 400, counter: Optional[TokenCounter] = None) -> None:
+        self.budget_tokens = budget_tokens
+        self.counter = counter or HeuristicTokenCounter()
+        self.records = 0
+        self.system_like: List[Artifact] = []
+        self.system_tokens = 0
+        self.last_messages: Deque[Tuple[Artifact, int]] = deque(maxlen=2)
+        self.others: List[Artifact] = []
+        self.other_tokens = array("q")
+        self._fits = _MinTree()
+        # admitted other rows, ascending, with inclusive running token sums
+        self.admitted: List[int] = []
+        self.admitted_cum: List[int] = []
+        # result() caches: system/task sort only changes when one is appended
+        self._system_sorted: Optional[List[Artifact]] = None
+        self._kept: Optional[List[Artifact]] = None
+
+    @property
+    def base_tokens(self) -> int:
+        return self.system_tokens + sum(t for _, t in self.last_messages)
+
+    @property
+    def used(self) -> int:
+        return self.base_tokens + (self.admitted_cum[-1] if self.admitted_cum else 0)
+
+    def append_records(self, records: Iterable[Any]) -> None:
+        """Appends raw records; default ids continue from earlier calls."""
+        records = list(records)
+        self.extend(iter_artifacts(records, start=self.records))
+        self.records += len(records)
+
+    def extend(self, artifacts: Iterable[Artifact]) -> None:
+        for a in artifacts:
+            self.append(a)
+
+    def append(self, a: Artifact) -> None:
+        if a.kind in {"system", "task"}:
+            old_base = self.base_tokens
+            self.system_like.append(a)
+            self._system_sorted = None
+            self.system_tokens += self.counter.count(a.content)
+            self._rebase(old_base)
+        elif a.kind == "message":
+            old_base = self.base_tokens
+            a = masked(a)
+            self.last_messages.append((a, self.counter.count(a.content)))
+            self._rebase(old_base)
+        else:
+            t = self.counter.count(a.content)
+            row = len(self.others)
+            self.others.append(a)
+            self.other_tokens.append(t)
+            self._fits.append(t)
+            if self.used + t <= self.budget_tokens:
+                self._admit(row, t)
+        self._kept = None
+
+    def _admit(self, row: int, t: int) -> None:
+        self.admitted.append(row)
+        self.admitted_cum.append((self.admitted_cum[-1] if self.admitted_cum else 0) + t)
+
+    def _rebase(self, old_base: int) -> None:
+        base = self.base_tokens
+        if base == old_base:
+            return
+        cum = self.admitted_cum
+        if base > old_base:
+            # Admitted rows stay admitted while their running total still fits;
+            # rejected rows only get harder to fit.
+            k = bisect_right(cum, self.budget_tokens - base)
+        else:
+            # Everything before the first rejected row stays admitted.
+            lo, hi = 0, len(self.admitted)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self.admitted[mid] == mid:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            k = lo
+        start = self.admitted[k - 1] + 1 if k else 0
+        if k == len(self.admitted) and (base > old_base or start >= len(self.others)):
+            return
+        del self.admitted[k:]
+        del cum[k:]
+        remaining = self.budget_tokens - base - (cum[-1] if cum else 0)
+        tokens = self.other_tokens
+        row = self._fits.first_at_most(start, remaining)
+        while row >= 0:
+            self._admit(row, tokens[row])
+            remaining -= tokens[row]
+            row = self._fits.first_at_most(row + 1, remaining)
+
+    def result(self) -> Tuple[List[Artifact], int]:
+        """(kept, used), exactly as truncate_artifacts() would return them."""
+        if self._system_sorted is None:
+            self._system_sorted = sorted(self.system_like, key=_by_priority)
+        if self._kept is None:
+            tail = [a for a, _ in self.last_messages]
+            tail.extend(self.others[i] for i in self.admitted)
+            self._kept = self._system_sorted + sorted(tail, key=_by_priority)
+        return list(self._kept), self.used
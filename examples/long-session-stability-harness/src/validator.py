@@ -1,41 +1,32 @@
 from __future__ import annotations
 
-import re
-from dataclasses import dataclass
-from typing import List
+import sys
+from pathlib import Path
+from typing import List, Optional
 
 
-@dataclass
-class Artifact:
-    artifact_id: str
-    kind: str
-    authority: str
-    priority: int
-    title: str
-    content: str
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
+from context_core.artifact import Artifact  # noqa: E402
+from context_core.redaction import DEFAULT_DETECTORS, get_engine  # noqa: E402
+from context_core.tokens import HeuristicTokenCounter, TokenCounter  # noqa: E402
 
-class HeuristicTokenCounter:
-    def __init__(self, chars_per_token: int = 4, overhead: int = 8) -> None:
-        self.chars_per_token = max(1, chars_per_token)
-        self.overhead = max(0, overhead)
 
-    def count(self, text: str) -> int:
-        base = len(text) // self.chars_per_token
-        if base == 0:
-            return 0
-        return base + self.overhead
-
-
-PII_RE = re.compile(r"[0-9]{3,}")
+# Same detectors (and shared engine) as truncator.mask_pii: content masked
+# there is recognised from the span cache instead of being scanned again.
+PII_DETECTORS = DEFAULT_DETECTORS + ("digits",)
 
 
 def validate_no_pii(artifacts: List[Artifact]) -> bool:
-    return all(not PII_RE.search(a.content) for a in artifacts)
+    engine = get_engine(PII_DETECTORS)
+    return all(engine.is_clean(a.content) for a in artifacts)
 
 
-def validate_budget(artifacts: List[Artifact], budget_tokens: int) -> bool:
-    counter = HeuristicTokenCounter()
+def validate_budget(artifacts: List[Artifact], budget_tokens: int, counter: Optional[TokenCounter] = None) -> bool:
+    """Pass the counter used for truncation (e.g. a CachedTokenCounter) to avoid recounting."""
+    counter = counter or HeuristicTokenCounter()
     total = sum(counter.count(a.content) for a in artifacts)
     return total <= budget_tokens
 
@@ -0,0 +1,140 @@
+import json
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+from context_core.artifact import Artifact  # noqa: E402
+from context_core.freshness import (  # noqa: E402
+    FreshnessIndex,
+    freshness_gate,
+    parse_timestamp,
+    parse_ttl,
+    parse_ttl_overrides,
+)
+
+TTLS = {"system": None, "task": None, "message": 100, "tool_output": 10, "document": 50, "other": 30}
+KINDS = ["system", "task", "message", "tool_output", "document", "other"]
+SCOPES = [None, "billing", "support"]
+
+
+def make(i: int, kind: str, ts, scope=None) -> Artifact:
+    return Artifact(f"a{i}", kind, "tool", 0, f"A{i}", f"content {i}", scope=scope,
+                    timestamp=None if ts is None else str(ts))
+
+
+def test_parse_timestamp_forms():
+    assert parse_timestamp("2024-05-01T00:00:00Z") == 1714521600
+    assert parse_timestamp("2024-05-01T02:00:00+02:00") == 1714521600
+    assert parse_timestamp("2024-05-01") == 1714521600
+    assert parse_timestamp("1714521600") == parse_timestamp(1714521600.7) == 1714521600
+    for bad in (None, "", "yesterday", "nan", True):
+        assert parse_timestamp(bad) is None
+    assert [parse_ttl(v) for v in ("90", "15m", "2h", "1.5d", "none")] == [90, 900, 7200, 129600, None]
+    with pytest.raises(ValueError):
+        parse_ttl("soon")
+    assert parse_ttl_overrides(["tool_output=1m"], base=TTLS)["tool_output"] == 60
+
+
+def test_index_expires_exactly_what_a_rescan_finds():
+    for seed in range(300):
+        rng = random.Random(seed)
+        index = FreshnessIndex(TTLS)
+        live = {}  # key -> artifact
+        now = 0
+        for step in range(rng.randint(1, 120)):
+            op = rng.random()
+            if op < 0.6:
+                key = rng.randrange(40)
+                ts = None if rng.random() < 0.1 else now + rng.randint(-60, 5)
+                a = make(key, rng.choice(KINDS), ts, rng.choice(SCOPES))
+                index.add(a, key=key)
+                live[key] = a
+            elif op < 0.75:
+                key = rng.randrange(40)
+                index.discard(key)
+                live.pop(key, None)
+            else:
+                now += rng.randint(0, 30)
+                scope = rng.choice(SCOPES + [...])
+                expected = sorted(
+                    (int(a.timestamp) + TTLS[a.kind], k)
+                    for k, a in live.items()
+                    if TTLS[a.kind] is not None and a.timestamp is not None
+                    and int(a.timestamp) + TTLS[a.kind] <= now and (scope is ... or a.scope == scope)
+                )
+                stale = index.expire(now, scope=scope)
+                assert sorted(stale) == sorted(k for _, k in expected), seed
+                for k in stale:
+                    del live[k]
+        tracked = {k for k, a in live.items() if TTLS[a.kind] is not None and a.timestamp is not None}
+        assert len(index) == len(tracked)
+        assert all(k in index for k in tracked)
+
+
+def test_index_memory_stays_bounded_under_replacement():
+    index = FreshnessIndex(TTLS)
+    for ts in range(10000):
+        index.add(make(0, "tool_output", ts, "billing"))
+    assert len(index) == 1
+    assert len(index._heaps["billing"]) <= 3
+    assert index.next_expiry() == 9999 + 10
+    assert index.expire(10008) == []
+    assert index.expire(10009) == ["a0"]
+
+
+def test_freshness_gate_reasons_in_input_order():
+    artifacts = [
+        make(0, "system", None),
+        make(1, "tool_output", 0),
+        make(2, "tool_output", 95),
+        make(3, "document", None),
+        make(4, "message", 1, "billing"),
+        make(5, "tool_output", 0),
+    ]
+    fresh, rejected = freshness_gate(artifacts, now=100, ttls=TTLS, missing="reject")
+    assert [a.artifact_id for a in fresh] == ["a0", "a2", "a4"]
+    assert [(a.artifact_id, r) for a, r in rejected] == [("a1", "stale"), ("a3", "unknown"), ("a5", "stale")]
+    fresh, rejected = freshness_gate(artifacts, now=100, ttls=TTLS)
+    assert [a.artifact_id for a in fresh] == ["a0", "a2", "a3", "a4"]
+    with pytest.raises(ValueError):
+        freshness_gate(artifacts, now=100, missing="maybe")
+
+
+def run(script: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, script, *args], cwd=REPO_ROOT, text=True, capture_output=True)
+
+
+def test_freshness_scripts_run(tmp_path):
+    bundle = {"artifacts": [
+        {"id": "sys", "kind": "system", "authority": "system", "content": "Follow policy."},
+        {"id": "log1", "kind": "tool_output", "authority": "tool", "timestamp": "2024-05-01T09:00:00Z",
+         "content": "fetched 10 rows"},
+        {"id": "doc1", "kind": "document", "authority": "tool", "scope": "billing",
+         "timestamp": "2024-04-20T00:00:00Z", "content": "refund policy"},
+        {"id": "log2", "kind": "tool_output", "authority": "tool", "timestamp": "2024-05-01T10:30:00Z",
+         "content": "fetched 12 rows"},
+    ]}
+    path = tmp_path / "session.json"
+    path.write_text(json.dumps(bundle))
+    out = tmp_path / "fresh.jsonl"
+
+    for script in ("30-control-mechanisms/validation/scripts/freshness_gate_demo.py",
+                   "skills/operator/drift-arrest/scripts/freshness_gate_demo.py"):
+        result = run(script, "-i", str(path), "--ttl", "tool_output=1h", "-o", str(out))
+        assert result.returncode == 0, result.stderr
+        assert "Freshness Gate" in result.stdout
+        assert [json.loads(line)["id"] for line in out.read_text().splitlines()] == ["sys", "log2"]
+
+    detector = "skills/operator/drift-arrest/scripts/stale_artifact_detector.py"
+    result = run(detector, "-i", str(path), "--ttl", "tool_output=1h", "--fail-on-stale")
+    assert result.returncode == 1
+    assert "log1" in result.stdout and "doc1" in result.stdout
+    result = run(detector, "-i", str(path), "--now", "2024-05-01T09:30:00Z", "--scope", "-", "--fail-on-stale")
+    assert result.returncode == 0, result.stdout
+    assert run(detector, "-i", str(path), "--ttl", "oops").returncode == 2
@@ -0,0 +1,57 @@
+import copy
+import json
+import random
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+import truncator  # type: ignore
+
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "session.json"
+KINDS = ["system", "task", "message", "message", "message", "tool_output", "document", "other"]
+
+
+def random_records(rng, n):
+    return [
+        {
+            "id": f"x{i}",
+            "kind": rng.choice(KINDS),
+            "authority": "user",
+            "priority": rng.randint(0, 5),
+            "content": "word " * rng.choice([0, 1, 3, 10, 40, 120]) + ("call 5551234" if rng.random() < 0.2 else ""),
+        }
+        for i in range(n)
+    ]
+
+
+def full(records, budget):
+    return truncator.truncate_artifacts(list(truncator.iter_artifacts(copy.deepcopy(records))), budget)
+
+
+def test_incremental_matches_full_recompute_after_every_append():
+    for seed in range(150):
+        rng = random.Random(seed)
+        records = random_records(rng, rng.randint(0, 60))
+        budget = rng.choice([0, 20, 60, 150, 400])
+        inc = truncator.IncrementalTruncator(budget)
+        pos = 0
+        while pos < len(records):
+            step = rng.randint(1, 4)
+            inc.append_records(copy.deepcopy(records[pos : pos + step]))
+            pos += step
+            assert inc.result() == full(records[:pos], budget), (seed, pos)
+
+
+def test_incremental_fixture_and_default_ids():
+    records = json.loads(FIXTURE.read_text())["artifacts"]
+    for r in records:
+        del r["id"]
+    inc = truncator.IncrementalTruncator(200)
+    for r in records:
+        inc.append_records([copy.deepcopy(r)])
+    kept, used = inc.result()
+    expected, expected_used = full(records, 200)
+    assert (kept, used) == (expected, expected_used)
+    assert [a.artifact_id for a in kept] == ["a0", "a1", "a3", "a4", "a5"]
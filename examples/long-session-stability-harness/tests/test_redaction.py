@@ -0,0 +1,77 @@
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+import truncator  # type: ignore  # noqa: F401  (puts the repo root on sys.path)
+from context_core.redaction import RedactionEngine, luhn_ok  # type: ignore  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "session.json"
+
+
+def kinds(engine, text):
+    return [s.kind for s in engine.scan(text)]
+
+
+def test_detectors_in_one_pass():
+    engine = RedactionEngine(placeholder="<{kind}>")
+    text = (
+        "Mail jane.doe@example.co.uk or call +1 (555) 123-4567. "
+        "Card 4111 1111 1111 1111, IBAN GB82 WEST 1234 5698 7654 32, key sk-abcdefghijklmnop1234."
+    )
+    assert kinds(engine, text) == ["email", "phone", "card", "iban", "api_key"]
+    masked, spans = engine.redact(text)
+    assert masked.startswith("Mail <email> or call <phone>. Card <card>, IBAN <iban>, key <api_key>.")
+    assert [text[s.start : s.end] for s in spans][0] == "jane.doe@example.co.uk"
+
+
+def test_failed_verification_falls_through_to_later_detectors():
+    assert luhn_ok("4111111111111111") and not luhn_ok("4111111111111112")
+    engine = RedactionEngine(["card", "digits"])
+    assert kinds(engine, "4111 1111 1111 1112") == ["digits"] * 4
+    assert kinds(RedactionEngine(), "released 2024-01-31, build 17") == []
+
+
+def test_validation_reuses_spans_from_masking():
+    engine = RedactionEngine()
+    masked = engine.mask("reach me at 555-123-4567")
+    engine._scan = None  # any rescan would fail
+    assert engine.is_clean(masked)
+    assert not engine.is_clean("reach me at 555-123-4567")
+
+
+def test_redaction_demo_runs():
+    result = subprocess.run(
+        [sys.executable, "30-control-mechanisms/masking/scripts/redaction_demo.py", "--input", str(FIXTURE)],
+        cwd=REPO_ROOT, text=True, capture_output=True, check=True,
+    )
+    assert "Redaction Demo" in result.stdout
+    assert "hist3" in result.stdout
+
+
+def test_masked_view_is_lazy():
+    engine = RedactionEngine()
+    view = engine.view("card 4111 1111 1111 1111")
+    assert view._text is None and view.spans
+    assert view.text == "card [REDACTED]" and str(view) is view.text
+    clean = engine.view("nothing here")
+    assert clean.text is clean.source
+
+
+def test_truncation_masks_only_kept_messages_without_mutating_inputs():
+    import json
+
+    from context_core.redaction import get_engine  # type: ignore
+
+    artifacts = truncator.load_bundle(json.loads(FIXTURE.read_text()))
+    dropped = next(a for a in artifacts if a.artifact_id == "hist1")
+    dropped.content = "User: my card is 4000 0000 0000 0002"
+    before = [a.replace() for a in artifacts]
+    kept, _ = truncator.truncate_artifacts(artifacts, budget_tokens=200)
+    assert artifacts == before
+    assert dropped.content not in get_engine(truncator.PII_DETECTORS)._spans
+    hist3 = next(a for a in kept if a.artifact_id == "hist3")
+    assert "[REDACTED]" in hist3.content and hist3 is not artifacts[4]
@@ -0,0 +1,81 @@
+import importlib.util
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "session.json"
+
+
+def load_harness():
+    name = "long_session_harness"
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, SRC / "__init__.py", submodule_search_locations=[str(SRC)])
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+class CountingCounter:
+    def __init__(self, inner) -> None:
+        self.inner = inner
+        self.calls = 0
+
+    def count(self, text: str) -> int:
+        self.calls += 1
+        return self.inner.count(text)
+
+
+def test_run_many_matches_run_and_counts_repeated_sessions_once():
+    harness = load_harness()
+    runner = importlib.import_module("long_session_harness.runner")
+    expected = runner.run(FIXTURE)
+    assert tuple(expected) == (102, True, True, True)
+
+    from context_core.tokens import CachedTokenCounter
+
+    inner = CountingCounter(harness.stabilizer.truncator.HeuristicTokenCounter())
+    stabilizer = harness.SessionStabilizer(400, CachedTokenCounter(inner))
+    first = stabilizer.run(FIXTURE)
+    calls = inner.calls
+    assert list(stabilizer.run_many([FIXTURE, str(FIXTURE)])) == [first, first] == [expected, expected]
+    assert inner.calls == calls
+
+
+def test_runner_runs_as_a_script():
+    result = subprocess.run([sys.executable, str(SRC / "runner.py")], text=True, capture_output=True)
+    assert result.returncode == 0, result.stderr
+    assert "Tokens used: 102" in result.stdout
+
+
+def test_incremental_stabilizer_checks_each_turn_like_a_full_run():
+    import json
+
+    harness = load_harness()
+    records = json.loads(FIXTURE.read_text())["artifacts"]
+    session = harness.SessionStabilizer(200).incremental()
+    for r in records:
+        session.append_records([dict(r)])
+    stabilized, result = session.check()
+    expected, expected_result = harness.SessionStabilizer(200).stabilize_records(records)
+    assert stabilized == expected
+    assert result == expected_result
+
+
+def test_batch_keeps_a_bounded_number_of_warm_stabilizers():
+    import json
+
+    load_harness()
+    batch = importlib.import_module("long_session_harness.batch")
+    records = json.loads(FIXTURE.read_text())["artifacts"]
+    batch._STABILIZERS.clear()
+    for budget in range(100, 100 + 3 * batch.MAX_STABILIZERS):
+        batch.stabilize_records([dict(r) for r in records], budget)
+    assert len(batch._STABILIZERS) == batch.MAX_STABILIZERS
+    assert list(batch._STABILIZERS)[-1] == 100 + 3 * batch.MAX_STABILIZERS - 1
+
+    oldest = next(iter(batch._STABILIZERS))
+    batch.stabilize_records([dict(r) for r in records], oldest)
+    assert list(batch._STABILIZERS)[-1] == oldest
+    assert len(batch._STABILIZERS) == batch.MAX_STABILIZERS
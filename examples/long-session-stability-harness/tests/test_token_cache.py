@@ -0,0 +1,163 @@
+import base64
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+import truncator  # type: ignore
+import validator  # type: ignore
+from context_core.tokens import (  # type: ignore  # noqa: E402
+    ApproxBPEBackend,
+    BPEBackend,
+    CachedTokenCounter,
+    DiskTokenCache,
+    HeuristicTokenCounter,
+    TokenBackend,
+    content_key,
+    make_counter,
+)
+
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "session.json"
+REPORT = Path(__file__).resolve().parents[3] / "skills/operator/context-triage/scripts/context_budget_report.py"
+
+
+class CountingCounter:
+    def __init__(self) -> None:
+        self.inner = truncator.HeuristicTokenCounter()
+        self.calls = 0
+
+    def count(self, text: str) -> int:
+        self.calls += 1
+        return self.inner.count(text)
+
+
+def test_truncate_then_validate_counts_each_text_once():
+    bundle = json.loads(FIXTURE.read_text())
+    inner = CountingCounter()
+    counter = CachedTokenCounter(inner)
+    stabilized, used = truncator.truncate_session(bundle, budget_tokens=200, counter=counter)
+    calls_after_truncation = inner.calls
+    assert validator.validate_budget(stabilized, 200, counter=counter)
+    assert inner.calls == calls_after_truncation
+    assert used == sum(truncator.HeuristicTokenCounter().count(a.content) for a in stabilized)
+
+
+def test_disk_cache_is_shared_across_counters(tmp_path):
+    texts = ["alpha beta gamma", "delta epsilon", "alpha beta gamma"]
+    with DiskTokenCache(tmp_path / "tokens.sqlite") as disk:
+        first = CachedTokenCounter(CountingCounter(), disk=disk, namespace="heuristic")
+        assert first.count_many(texts) == [truncator.HeuristicTokenCounter().count(t) for t in texts]
+        assert first.counter.calls == 2
+
+    with DiskTokenCache(tmp_path / "tokens.sqlite") as disk:
+        second = CachedTokenCounter(CountingCounter(), disk=disk, namespace="heuristic")
+        second.count_many(texts)
+        assert second.count(texts[1]) == first.count(texts[1])
+        assert second.counter.calls == 0
+
+
+def test_disk_cache_commits_in_batches(tmp_path):
+    path = tmp_path / "tokens.sqlite"
+    texts = [f"text {i}" for i in range(5)]
+    with DiskTokenCache(path, flush_every=3) as disk:
+        counter = CachedTokenCounter(CountingCounter(), maxsize=1, disk=disk, namespace="heuristic")
+        counts = [counter.count(t) for t in texts]
+        with DiskTokenCache(path) as other:
+            assert len(other.get_many("heuristic", [content_key(t) for t in texts])) == 3
+        assert counter.count(texts[4]) == counts[4]  # evicted from the LRU, still buffered
+        assert counter.counter.calls == 5
+
+    with DiskTokenCache(path) as disk:  # close() wrote the rest
+        assert CachedTokenCounter(CountingCounter(), disk=disk, namespace="heuristic").count_many(texts) == counts
+
+
+def test_budget_report_opens_the_cache_only_for_a_valid_run(tmp_path):
+    cache = tmp_path / "tokens.sqlite"
+
+    def report(*args):
+        return subprocess.run(
+            [sys.executable, str(REPORT), "-i", str(FIXTURE), "--token-cache", str(cache), *args],
+            text=True, capture_output=True,
+        )
+
+    assert report("--budget", "0").returncode == 2
+    assert not cache.exists()
+    result = report("--budget", "400")
+    assert result.returncode == 0, result.stderr
+    with sqlite3.connect(cache) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM token_counts").fetchone()[0] > 0
+
+
+def test_heuristic_counter_matches_previous_rule():
+    counter = HeuristicTokenCounter()
+    texts = ["", "abc", "hello world, how are you today?"]
+    assert [counter.count(t) for t in texts] == [0, 0, 15]
+    assert counter.count_many(texts) == [counter.count(t) for t in texts]
+
+
+def test_bpe_backend_merges_lowest_rank_first(tmp_path):
+    vocab = [b"a", b"b", b"c", b" ", b"ab", b"abc", b" ab"]
+    lines = [f"{base64.b64encode(tok).decode()} {rank}" for rank, tok in enumerate(vocab)]
+    path = tmp_path / "tiny.tiktoken"
+    path.write_text("\n".join(lines) + "\n")
+    backend = BPEBackend.from_file(path)
+    assert backend.count_text("abc") == 1
+    assert backend.count_text("abc ab") == 2
+    assert backend.count_text("cab") == 2
+    counter = make_counter("bpe", vocab=path, per_artifact_overhead=0)
+    assert counter.count_many(["abc", "abc ab", ""]) == [1, 2, 0]
+
+
+def test_approx_backend_is_close_to_word_count_for_prose():
+    text = "The retrieval gate admits documents that overlap with the question."
+    n = ApproxBPEBackend().count_text(text)
+    assert len(text.split()) <= n <= len(text.split()) + 4
+
+
+def test_backend_must_implement_count_text():
+    class Incomplete(TokenBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def chunked_texts(n=20_000, size=1024):
+    texts = [f"retrieval gate word{i} " * 25 for i in range(n)]
+    return [texts[i : i + size] for i in range(0, n, size)]
+
+
+def test_parallel_count_many_reuses_one_pool():
+    chunks = chunked_texts(n=2048, size=1024)
+    backend = ApproxBPEBackend()
+    serial = [backend.count_many(c) for c in chunks]
+    with backend:
+        first = backend.count_many(chunks[0], workers=2)
+        pool = backend._pool
+        assert pool is not None
+        assert [first] + [backend.count_many(c, workers=2) for c in chunks[1:]] == serial
+        assert backend._pool is pool
+    assert backend._pool is None
+
+
+@pytest.mark.skipif((os.cpu_count() or 1) < 2, reason="needs two CPUs")
+def test_parallel_count_many_is_not_slower_than_serial():
+    chunks = chunked_texts()  # the report counts 1024 artifacts per call
+    backend = ApproxBPEBackend()
+    start = time.perf_counter()
+    serial = [backend.count_many(c) for c in chunks]
+    serial_time = time.perf_counter() - start
+    with backend:
+        start = time.perf_counter()
+        parallel = [backend.count_many(c, workers=2) for c in chunks]
+        parallel_time = time.perf_counter() - start
+    assert parallel == serial
+    assert parallel_time <= serial_time * 1.1
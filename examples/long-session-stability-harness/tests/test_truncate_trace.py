@@ -0,0 +1,25 @@
+import json
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+from truncator import truncate_session  # type: ignore  # noqa: E402
+from context_core.trace import tracing  # noqa: E402
+
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "session.json"
+
+
+def test_truncate_trace_records_each_stage():
+    bundle = json.loads(FIXTURE.read_text())
+    traces = []
+    with tracing(traces.append):
+        kept, used = truncate_session(bundle, budget_tokens=400)
+    (trace,) = traces
+    assert [s["stage"] for s in trace.stages] == ["load", "split", "mask", "pack", "order"]
+    for before, after in zip(trace.stages, trace.stages[1:]):
+        assert (after["artifacts_in"], after["tokens_in"]) == (before["artifacts_out"], before["tokens_out"])
+    assert trace.stages[1]["artifacts_out"] < trace.stages[0]["artifacts_out"]  # older messages dropped
+    assert trace.stages[-1]["artifacts_out"] == len(kept)
+    assert trace.stages[-1]["tokens_out"] == used
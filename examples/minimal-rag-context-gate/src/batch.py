@@ -0,0 +1,110 @@
+"""
+Gate many bundles in one process pool.
+
+    python -m src.batch bundles/ day.jsonl 'archive/**/*.json' -o results.jsonl --workers 8
+
+Writes one JSON record per bundle, in input order:
+{"source", "admitted": [ids], "excluded": [[id, reason], ...], "tokens"}
+or {"source", "error"} if the bundle could not be read.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from context_core.batch import (  # noqa: E402
+    DEFAULT_CHUNK_SIZE,
+    BundleTask,
+    iter_bundle_tasks,
+    process_tasks,
+    run_batch,
+    write_jsonl,
+)
+from context_core.columnar import ColumnarBundle  # noqa: E402
+from context_core.tokens import CachedTokenCounter  # noqa: E402
+
+from .context_assembler import assemble_context  # noqa: E402
+from .gates import HeuristicTokenCounter, gate_artifacts, gate_columnar, iter_artifacts  # noqa: E402
+
+# One cache per worker process: system prompts and tasks repeat across bundles.
+_COUNTER: Optional[CachedTokenCounter] = None
+
+
+def _counter() -> CachedTokenCounter:
+    global _COUNTER
+    if _COUNTER is None:
+        _COUNTER = CachedTokenCounter(HeuristicTokenCounter())
+    return _COUNTER
+
+
+def gate_records(
+    records: Iterable[Any], budget: int = 120, max_docs: int = 3, with_context: bool = False
+) -> Dict[str, Any]:
+    counter = _counter()
+    admitted, excluded = gate_artifacts(
+        list(iter_artifacts(records)), budget_tokens=budget, max_docs=max_docs, counter=counter
+    )
+    result: Dict[str, Any] = {
+        "admitted": [a.artifact_id for a in admitted],
+        "excluded": [[a.artifact_id, reason] for a, reason in excluded],
+        "tokens": sum(counter.count(a.content) for a in admitted),
+    }
+    if with_context:
+        result["context"] = assemble_context(admitted)
+    return result
+
+
+def gate_columnar_bundle(bundle: ColumnarBundle, budget: int = 120, max_docs: int = 3) -> Dict[str, Any]:
+    """gate_records() for a memory-mapped .ctxb bundle: only what the gate reads is decoded."""
+    counter = _counter()
+    admitted, excluded = gate_columnar(bundle, budget_tokens=budget, max_docs=max_docs, counter=counter.counter)
+    return {
+        "admitted": [a.artifact_id for a in admitted],
+        "excluded": [[artifact_id, reason] for artifact_id, reason in excluded],
+        "tokens": sum(counter.count(a.content) for a in admitted),
+    }
+
+
+def gate_chunk(tasks: List[BundleTask], budget: int = 120, max_docs: int = 3) -> List[Dict[str, Any]]:
+    return process_tasks(
+        tasks,
+        partial(gate_records, budget=budget, max_docs=max_docs),
+        columnar_fn=partial(gate_columnar_bundle, budget=budget, max_docs=max_docs),
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Gate many bundles (directories, globs, JSONL) in parallel.")
+    parser.add_argument("inputs", nargs="+", help="Bundle files, directories, glob patterns or JSONL of bundles.")
+    parser.add_argument("-o", "--output", default="-", help="Result JSONL path (default: stdout).")
+    parser.add_argument("-b", "--budget", type=int, default=120, help="Token budget per bundle.")
+    parser.add_argument("--max-docs", type=int, default=3, help="Maximum documents admitted per bundle.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Bundles per submitted task.")
+    args = parser.parse_args(argv)
+
+    records = run_batch(
+        iter_bundle_tasks(args.inputs),
+        partial(gate_chunk, budget=args.budget, max_docs=args.max_docs),
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+    try:
+        n, errors = write_jsonl(records, args.output)
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    print(f"Bundles: {n}  Errors: {errors}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,8 +1,24 @@
 from __future__ import annotations
 
-from typing import List
+import codecs
+import io
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
-from .gates import Artifact
+from .gates import Artifact, HeuristicTokenCounter, TokenCounter
+
+
+class Placement(NamedTuple):
+    """Where one artifact's frame landed in the assembled context (end-exclusive)."""
+
+    artifact_id: str
+    byte_start: int
+    byte_end: int
+    token_start: int
+    token_end: int
+
+
+def frame_header(a: Artifact) -> str:
+    return f"[{a.kind}:{a.artifact_id}] "
 
 
 def assemble_context(artifacts: List[Artifact]) -> str:
@@ -12,5 +28,73 @@ def assemble_context(artifacts: List[Artifact]) -> str:
     """
     parts: List[str] = []
     for a in artifacts:
-        parts.append(f"[{a.kind}:{a.artifact_id}] {a.content}")
+        parts.append(f"{frame_header(a)}{a.content}")
     return "\n".join(parts)
+
+
+def _iter_frames(
+    artifacts: Iterable[Artifact],
+    counter: Optional[TokenCounter],
+    encoding: str,
+    as_bytes: bool,
+) -> Iterator[Tuple[Tuple[Any, ...], Placement]]:
+    """
+    Yields (pieces, placement) per artifact: one encoded frame, or for text
+    output the header and the content as is (the content is not copied).
+    """
+    counter = counter or HeuristicTokenCounter()
+    ascii_safe = codecs.lookup(encoding).name in ("utf-8", "ascii")
+    byte_pos = token_pos = 0
+    for i, a in enumerate(artifacts):
+        sep = "\n" if i else ""
+        head = sep + frame_header(a)
+        if as_bytes:
+            pieces: Tuple[Any, ...] = ((head + a.content).encode(encoding),)
+            size = len(pieces[0])
+        else:
+            pieces = (head, a.content)
+            if ascii_safe and head.isascii() and a.content.isascii():
+                size = len(head) + len(a.content)
+            else:
+                size = len(head.encode(encoding)) + len(a.content.encode(encoding))
+        start = byte_pos + len(sep)
+        byte_pos += size
+        tokens = counter.count(a.content)
+        yield pieces, Placement(a.artifact_id, start, byte_pos, token_pos, token_pos + tokens)
+        token_pos += tokens
+
+
+def iter_context_chunks(
+    artifacts: Iterable[Artifact],
+    counter: Optional[TokenCounter] = None,
+    encoding: str = "utf-8",
+) -> Iterator[Tuple[bytes, Placement]]:
+    """
+    assemble_context() as encoded chunks, one per artifact, each with its
+    placement. Joining the chunks gives the encoded context; nothing larger
+    than one artifact is held. Token offsets follow the gate's accounting
+    (counter.count(content) per artifact).
+    """
+    for (chunk,), placement in _iter_frames(artifacts, counter, encoding, as_bytes=True):
+        yield chunk, placement
+
+
+def write_context(
+    artifacts: Iterable[Artifact],
+    sink: Any,
+    counter: Optional[TokenCounter] = None,
+    encoding: str = "utf-8",
+) -> List[Placement]:
+    """
+    Streams the framed context into `sink` and returns each artifact's
+    placement. Text sinks (io.TextIOBase) receive str; anything else
+    (io.BufferedWriter, BytesIO, socket files) receives bytes. Byte offsets
+    are in `encoding` either way.
+    """
+    placements: List[Placement] = []
+    as_bytes = not isinstance(sink, io.TextIOBase)
+    for pieces, placement in _iter_frames(artifacts, counter, encoding, as_bytes):
+        for piece in pieces:
+            sink.write(piece)
+        placements.append(placement)
+    return placements
@@ -1,122 +1,193 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple
+import sys
+from concurrent.futures import Executor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 
-@dataclass
-class Artifact:
-    artifact_id: str
-    kind: str
-    authority: str
-    priority: int
-    title: str
-    content: str
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
+from context_core.admission import (  # noqa: E402
+    cap_rows,
+    pack_greedy,
+    pack_knapsack,
+    pinned_rows,
+    rank_desc,
+    score_columns,
+    select_greedy,
+)
+from context_core.artifact import KIND_CODE, Artifact, ArtifactBatch, safe_int  # noqa: E402
+from context_core.columnar import ColumnarBundle  # noqa: E402
+from context_core.isolation import ScopePolicy, map_partitions, merge_by_authority, partition_by_scope  # noqa: E402
+from context_core.precedence import DEFAULT_WEIGHTS  # noqa: E402
+from context_core.relevance import InvertedIndex, has_overlap, terms  # noqa: E402
+from context_core.tokens import HeuristicTokenCounter, TokenCounter  # noqa: E402
+from context_core.trace import Trace, start_trace, tracing_enabled  # noqa: E402
 
-AUTHORITY_WEIGHT = {
-    "system": 1000,
-    "developer": 800,
-    "user": 600,
-    "tool": 400,
-    "other": 200,
-}
 
-KIND_WEIGHT = {
-    "system": 120,
-    "task": 100,
-    "message": 60,
-    "document": 50,
-    "tool_output": 40,
-    "other": 10,
-}
+# The shared precedence policy (context_core/precedence.json), compiled once:
+# score() indexes lists by the artifact's kind/authority codes.
+WEIGHTS = DEFAULT_WEIGHTS
 
+SOLVERS = ("greedy", "topk", "knapsack")
 
-def _safe_int(x: Any, default: int = 0) -> int:
-    try:
-        return int(x)
-    except Exception:
-        return default
 
-
-def load_bundle(bundle: Dict[str, Any]) -> List[Artifact]:
-    artifacts: List[Artifact] = []
-    for i, raw in enumerate(bundle.get("artifacts", [])):
+def iter_artifacts(records: Iterable[Any]) -> Iterator[Artifact]:
+    """Normalizes raw artifact records one at a time (non-objects are skipped)."""
+    for i, raw in enumerate(records):
         if not isinstance(raw, dict):
             continue
-        artifacts.append(
-            Artifact(
-                artifact_id=str(raw.get("id") or raw.get("artifact_id") or f"a{i}"),
-                kind=str(raw.get("kind") or "other"),
-                authority=str(raw.get("authority") or "other"),
-                priority=_safe_int(raw.get("priority"), 0),
-                title=str(raw.get("title") or ""),
-                content=str(raw.get("content") or ""),
-            )
+        scope = raw.get("scope")
+        timestamp = raw.get("timestamp")
+        yield Artifact(
+            artifact_id=str(raw.get("id") or raw.get("artifact_id") or f"a{i}"),
+            kind=str(raw.get("kind") or "other"),
+            authority=str(raw.get("authority") or "other"),
+            priority=safe_int(raw.get("priority"), 0),
+            title=str(raw.get("title") or ""),
+            content=str(raw.get("content") or ""),
+            scope=str(scope) if scope is not None else None,
+            timestamp=str(timestamp) if timestamp is not None else None,
         )
-    return artifacts
-
 
-class HeuristicTokenCounter:
-    """Stable heuristic; keeps tests predictable."""
 
-    def __init__(self, chars_per_token: int = 4, per_artifact_overhead: int = 8) -> None:
-        self.chars_per_token = max(1, chars_per_token)
-        self.per_artifact_overhead = max(0, per_artifact_overhead)
-
-    def count(self, text: str) -> int:
-        base = len(text) // self.chars_per_token
-        if base == 0:
-            return 0
-        return base + self.per_artifact_overhead
+def load_bundle(bundle: Dict[str, Any]) -> List[Artifact]:
+    return list(iter_artifacts(bundle.get("artifacts", [])))
 
 
 def _relevance_score(text: str, question: str) -> int:
     """Tiny overlap heuristic to filter obviously off-topic docs."""
-    q_tokens = {t.lower() for t in question.split() if len(t) > 2}
-    t_tokens = {t.lower() for t in text.split() if len(t) > 2}
+    q_tokens = terms(question)
     if not q_tokens:
         return 0
-    return len(q_tokens & t_tokens)
+    return len(q_tokens & terms(text))
+
+
+def _off_topic(
+    docs: Iterable[Tuple[str, Union[str, Callable[[], str]]]],
+    question: str,
+    index: Optional[InvertedIndex] = None,
+) -> List[bool]:
+    """
+    Flags, aligned with `docs` (artifact_id, content), for documents sharing
+    no term with the question.
+
+    The question is tokenized once. Documents present in `index` are decided
+    from its postings; any others fall back to an early-exit text scan.
+    Content may be a callable, called only when the text is scanned.
+    """
+    query = terms(question)
+    matching = index.matching(query) if index is not None and query else set()
+    flags: List[bool] = []
+    for artifact_id, content in docs:
+        if index is not None and artifact_id in index:
+            flags.append(artifact_id not in matching)
+        else:
+            flags.append(not has_overlap(content() if callable(content) else content, query))
+    return flags
 
 
 def score(artifact: Artifact) -> int:
-    return AUTHORITY_WEIGHT.get(artifact.authority, 0) + KIND_WEIGHT.get(artifact.kind, 0) + artifact.priority
+    return WEIGHTS.score(artifact)
 
 
 def gate_bundle(
     bundle: Dict[str, Any],
     budget_tokens: int = 120,
     max_docs: int = 3,
+    index: Optional[InvertedIndex] = None,
+    counter: Optional[TokenCounter] = None,
+    solver: str = "greedy",
+    trace: Optional[Trace] = None,
 ) -> Tuple[List[Artifact], List[Tuple[Artifact, str]]]:
     """
     Applies a minimal selection/ordering/budget gate.
 
+    Pass a prebuilt InvertedIndex over the bundle's documents (keyed by
+    artifact id) to decide relevance without rescanning document text, and
+    a (cached) counter to share token counts across calls. solver="knapsack"
+    replaces first-fit budget packing with an optimal one; solver="topk"
+    admits the same artifacts as greedy without ranking the whole bundle
+    (see gate_batch).
+
+    With tracing on (context_core.trace), every gate records per-stage time,
+    artifacts and tokens; pass an open `trace` to record into it instead.
+
     Returns (admitted, excluded_with_reason).
     """
+    own = trace is None
+    trace = trace or start_trace("gate")
     artifacts = load_bundle(bundle)
+    if trace:
+        counter = counter or HeuristicTokenCounter()
+        trace.lap("load", len(artifacts), _token_sum(counter, artifacts))
+    result = gate_artifacts(
+        artifacts, budget_tokens=budget_tokens, max_docs=max_docs, index=index, counter=counter,
+        solver=solver, trace=trace,
+    )
+    if trace and own:
+        trace.finish()
+    return result
+
+
+def _token_sum(counter: TokenCounter, artifacts: Iterable[Artifact]) -> Callable[[], int]:
+    """Deferred token total for trace laps (evaluated off the stage clock)."""
+    return lambda: sum(counter.count(a.content) for a in artifacts)
+
+
+def gate_artifacts(
+    artifacts: List[Artifact],
+    budget_tokens: int = 120,
+    max_docs: int = 3,
+    index: Optional[InvertedIndex] = None,
+    counter: Optional[TokenCounter] = None,
+    solver: str = "greedy",
+    trace: Optional[Trace] = None,
+    question: Optional[str] = None,
+) -> Tuple[List[Artifact], List[Tuple[Artifact, str]]]:
+    """
+    gate_bundle() over already-normalized artifacts (e.g. from a streamed
+    bundle). Relevance is judged against `question` if given, else against
+    the first message.
+    """
+    if solver != "greedy":
+        return gate_artifacts_batched(
+            artifacts, budget_tokens, max_docs, index, counter, solver=solver, trace=trace, question=question
+        )
     if not artifacts:
         return [], []
 
+    counter = counter or HeuristicTokenCounter()
+    own = trace is None
+    if own and tracing_enabled():
+        trace = start_trace("gate", len(artifacts), _token_sum(counter, artifacts))
+
     # Identify user question for simple relevance check
-    user_q = next((a.content for a in artifacts if a.kind == "message"), "")
+    user_q = question if question is not None else next((a.content for a in artifacts if a.kind == "message"), "")
 
-    counter = HeuristicTokenCounter()
     admitted: List[Artifact] = []
     excluded: List[Tuple[Artifact, str]] = []
 
     # Filter obviously off-topic documents
+    docs = ((a.artifact_id, a.content) for a in artifacts if a.kind == "document")
+    off_topic = iter(_off_topic(docs, user_q, index))
     filtered: List[Artifact] = []
     for a in artifacts:
-        if a.kind == "document":
-            rel = _relevance_score(a.content, user_q)
-            if rel == 0:
-                excluded.append((a, "out_of_scope"))
-                continue
+        if a.kind == "document" and next(off_topic):
+            excluded.append((a, "out_of_scope"))
+            continue
         filtered.append(a)
+    if trace:
+        trace.lap("relevance", len(filtered), _token_sum(counter, filtered))
 
     # Sort by authority/kind/priority
     ranked = sorted(filtered, key=score, reverse=True)
+    if trace:
+        trace.lap("rank", len(ranked), _token_sum(counter, ranked))
 
     used = 0
     doc_count = 0
@@ -136,4 +207,229 @@ def gate_bundle(
         admitted.append(a)
         used += t
 
+    if trace:
+        trace.lap("pack", len(admitted), used)
+        if own:
+            trace.finish()
+    return admitted, excluded
+
+
+def gate_batch(
+    batch: ArtifactBatch,
+    budget_tokens: int = 120,
+    max_docs: int = 3,
+    index: Optional[InvertedIndex] = None,
+    counter: Optional[TokenCounter] = None,
+    solver: str = "greedy",
+    time_limit: float = 0.05,
+    trace: Optional[Trace] = None,
+    question: Optional[str] = None,
+) -> Tuple[List[int], List[Tuple[int, str]]]:
+    """
+    Columnar gate_artifacts(): same decisions, returned as row indices.
+
+    Scores, ranking, the doc cap and budget packing run over parallel
+    arrays (NumPy when available) instead of one Artifact at a time.
+
+    solver="knapsack" gives system/developer authority greedy's decisions,
+    then picks the subset of the rest (at most max_docs documents) with the
+    highest total score that fits the remaining budget, within `time_limit`
+    seconds (falling back to the best packing found). Greedy's own
+    admission is the starting point, so the total score is never below
+    greedy's. Admitted rows keep rank order either way.
+
+    solver="topk" makes greedy's decisions (same rows, same reasons) but
+    pulls candidates from a heap only until the remaining budget is below
+    the smallest one left, instead of sorting every row. Rows never pulled
+    are excluded after the ranked ones, in input order.
+
+    `question` replaces the first message as the relevance query (e.g. for
+    a scope partition that does not contain the question).
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"unknown solver {solver!r} (expected one of {', '.join(SOLVERS)})")
+    n = len(batch)
+    if not n:
+        return [], []
+    own = trace is None
+    trace = trace or start_trace("gate_batch", n)
+
+    counter = counter or HeuristicTokenCounter()
+    tokens = _count_column(counter, batch.contents)
+    if trace:
+        trace.lap("count", n, sum(tokens))
+
+    message, document = KIND_CODE["message"], KIND_CODE["document"]
+    kinds, contents = batch.kind, batch.contents
+    if question is None:
+        question = next((contents[i] for i in range(n) if kinds[i] == message), "")
+
+    ids = batch.ids
+    doc_rows = [i for i in range(n) if kinds[i] == document]
+    off_topic = set()
+    docs = ((ids[i], partial(contents.__getitem__, i)) for i in doc_rows)
+    for i, off in zip(doc_rows, _off_topic(docs, question, index)):
+        if off:
+            off_topic.add(i)
+    excluded: List[Tuple[int, str]] = []
+    candidates: List[int] = []
+    for i in range(n):
+        if i in off_topic:
+            excluded.append((i, "out_of_scope"))
+        else:
+            candidates.append(i)
+    if trace:
+        trace.lap("relevance", len(candidates), lambda: sum(tokens[i] for i in candidates))
+
+    scores = score_columns(batch.authority, kinds, batch.priority, WEIGHTS)
+    is_doc = [k == document and t > 0 for k, t in zip(kinds, tokens)]
+    if solver == "topk":
+        admitted, ranked, rest = select_greedy(scores.tolist(), tokens, budget_tokens, candidates, is_doc, max_docs)
+        excluded.extend((i, "doc_cap" if reason == "cap" else reason) for i, reason in ranked + rest)
+        if trace:
+            trace.lap("select", len(admitted), lambda: sum(tokens[i] for i in admitted))
+            if own:
+                trace.finish()
+        return admitted, excluded
+
+    order = rank_desc(scores, candidates)
+    if trace:
+        trace.lap("rank", len(order), lambda: sum(tokens[i] for i in order))
+    if solver == "knapsack":
+        admitted_flags = pack_knapsack(
+            order, tokens, scores.tolist(), budget_tokens,
+            pinned=pinned_rows(batch.authority), capped=is_doc, cap=max_docs, time_limit=time_limit,
+        )
+        docs_admitted = sum(1 for i in order if admitted_flags[i] and is_doc[i])
+        capped = bytearray(is_doc[i] and docs_admitted >= max_docs for i in range(n))
+    else:
+        capped = cap_rows(order, is_doc, max_docs)
+        admitted_flags = pack_greedy(order, tokens, budget_tokens, blocked=capped)
+
+    admitted: List[int] = []
+    for i in order:
+        if admitted_flags[i]:
+            admitted.append(i)
+        elif tokens[i] == 0:
+            excluded.append((i, "empty"))
+        elif capped[i]:
+            excluded.append((i, "doc_cap"))
+        else:
+            excluded.append((i, "budget"))
+    if trace:
+        trace.lap("pack", len(admitted), lambda: sum(tokens[i] for i in admitted))
+        if own:
+            trace.finish()
     return admitted, excluded
+
+
+def _count_column(counter: TokenCounter, contents: Sequence[str]) -> List[int]:
+    """Token counts for a content column; from stored lengths when the counter allows (nothing decoded)."""
+    lengths = getattr(contents, "char_lengths", None)
+    count_lengths = getattr(counter, "count_lengths", None)
+    if lengths is not None and count_lengths is not None:
+        tokens = count_lengths(lengths)
+        if tokens is not None:
+            return tokens
+    count_many = getattr(counter, "count_many", None)
+    return count_many(contents) if count_many else [counter.count(c) for c in contents]
+
+
+def gate_columnar(
+    bundle: ColumnarBundle,
+    budget_tokens: int = 120,
+    max_docs: int = 3,
+    index: Optional[InvertedIndex] = None,
+    counter: Optional[TokenCounter] = None,
+    solver: str = "greedy",
+) -> Tuple[List[Artifact], List[Tuple[str, str]]]:
+    """
+    gate_bundle() over a memory-mapped .ctxb bundle. Only the question,
+    the documents checked for relevance (none that `index` covers) and the
+    admitted artifacts are decoded; with a heuristic counter, token counts
+    come from the stored lengths.
+
+    Returns (admitted, [(artifact_id, reason)]).
+    """
+    rows, excluded = gate_batch(bundle.batch(), budget_tokens, max_docs, index, counter, solver=solver)
+    ids = bundle.ids
+    return bundle.take(rows), [(ids[i], reason) for i, reason in excluded]
+
+
+def gate_artifacts_batched(
+    artifacts: List[Artifact],
+    budget_tokens: int = 120,
+    max_docs: int = 3,
+    index: Optional[InvertedIndex] = None,
+    counter: Optional[TokenCounter] = None,
+    solver: str = "greedy",
+    trace: Optional[Trace] = None,
+    question: Optional[str] = None,
+) -> Tuple[List[Artifact], List[Tuple[Artifact, str]]]:
+    """gate_artifacts() computed through gate_batch()."""
+    own = trace is None
+    trace = trace or start_trace("gate", len(artifacts))
+    batch = ArtifactBatch.from_artifacts(artifacts)
+    if trace:
+        trace.lap("columns", len(batch))
+    rows, excluded = gate_batch(
+        batch, budget_tokens, max_docs, index, counter, solver=solver, trace=trace, question=question
+    )
+    if trace and own:
+        trace.finish()
+    return [artifacts[i] for i in rows], [(artifacts[i], reason) for i, reason in excluded]
+
+
+# (artifacts, budget, max_docs, question, index, counter, solver)
+_ScopeTask = Tuple[List[Artifact], int, int, str, Optional[InvertedIndex], Optional[TokenCounter], str]
+
+
+def _gate_scope(task: _ScopeTask) -> Tuple[List[Artifact], List[Tuple[Artifact, str]]]:
+    artifacts, budget, max_docs, question, index, counter, solver = task
+    return gate_artifacts(
+        artifacts, budget_tokens=budget, max_docs=max_docs, index=index, counter=counter,
+        solver=solver, question=question,
+    )
+
+
+def gate_scoped(
+    artifacts: List[Artifact],
+    policy: Optional[ScopePolicy] = None,
+    max_docs: int = 3,
+    index: Optional[InvertedIndex] = None,
+    counter: Optional[TokenCounter] = None,
+    solver: str = "greedy",
+    executor: Optional[Executor] = None,
+) -> Tuple[List[Artifact], List[Tuple[Artifact, str]]]:
+    """
+    gate_artifacts() run separately for every scope (context_core.isolation).
+
+    The bundle is partitioned by scope in one pass. Scopes the policy does
+    not allow are excluded whole ("scope_denied"); every other scope,
+    including the unscoped partition, is gated against its own budget and
+    document cap, with relevance judged against the bundle's question.
+    Pass an executor to gate the scopes in parallel.
+
+    Returns (admitted merged in authority order, excluded partition by partition).
+    """
+    policy = policy or ScopePolicy()
+    question = next((a.content for a in artifacts if a.kind == "message"), "")
+    parts = partition_by_scope(a.scope for a in artifacts)
+    denied: Dict[Optional[str], List[Tuple[Artifact, str]]] = {}
+    tasks: List[_ScopeTask] = []
+    for scope, rows in parts.items():
+        if policy.allows(scope):
+            tasks.append(([artifacts[i] for i in rows], policy.budget(scope), max_docs, question, index, counter, solver))
+        else:
+            denied[scope] = [(artifacts[i], "scope_denied") for i in rows]
+    results = iter(map_partitions(_gate_scope, tasks, executor))
+    admitted: List[List[Artifact]] = []
+    excluded: List[Tuple[Artifact, str]] = []
+    for scope in parts:
+        if scope in denied:
+            excluded.extend(denied[scope])
+        else:
+            scope_admitted, scope_excluded = next(results)
+            admitted.append(scope_admitted)
+            excluded.extend(scope_excluded)
+    return merge_by_authority(admitted, WEIGHTS), excluded
@@ -1,25 +1,36 @@
 from __future__ import annotations
 
-import json
+import sys
 from pathlib import Path
-from typing import Tuple
+from typing import Any, List, Tuple
 
-from .gates import Artifact, gate_bundle
-from .context_assembler import assemble_context
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
+from context_core.bundle_stream import iter_artifact_records  # noqa: E402
 
-def load_bundle(path: Path) -> dict:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+from .gates import Artifact, gate_artifacts, iter_artifacts  # noqa: E402
+from .context_assembler import Placement, assemble_context, write_context  # noqa: E402
+
+
+def load_artifacts(path: Path) -> List[Artifact]:
+    """Streams the bundle (JSON or JSON Lines) straight into normalized artifacts."""
+    return list(iter_artifacts(iter_artifact_records(path)))
 
 
 def run(path: Path, budget: int = 120) -> Tuple[str, int, int]:
-    bundle = load_bundle(path)
-    admitted, excluded = gate_bundle(bundle, budget_tokens=budget)
+    admitted, excluded = gate_artifacts(load_artifacts(path), budget_tokens=budget)
     context = assemble_context(admitted)
     return context, len(admitted), len(excluded)
 
 
+def stream(path: Path, sink: Any, budget: int = 120) -> Tuple[List[Placement], int]:
+    """run() without building the context: frames are written to `sink` as they are assembled."""
+    admitted, excluded = gate_artifacts(load_artifacts(path), budget_tokens=budget)
+    return write_context(admitted, sink), len(excluded)
+
+
 if __name__ == "__main__":
     ctx, admitted, excluded = run(Path(__file__).parent.parent / "fixtures" / "bundle.json")
     print(ctx)
@@ -0,0 +1,77 @@
+"""
+Serve the gate over HTTP (or a Unix socket) with warm counters.
+
+    python -m src.server --port 8080 --workers 4
+    python -m src.server --unix /tmp/gate.sock --workers 0
+
+    curl -s --data-binary @fixtures/bundle.json 'localhost:8080/gate?budget=200&context=1'
+
+POST /gate takes a bundle (object with "artifacts", or a list) and answers
+{"source", "admitted": [ids], "excluded": [[id, reason], ...], "tokens"}
+plus "context" (the assembled context) when context=1.
+Query parameters: budget (default 120), max_docs (default 3), context.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from context_core.batch import load_task_records  # noqa: E402
+from context_core.server import DEFAULT_QUEUE_SIZE, flag_param, int_param, serve  # noqa: E402
+
+from .batch import gate_records  # noqa: E402
+
+
+def gate_request(body: str, params: Dict[str, str]) -> Dict[str, Any]:
+    source, records = load_task_records(("request", "line", body))
+    result = gate_records(
+        records,
+        budget=int_param(params, "budget", 120),
+        max_docs=int_param(params, "max_docs", 3),
+        with_context=flag_param(params, "context"),
+    )
+    return {"source": source, **result}
+
+
+ROUTES = {"/gate": gate_request}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the context gate over HTTP or a Unix socket.")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8080, help="TCP port (default: 8080).")
+    parser.add_argument("--unix", default=None, help="Serve on this Unix socket path instead of TCP.")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Worker processes (default: CPU count; 0 = run on the event loop)."
+    )
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Requests queued before 503.")
+    parser.add_argument(
+        "--trace", default=None, help="Append per-stage traces as JSON lines (summarize: python -m context_core.trace)."
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        serve(
+            ROUTES,
+            host=None if args.unix else args.host,
+            port=args.port,
+            unix_path=args.unix,
+            workers=args.workers,
+            queue_size=args.queue_size,
+            trace_path=args.trace,
+        )
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,38 @@
+"""Seeded random bundles shared by the property tests (a failing seed reproduces)."""
+
+import random
+from typing import Any, Dict, List, Optional, Sequence
+
+KINDS = ["system", "task", "message", "document", "tool_output", "other"]
+AUTHORITIES = ["system", "developer", "user", "tool", "other"]
+WORDS = ["paris", "france", "capital", "euro", "tower", "river", "offer", "travel", ""]
+
+
+def random_records(
+    rng: random.Random,
+    n: int,
+    max_words: int = 60,
+    max_priority: int = 3,
+    words: Sequence[str] = WORDS,
+    scopes: Optional[Sequence[Optional[str]]] = None,
+) -> List[Dict[str, Any]]:
+    """n raw artifact records a0..a{n-1}; with `scopes`, each gets a random scope (None = unscoped)."""
+    records = []
+    for i in range(n):
+        record = {
+            "id": f"a{i}",
+            "kind": rng.choice(KINDS),
+            "authority": rng.choice(AUTHORITIES),
+            "priority": rng.randint(0, max_priority),
+            "content": " ".join(rng.choice(words) for _ in range(rng.randint(0, max_words))),
+        }
+        if scopes is not None:
+            scope = rng.choice(scopes)
+            if scope is not None:
+                record["scope"] = scope
+        records.append(record)
+    return records
+
+
+def random_bundle(rng: random.Random, n: int, **kwargs: Any) -> Dict[str, Any]:
+    return {"artifacts": random_records(rng, n, **kwargs)}
@@ -0,0 +1,28 @@
+import json
+import sys
+from pathlib import Path
+
+
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "bundle.json"
+SRC = Path(__file__).parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+import gates  # type: ignore
+from context_core.artifact import ArtifactBatch  # type: ignore  # noqa: E402
+
+
+def test_artifact_is_slotted_and_codes_round_trip():
+    bundle = json.loads(FIXTURE.read_text())
+    artifacts = gates.load_bundle(bundle)
+    a = artifacts[0]
+    assert not hasattr(a, "__dict__")
+    assert (a.kind, a.authority) == ("system", "system")
+    a.kind = "not-a-kind"
+    assert a.kind == "other"
+
+
+def test_batch_scores_match_scalar_score():
+    artifacts = gates.load_bundle(json.loads(FIXTURE.read_text()))
+    batch = ArtifactBatch.from_artifacts(artifacts)
+    assert list(batch.scores(gates.WEIGHTS)) == [gates.score(a) for a in artifacts]
+    assert list(batch) == artifacts
@@ -0,0 +1,50 @@
+import importlib.util
+import json
+import random
+import sys
+from pathlib import Path
+
+
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "bundle.json"
+SRC = Path(__file__).parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+import gates  # type: ignore
+from factories import random_bundle  # noqa: E402
+
+REPORT = Path(__file__).resolve().parents[3] / "skills/operator/context-triage/scripts/context_budget_report.py"
+
+
+def ids(pairs):
+    return [(a.artifact_id, reason) for a, reason in pairs]
+
+
+def test_batch_gate_matches_scalar_gate():
+    rng = random.Random(7)
+    bundles = [json.loads(FIXTURE.read_text())] + [random_bundle(rng, rng.randint(1, 80)) for _ in range(200)]
+    for bundle in bundles:
+        artifacts = gates.load_bundle(bundle)
+        budget, max_docs = rng.randint(0, 400), rng.randint(0, 4)
+        admitted, excluded = gates.gate_artifacts(artifacts, budget, max_docs)
+        b_admitted, b_excluded = gates.gate_artifacts_batched(artifacts, budget, max_docs)
+        assert [a.artifact_id for a in admitted] == [a.artifact_id for a in b_admitted]
+        assert ids(excluded) == ids(b_excluded)
+
+
+def test_batch_admission_preview_matches_scalar():
+    spec = importlib.util.spec_from_file_location("context_budget_report", REPORT)
+    report = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = report
+    spec.loader.exec_module(report)
+    counter = report.HeuristicTokenCounter()
+    rng = random.Random(11)
+    for _ in range(200):
+        artifacts = report.normalize_bundle(random_bundle(rng, rng.randint(1, 80)))
+        budget = rng.randint(1, 600)
+        admitted, excluded = report.admission_preview(artifacts, counter, budget)
+        counts = [counter.count_artifact(a.content) for a in artifacts]
+        rows_in, rows_out = report.admission_preview_batch(
+            report.ArtifactBatch.from_artifacts(artifacts), counts, budget
+        )
+        assert [a.artifact_id for a, _ in admitted] == [artifacts[i].artifact_id for i in rows_in]
+        assert [a.artifact_id for a, _ in excluded] == [artifacts[i].artifact_id for i in rows_out]
@@ -0,0 +1,79 @@
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+EXAMPLE = Path(__file__).resolve().parents[1]
+FIXTURE = EXAMPLE / "fixtures" / "bundle.json"
+
+
+def run_batch(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-m", "src.batch", *args], cwd=EXAMPLE, text=True, capture_output=True
+    )
+
+
+def test_batch_gates_directory_glob_and_jsonl_in_order(tmp_path):
+    bundle = json.loads(FIXTURE.read_text())
+    (tmp_path / "dir" / "nested").mkdir(parents=True)
+    shutil.copy(FIXTURE, tmp_path / "dir" / "a.json")
+    shutil.copy(FIXTURE, tmp_path / "dir" / "nested" / "b.json")
+    lines = [json.dumps(dict(bundle, id=f"b{i}")) for i in range(5)] + ["not json"]
+    (tmp_path / "day.jsonl").write_text("\n".join(lines) + "\n")
+
+    out = tmp_path / "out.jsonl"
+    result = run_batch(
+        str(tmp_path / "dir"),
+        str(tmp_path / "dir" / "*.json"),
+        str(tmp_path / "day.jsonl"),
+        "-o", str(out), "--workers", "2", "--chunk-size", "2",
+    )
+    assert result.returncode == 1  # the malformed line
+    records = [json.loads(line) for line in out.read_text().splitlines()]
+    sources = [r["source"] for r in records]
+    assert sources[:3] == [str(tmp_path / "dir" / "a.json"), str(tmp_path / "dir" / "nested" / "b.json"),
+                           str(tmp_path / "dir" / "a.json")]
+    assert sources[3:8] == [f"b{i}" for i in range(5)]
+    assert "error" in records[8]
+
+    single = json.loads(run_batch(str(FIXTURE), "--workers", "1").stdout)
+    for r in records[:8]:
+        assert r["admitted"] == single["admitted"]
+        assert r["excluded"] == single["excluded"]
+    assert ["doc3", "out_of_scope"] in single["excluded"]
+
+
+def test_batch_gates_columnar_bundles_like_json(tmp_path):
+    packed = tmp_path / "bundle.ctxb"
+    pack = subprocess.run(
+        [sys.executable, "-m", "context_core.columnar", "pack", str(FIXTURE), str(packed)],
+        cwd=EXAMPLE.parents[1], text=True, capture_output=True,
+    )
+    assert pack.returncode == 0, pack.stderr
+    shutil.copy(FIXTURE, tmp_path / "bundle.json")
+
+    result = run_batch(str(tmp_path), "--workers", "1")
+    assert result.returncode == 0, result.stderr
+    by_columnar, by_json = [json.loads(line) for line in result.stdout.splitlines()]
+    assert by_columnar["source"] == str(packed)
+    for field in ("admitted", "excluded", "tokens"):
+        assert by_columnar[field] == by_json[field]
+
+
+def test_jsonl_is_one_bundle_per_line_however_it_is_found(tmp_path):
+    bundle = json.loads(FIXTURE.read_text())
+    (tmp_path / "in").mkdir()
+    day = tmp_path / "in" / "day.jsonl"
+    day.write_text("\n".join(json.dumps(dict(bundle, id=f"b{i}")) for i in range(3)) + "\n")
+    for spec in (str(day), str(tmp_path / "in"), str(tmp_path / "in" / "*.jsonl")):
+        result = run_batch(spec, "--workers", "1")
+        assert result.returncode == 0, result.stderr
+        assert [json.loads(line)["source"] for line in result.stdout.splitlines()] == ["b0", "b1", "b2"]
+
+    # An artifact stream is not a JSONL of bundles: every line is reported, none is dropped.
+    day.write_text("\n".join(json.dumps(a) for a in bundle["artifacts"]) + "\n")
+    result = run_batch(str(tmp_path / "in"), "--workers", "1")
+    assert result.returncode == 1
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert len(records) == len(bundle["artifacts"]) and all("error" in r for r in records)
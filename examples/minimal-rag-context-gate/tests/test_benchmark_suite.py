@@ -0,0 +1,54 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+from benchmarks.generator import BundleConfig, make_bundle, make_session  # noqa: E402
+from benchmarks.suite import find_regressions  # noqa: E402
+
+SUITE = REPO_ROOT / "benchmarks" / "suite.py"
+
+
+def test_generator_is_seeded_and_honours_its_knobs():
+    config = BundleConfig(artifacts=2000, duplicate_rate=0.3, pii_density=0.0, seed=3)
+    bundle = make_bundle(config)
+    assert bundle == make_bundle(config)
+    assert make_bundle(BundleConfig(artifacts=2000, seed=4)) != bundle
+    artifacts = bundle["artifacts"]
+    assert len(artifacts) == 2000 and len(make_session(config)["artifacts"]) == 2000
+    contents = [a["content"] for a in artifacts[3:]]
+    assert 0.05 < 1 - len(set(contents)) / len(contents) < 0.3  # verbatim copies are half the duplicates
+    assert not any("@" in c for c in contents)
+    with_pii = [a["content"] for a in make_bundle(BundleConfig(artifacts=500, pii_density=1.0))["artifacts"][3:]]
+    assert all(any(ch.isdigit() or ch == "@" for ch in c) for c in with_pii)
+
+
+def test_regressions_are_relative_to_calibration():
+    baseline = {"results": [{"name": "gate_bundle", "size": 1000, "relative": 0.1}]}
+    result = {"name": "gate_bundle", "size": 1000, "best_ms": 30.0, "relative": 0.3}
+    # Twice the calibration time: the same relative cost is no regression.
+    assert find_regressions([{**result, "relative": 0.1}], baseline, 300.0, 0.5, 1.0) == []
+    (regression,) = find_regressions([result], baseline, 100.0, 0.5, 1.0)
+    assert regression["ratio"] == 3.0
+    assert find_regressions([result], baseline, 100.0, 0.5, 25.0) == []  # below the absolute floor
+
+
+def test_suite_writes_json_and_fails_on_regression(tmp_path):
+    out, baseline = tmp_path / "results.json", tmp_path / "baseline.json"
+    cmd = [sys.executable, str(SUITE), "--bench", "gate_bundle", "--sizes", "10", "300", "--repeat", "2"]
+    subprocess.run(cmd + ["--baseline", str(baseline), "--update-baseline"], check=True, capture_output=True)
+    proc = subprocess.run(cmd + ["--baseline", str(baseline), "-o", str(out)], capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    results = json.loads(out.read_text())["results"]
+    assert [(r["name"], r["size"]) for r in results] == [("gate_bundle", 10), ("gate_bundle", 300)]
+
+    stored = json.loads(baseline.read_text())
+    for r in stored["results"]:
+        r["relative"] /= 100
+    baseline.write_text(json.dumps(stored))
+    proc = subprocess.run(cmd + ["--baseline", str(baseline), "--min-delta-ms", "0"], capture_output=True, text=True)
+    assert proc.returncode == 1
+    assert "Regressions against" in proc.stdout
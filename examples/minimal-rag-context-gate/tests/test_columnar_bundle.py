@@ -0,0 +1,105 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "bundle.json"
+SRC = Path(__file__).parent.parent / "src"
+for p in (REPO_ROOT, SRC):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+import gates  # type: ignore
+from benchmarks.generator import BundleConfig, make_bundle  # noqa: E402
+from context_core.artifact import normalize_artifact  # noqa: E402
+from context_core.bundle_stream import iter_artifact_records  # noqa: E402
+from context_core.columnar import ColumnarBundle, ContentColumn, pack_bundle, unpack_bundle, write_columnar  # noqa: E402
+from context_core.relevance import InvertedIndex  # noqa: E402
+
+
+def _packed(tmp_path, bundle, name="bundle.ctxb"):
+    src = tmp_path / "bundle.json"
+    src.write_text(json.dumps(bundle), encoding="utf-8")
+    out = tmp_path / name
+    pack_bundle(str(src), str(out))
+    return out
+
+
+def test_round_trip_matches_normalized_json(tmp_path):
+    bundle = make_bundle(BundleConfig(artifacts=300, seed=5))
+    bundle["artifacts"][4].update(scope="billing", timestamp="2024-05-01T00:00:00Z", content="naïve café ✓")
+    expected = [normalize_artifact(a, i) for i, a in enumerate(bundle["artifacts"])]
+    path = _packed(tmp_path, bundle)
+
+    with ColumnarBundle(path) as cb:
+        assert len(cb) == len(expected)
+        assert list(cb) == expected
+        assert cb.take([4, 0]) == [expected[4], expected[0]]
+        assert cb.batch().contents.char_lengths[4] == len("naïve café ✓")
+
+    assert [normalize_artifact(r, i) for i, r in enumerate(iter_artifact_records(str(path)))] == expected
+    unpacked = tmp_path / "unpacked.json"
+    unpack_bundle(str(path), str(unpacked))
+    records = json.loads(unpacked.read_text(encoding="utf-8"))["artifacts"]
+    assert [normalize_artifact(r, i) for i, r in enumerate(records)] == expected
+
+
+def test_gate_columnar_matches_gate_bundle(tmp_path):
+    for bundle in (json.loads(FIXTURE.read_text()), make_bundle(BundleConfig(artifacts=500, seed=2))):
+        admitted, excluded = gates.gate_bundle(bundle, budget_tokens=400, max_docs=5)
+        with ColumnarBundle(_packed(tmp_path, bundle)) as cb:
+            c_admitted, c_excluded = gates.gate_columnar(cb, budget_tokens=400, max_docs=5)
+        assert c_admitted == admitted
+        assert c_excluded == [(a.artifact_id, reason) for a, reason in excluded]
+
+
+def test_gate_columnar_decodes_only_what_it_reads(tmp_path, monkeypatch):
+    bundle = make_bundle(BundleConfig(artifacts=400, seed=9))
+    artifacts = gates.load_bundle(bundle)
+    index = InvertedIndex.build((a.artifact_id, a.content) for a in artifacts if a.kind == "document")
+    decoded = []
+    original = ContentColumn.__getitem__
+
+    def spy(self, i):
+        decoded.append(i)
+        return original(self, i)
+
+    with ColumnarBundle(_packed(tmp_path, bundle)) as cb:
+        monkeypatch.setattr(ContentColumn, "__getitem__", spy)
+        admitted, _ = gates.gate_columnar(cb, budget_tokens=300, index=index)
+        monkeypatch.undo()
+
+    question_row = next(i for i, a in enumerate(artifacts) if a.kind == "message")
+    admitted_rows = {i for i, a in enumerate(artifacts) if a in admitted}
+    assert admitted
+    assert set(decoded) <= admitted_rows | {question_row}
+
+
+def test_rejects_files_that_are_not_columnar_bundles(tmp_path):
+    empty = tmp_path / "empty.ctxb"
+    empty.write_bytes(b"")
+    wrong = tmp_path / "wrong.ctxb"
+    wrong.write_bytes(b"JSON" + b"\0" * 64)
+    good = tmp_path / "good.ctxb"
+    write_columnar(gates.load_bundle(json.loads(FIXTURE.read_text())), good)
+    truncated = tmp_path / "truncated.ctxb"
+    truncated.write_bytes(good.read_bytes()[:-16])
+    for path in (empty, wrong, truncated):
+        with pytest.raises(ValueError):
+            ColumnarBundle(path)
+
+
+def test_cli_pack_and_unpack(tmp_path):
+    packed, unpacked = tmp_path / "bundle.ctxb", tmp_path / "bundle.json"
+    for args in (["pack", str(FIXTURE), str(packed)], ["unpack", str(packed), str(unpacked)]):
+        proc = subprocess.run(
+            [sys.executable, "-m", "context_core.columnar", *args], cwd=REPO_ROOT, capture_output=True, text=True
+        )
+        assert proc.returncode == 0, proc.stderr
+    original = json.loads(FIXTURE.read_text())["artifacts"]
+    round_trip = json.loads(unpacked.read_text(encoding="utf-8"))["artifacts"]
+    assert [normalize_artifact(r, i) for i, r in enumerate(round_trip)] == [
+        normalize_artifact(r, i) for i, r in enumerate(original)
+    ]
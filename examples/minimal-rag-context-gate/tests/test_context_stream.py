@@ -0,0 +1,55 @@
+import importlib
+import importlib.util
+import io
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "bundle.json"
+
+
+def load_package():
+    name = "minimal_rag_gate"
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, SRC / "__init__.py", submodule_search_locations=[str(SRC)])
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return importlib.import_module(f"{name}.runner"), importlib.import_module(f"{name}.context_assembler")
+
+
+def test_streamed_context_matches_assembled_string():
+    runner, assembler = load_package()
+    context, admitted, _ = runner.run(FIXTURE)
+
+    binary = io.BytesIO()
+    placements, _ = runner.stream(FIXTURE, binary)
+    text = io.StringIO()
+    assert runner.stream(FIXTURE, text)[0] == placements
+    assert binary.getvalue() == context.encode("utf-8")
+    assert text.getvalue() == context
+    assert len(placements) == admitted
+
+    data = binary.getvalue()
+    artifacts = runner.load_artifacts(FIXTURE)
+    by_id = {a.artifact_id: a for a in artifacts}
+    counter = assembler.HeuristicTokenCounter()
+    token_pos = 0
+    for p in placements:
+        a = by_id[p.artifact_id]
+        assert data[p.byte_start : p.byte_end].decode() == f"[{a.kind}:{a.artifact_id}] {a.content}"
+        assert (p.token_start, p.token_end) == (token_pos, token_pos + counter.count(a.content))
+        token_pos = p.token_end
+
+
+def test_chunks_use_utf8_byte_offsets():
+    runner, assembler = load_package()
+    arts = [runner.Artifact("a", "document", "tool", 0, "", "café"), runner.Artifact("b", "document", "tool", 0, "", "ok")]
+    chunks = list(assembler.iter_context_chunks(arts))
+    joined = b"".join(c for c, _ in chunks)
+    assert joined == assembler.assemble_context(arts).encode("utf-8")
+    first, second = (p for _, p in chunks)
+    assert joined[first.byte_start : first.byte_end].decode() == "[document:a] café"
+    assert second.byte_start == first.byte_end + 1
+    text = io.StringIO()
+    assert assembler.write_context(arts, text) == [first, second]
@@ -0,0 +1,114 @@
+import asyncio
+import importlib
+import importlib.util
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).parent.parent / "src"
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "bundle.json"
+
+
+def load_package():
+    name = "minimal_rag_gate"
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, SRC / "__init__.py", submodule_search_locations=[str(SRC)])
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return importlib.import_module(f"{name}.server"), importlib.import_module(f"{name}.runner")
+
+
+async def request(reader, writer, method, target, body=b""):
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: x\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode().strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.lower()] = value.strip()
+    return status, json.loads(await reader.readexactly(int(headers["content-length"])))
+
+
+def test_gate_server_answers_like_the_runner():
+    server_mod, runner = load_package()
+    from context_core.server import GateServer  # type: ignore
+
+    context, admitted, excluded = runner.run(FIXTURE)
+    bundle = FIXTURE.read_bytes()
+
+    async def scenario(workers, unix_path=None):
+        server = GateServer(server_mod.ROUTES, workers=workers)
+        await server.start(host=None if unix_path else "127.0.0.1", port=0, unix_path=unix_path)
+        try:
+            if unix_path:
+                reader, writer = await asyncio.open_unix_connection(unix_path)
+            else:
+                host, port = server.addresses[0][:2]
+                reader, writer = await asyncio.open_connection(host, port)
+            # Several requests on one kept-alive connection.
+            status, result = await request(reader, writer, "POST", "/gate?context=1", bundle)
+            assert status == 200
+            assert result["context"] == context
+            assert (len(result["admitted"]), len(result["excluded"])) == (admitted, excluded)
+
+            status, result = await request(reader, writer, "POST", "/gate?budget=10", bundle)
+            assert status == 200 and "context" not in result
+            assert result["tokens"] <= 10
+
+            assert (await request(reader, writer, "POST", "/gate", b"{not json"))[0] == 400
+            assert (await request(reader, writer, "POST", "/gate?budget=x", bundle))[0] == 400
+            assert (await request(reader, writer, "POST", "/nope", bundle))[0] == 404
+            assert (await request(reader, writer, "GET", "/gate"))[0] == 405
+            status, health = await request(reader, writer, "GET", "/healthz")
+            assert status == 200 and health["routes"] == ["/gate"]
+            writer.close()
+        finally:
+            await server.close()
+
+    asyncio.run(scenario(workers=0))
+    asyncio.run(scenario(workers=1))
+    with tempfile.TemporaryDirectory() as tmp:
+        unix_path = str(Path(tmp) / "gate.sock")
+        asyncio.run(scenario(workers=0, unix_path=unix_path))
+        asyncio.run(scenario(workers=0, unix_path=unix_path))  # replaces the socket left behind
+
+
+def test_unix_path_that_is_not_a_socket_is_left_alone(tmp_path):
+    from context_core.server import GateServer  # type: ignore
+
+    path = tmp_path / "gate.sock"
+    path.write_text("keep me")
+    with pytest.raises(FileExistsError):
+        asyncio.run(GateServer({}, workers=0).start(host=None, unix_path=str(path)))
+    assert path.read_text() == "keep me"
+
+
+def test_full_queue_is_answered_busy():
+    from context_core.server import GateServer, HttpError  # type: ignore
+
+    async def scenario():
+        server = GateServer({"/gate": lambda body, params: {}}, workers=0, queue_size=1)
+        await server.start(port=0)
+        try:
+            for task in server._consumers:  # nothing drains the queue
+                task.cancel()
+            pending = asyncio.ensure_future(server.submit(server.routes["/gate"], "{}", {}))
+            await asyncio.sleep(0)
+            try:
+                await server.submit(server.routes["/gate"], "{}", {})
+            except HttpError as e:
+                assert e.status == 503
+            else:
+                raise AssertionError("expected a busy answer")
+            pending.cancel()
+        finally:
+            await server.close()
+
+    asyncio.run(scenario())
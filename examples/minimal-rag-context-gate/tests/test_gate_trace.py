@@ -0,0 +1,77 @@
+import json
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+import gates  # type: ignore
+from context_core.trace import JsonlTraceWriter, StageAggregator, main, percentile, start_trace, tracing  # noqa: E402
+
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "bundle.json"
+
+
+def test_tracing_is_off_by_default():
+    assert start_trace("gate") is None
+    bundle = json.loads(FIXTURE.read_text())
+    with tracing(lambda trace: None):
+        assert start_trace("gate") is not None
+    assert start_trace("gate") is None
+    assert gates.gate_bundle(bundle)  # untraced path still works
+
+
+def test_untraced_gate_builds_no_token_source(monkeypatch):
+    def fail(*args):
+        raise AssertionError("token source built with tracing off")
+
+    monkeypatch.setattr(gates, "_token_sum", fail)
+    artifacts = gates.iter_artifacts(json.loads(FIXTURE.read_text())["artifacts"])
+    assert gates.gate_artifacts(list(artifacts))[0]
+
+
+def test_gate_stages_chain_artifacts_and_tokens():
+    bundle = json.loads(FIXTURE.read_text())
+    traces = []
+    aggregator = StageAggregator()
+    with tracing(traces.append, aggregator):
+        admitted, excluded = gates.gate_bundle(bundle, budget_tokens=60)
+        gates.gate_bundle(bundle, budget_tokens=60, solver="topk")
+
+    plain, topk = (t.to_dict() for t in traces)
+    assert [s["stage"] for s in plain["stages"]] == ["load", "relevance", "rank", "pack"]
+    assert [s["stage"] for s in topk["stages"]] == ["load", "columns", "count", "relevance", "select"]
+    for trace in (plain, topk):
+        stages = trace["stages"]
+        for before, after in zip(stages, stages[1:]):
+            assert after["artifacts_in"] == before["artifacts_out"]
+        assert stages[0]["artifacts_out"] == len(bundle["artifacts"])
+        assert stages[-1]["artifacts_out"] == len(admitted)
+        assert stages[-1]["tokens_out"] <= 60
+        assert 0 <= sum(s["ms"] for s in stages) <= trace["total_ms"] + 1e-6
+
+    rows = {(r["pipeline"], r["stage"]): r for r in aggregator.summary()}
+    assert rows[("gate", "relevance")]["artifacts_removed"] == 1.0  # the off-topic document
+    assert rows[("gate", "total")]["count"] == 2
+    assert rows[("gate", "total")]["artifacts_removed"] == len(bundle["artifacts"]) - len(admitted)
+
+
+def test_jsonl_trace_round_trips_through_the_summary_cli(tmp_path, capsys):
+    path = tmp_path / "trace.jsonl"
+    writer = JsonlTraceWriter(str(path))
+    bundle = json.loads(FIXTURE.read_text())
+    with tracing(writer):
+        for _ in range(5):
+            gates.gate_bundle(bundle)
+    writer.close()
+    assert len(path.read_text().splitlines()) == 5
+    assert main([str(path)]) == 0
+    out = capsys.readouterr().out
+    assert "p99 ms" in out and "relevance" in out
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([7.0], 99) == 7.0
@@ -0,0 +1,72 @@
+import itertools
+import random
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+import gates  # type: ignore
+from context_core.admission import pack_knapsack  # type: ignore  # noqa: E402
+from factories import random_bundle  # noqa: E402
+
+
+def test_knapsack_is_optimal_on_small_instances():
+    for seed in range(300):
+        rng = random.Random(seed)
+        n = rng.randint(0, 9)
+        tokens = [rng.choice([0, 2, 5, 8, 13, 21]) for _ in range(n)]
+        values = [rng.randint(1, 40) for _ in range(n)]
+        capped = [rng.random() < 0.5 for _ in range(n)]
+        budget, cap = rng.randint(0, 40), rng.randint(0, 3)
+        flags = pack_knapsack(list(range(n)), tokens, values, budget, capped=capped, cap=cap, time_limit=5)
+        chosen = [r for r in range(n) if flags[r]]
+        assert sum(tokens[r] for r in chosen) <= budget
+        assert sum(capped[r] for r in chosen) <= cap
+        best = max(
+            sum(values[r] for r in combo)
+            for k in range(n + 1)
+            for combo in itertools.combinations([r for r in range(n) if tokens[r]], k)
+            if sum(tokens[r] for r in combo) <= budget and sum(capped[r] for r in combo) <= cap
+        )
+        assert sum(values[r] for r in chosen) == best, seed
+
+
+def doc(i, priority, words):
+    return gates.Artifact(f"d{i}", "document", "tool", priority, "", " ".join(["paris"] * words))
+
+
+def test_knapsack_gate_fills_budget_without_reordering_authority():
+    artifacts = [
+        gates.Artifact("sys", "system", "system", 10, "", "Answer briefly."),
+        gates.Artifact("q", "message", "user", 1, "", "Tell me about paris"),
+        doc(0, 9, 30),  # large, highest-ranked document: blocks the others under greedy
+        doc(1, 1, 12),
+        doc(2, 1, 12),
+        doc(3, 1, 12),
+    ]
+    greedy, _ = gates.gate_artifacts(artifacts, budget_tokens=99, max_docs=5)
+    knapsack, excluded = gates.gate_artifacts(artifacts, budget_tokens=99, max_docs=5, solver="knapsack")
+    assert [a.artifact_id for a in greedy] == ["sys", "q", "d0"]
+    assert [a.artifact_id for a in knapsack] == ["sys", "q", "d1", "d2", "d3"]
+    assert sum(gates.score(a) for a in knapsack) > sum(gates.score(a) for a in greedy)
+    assert ("d0", "budget") in [(a.artifact_id, r) for a, r in excluded]
+
+    # Pinned instructions are admitted before anything is traded off, and the doc cap holds.
+    capped, excluded = gates.gate_artifacts(artifacts, budget_tokens=99, max_docs=2, solver="knapsack")
+    assert [a.artifact_id for a in capped][:2] == ["sys", "q"]
+    assert sum(a.kind == "document" for a in capped) == 2
+    assert "doc_cap" in {r for _, r in excluded}
+
+
+def test_knapsack_gate_never_scores_below_greedy():
+    for seed in range(1500):
+        rng = random.Random(seed)
+        artifacts = gates.load_bundle(random_bundle(rng, rng.randint(0, 30), max_words=40))
+        budget, max_docs = rng.randint(0, 300), rng.randint(0, 4)
+        greedy, _ = gates.gate_artifacts(artifacts, budget_tokens=budget, max_docs=max_docs)
+        knapsack, _ = gates.gate_artifacts(artifacts, budget_tokens=budget, max_docs=max_docs, solver="knapsack")
+        assert sum(map(gates.score, knapsack)) >= sum(map(gates.score, greedy)), seed
+        # Instructions of system/developer authority keep greedy's decision.
+        pinned = {"system", "developer"}
+        assert {id(a) for a in knapsack if a.authority in pinned} == {id(a) for a in greedy if a.authority in pinned}
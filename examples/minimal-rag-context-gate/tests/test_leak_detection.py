@@ -0,0 +1,130 @@
+import json
+import random
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+from context_core.artifact import Artifact  # noqa: E402
+from context_core.leaks import _MOD, _BASE, find_leaks, rolling_hashes  # noqa: E402
+
+WORDS = ["invoice", "refund", "ticket", "reset", "password", "account", "march", "eur", "customer", "policy"]
+SCOPES = [None, "billing", "support", "tenant-a"]
+SCRIPTS = [
+    REPO_ROOT / "30-control-mechanisms/isolation/scripts/cross_domain_leak_test.py",
+    REPO_ROOT / "skills/operator/boundary-hardening/scripts/cross_domain_leak_test.py",
+]
+
+
+def words(text):
+    return [w.lower() for w in re.findall(r"\w+", text)]
+
+
+def test_rolling_hashes_match_direct_hashing():
+    rng = random.Random(0)
+    for _ in range(200):
+        tokens = [rng.randrange(_MOD) for _ in range(rng.randint(0, 30))]
+        k = rng.randint(1, 8)
+        direct = []
+        for i in range(len(tokens) - k + 1):
+            h = 0
+            for t in tokens[i:i + k]:
+                h = (h * _BASE + t) % _MOD
+            direct.append(h)
+        assert rolling_hashes(tokens, k) == direct
+
+
+def test_leaks_match_brute_force_window_ownership():
+    for seed in range(150):
+        rng = random.Random(seed)
+        artifacts = []
+        for i in range(rng.randint(1, 25)):
+            text = [rng.choice(WORDS) for _ in range(rng.randint(0, 30))]
+            if artifacts and rng.random() < 0.4:
+                donor = words(rng.choice(artifacts).content)
+                a = rng.randrange(len(donor) + 1)
+                text[len(text) // 2:len(text) // 2] = [w.upper() if rng.random() < 0.3 else w for w in donor[a:a + 12]]
+            kind = rng.choice(["system", "document", "tool_output"])
+            artifacts.append(Artifact(f"a{i}", kind, "tool", 0, "", ", ".join(text), scope=rng.choice(SCOPES)))
+        k = rng.randint(2, 5)
+
+        owner, public = {}, set()
+        for a in artifacts:
+            w = words(a.content)
+            for i in range(len(w) - k + 1):
+                window = tuple(w[i:i + k])
+                if a.scope is not None:
+                    owner.setdefault(window, a.scope)
+                else:
+                    public.add(window)
+        expected = set()
+        for a in artifacts:
+            w = words(a.content)
+            for i in range(len(w) - k + 1):
+                window = tuple(w[i:i + k])
+                if window in owner and owner[window] != a.scope and window not in public:
+                    expected.update((a.artifact_id, j) for j in range(i, i + k))
+
+        by_id = {a.artifact_id: a for a in artifacts}
+        covered = set()
+        for span in find_leaks(artifacts, window=k):
+            a, src = by_id[span.artifact_id], by_id[span.source_id]
+            assert words(a.content[span.start:span.end]) == words(src.content[span.source_start:span.source_end])
+            assert span.source_scope != span.scope
+            before = len(words(a.content[:span.start]))
+            covered.update((a.artifact_id, j) for j in range(before, before + len(words(a.content[span.start:span.end]))))
+        assert covered == expected, seed
+
+
+def test_shared_text_quoted_by_two_scopes_is_not_a_leak():
+    sentence = "Refunds above 500 EUR need a second approver from finance"
+    policy = Artifact("policy", "document", "tool", 0, "", sentence)
+    a1 = Artifact("a1", "document", "tool", 0, "", f"Per policy: {sentence}.", scope="tenantA")
+    b1 = Artifact("b1", "document", "tool", 0, "", f"{sentence}; see ticket 9.", scope="tenantB")
+    for order in ([policy, a1, b1], [a1, b1, policy]):
+        assert find_leaks(order, window=4) == []
+    # scoped text reaching shared context that is not a source is still a leak
+    copied = Artifact("ctx", "message", "user", 0, "", "Per policy: refunds above 500 EUR, see ticket 9.")
+    [span] = find_leaks([a1, b1], targets=[copied], window=4)
+    assert (span.source_id, span.source_scope) == ("a1", "tenantA")
+
+
+def test_scan_of_admitted_context_only():
+    billing = Artifact("b1", "document", "tool", 0, "", "Customer 4412 disputes invoice INV-993 for March", scope="billing")
+    support = Artifact("s1", "document", "tool", 0, "", "Reset the password for account 7", scope="support")
+    leaked = Artifact("s2", "document", "tool", 0, "", "FYI: customer 4412 disputes invoice inv-993!", scope="support")
+    spans = find_leaks([billing, support, leaked], targets=[support], window=4)
+    assert spans == []
+    [span] = find_leaks([billing, support, leaked], targets=[leaked], window=4)
+    assert (span.source_id, span.start, span.end) == ("b1", 5, 43)
+    assert (span.source_start, span.source_end) == (0, 38)
+
+
+def test_leak_test_scripts_report_and_fail(tmp_path):
+    bundle = {"artifacts": [
+        {"id": "sys", "kind": "system", "authority": "system", "content": "Always cite the policy document ids you used."},
+        {"id": "b1", "kind": "document", "authority": "tool", "scope": "billing",
+         "content": "Customer 4412 disputes invoice INV-993 for the March billing period, amount 420 EUR."},
+        {"id": "s1", "kind": "document", "authority": "tool", "scope": "support",
+         "content": "Ticket: customer 4412 disputes invoice inv-993 for the march billing period. Reset password."},
+        {"id": "s2", "kind": "document", "authority": "tool", "scope": "support",
+         "content": "Always cite the policy document ids you used, then close the ticket."},
+    ]}
+    path = tmp_path / "bundle.json"
+    path.write_text(json.dumps(bundle))
+    clean = tmp_path / "admitted.jsonl"
+    clean.write_text("\n".join(json.dumps(r) for r in bundle["artifacts"] if r["id"] != "s1") + "\n")
+
+    for script in SCRIPTS:
+        result = subprocess.run([sys.executable, str(script), "-i", str(path)], text=True, capture_output=True)
+        assert result.returncode == 1, result.stderr
+        assert "Result: FAIL" in result.stdout
+        assert "s1" in result.stdout and "billing" in result.stdout
+        result = subprocess.run(
+            [sys.executable, str(script), "-i", str(path), "--admitted", str(clean)], text=True, capture_output=True
+        )
+        assert result.returncode == 0, result.stdout
+        assert "Result: PASS" in result.stdout
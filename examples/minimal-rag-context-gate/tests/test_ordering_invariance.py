@@ -1,13 +1,22 @@
 import json
+import random
+import subprocess
 import sys
 from pathlib import Path
 
 
 FIXTURE = Path(__file__).parent.parent / "fixtures" / "bundle.json"
 SRC = Path(__file__).parent.parent / "src"
+REPO_ROOT = Path(__file__).resolve().parents[3]
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
 import gates  # type: ignore
+from context_core.invariance import find_violations, shrink, shuffled_order, with_ids  # type: ignore  # noqa: E402
+
+SCRIPTS = [
+    REPO_ROOT / "30-control-mechanisms/ordering/scripts/shuffle_invariance_test.py",
+    REPO_ROOT / "skills/operator/session-stabilization/scripts/shuffle_invariance_test.py",
+]
 
 
 def test_ordering_invariance():
@@ -24,3 +33,96 @@ def test_ordering_invariance():
     assert ids1 == ids2
     # system must stay first
     assert ids1[0] == "sys"
+
+
+def admitted_ids(records):
+    admitted, _ = gates.gate_bundle({"artifacts": records}, budget_tokens=200)
+    return [a.artifact_id for a in admitted]
+
+
+def is_message(record):
+    return record.get("kind") == "message"
+
+
+def tied_bundle(rng, n):
+    """Random bundle with plenty of score ties (few kinds, authorities and priorities)."""
+    records = [{"id": "q", "kind": "message", "authority": "user", "content": "capital of france"}]
+    for i in range(n):
+        records.append({
+            "id": f"a{i}",
+            "kind": rng.choice(["document", "tool_output"]),
+            "authority": rng.choice(["user", "tool"]),
+            "priority": rng.randint(0, 1),
+            "content": "paris capital " * rng.randint(1, 12),
+        })
+    return records
+
+
+def test_fixture_is_invariant_under_many_permutations():
+    records = with_ids(json.loads(FIXTURE.read_text())["artifacts"])
+    assert find_violations(admitted_ids, records, range(300), keep_order=is_message) == []
+
+
+def test_shuffled_order_keeps_pinned_relative_order():
+    for seed in range(200):
+        n = seed % 17
+        pinned = sorted(random.Random(seed).sample(range(n), n // 3))
+        order = shuffled_order(n, seed, pinned)
+        assert sorted(order) == list(range(n))
+        assert [i for i in order if i in set(pinned)] == pinned
+        assert order == shuffled_order(n, seed, pinned)
+
+
+def test_parallel_violations_match_serial():
+    records = tied_bundle(random.Random(5), 80)
+    serial = find_violations(admitted_ids, records, range(64), keep_order=is_message)
+    parallel = find_violations(admitted_ids, records, range(64), keep_order=is_message, workers=2, chunk=8)
+    assert serial and parallel == serial
+    for v in serial:
+        assert v.actual == admitted_ids([records[i] for i in v.order]) != v.expected
+
+
+def test_shrink_is_one_minimal():
+    for seed in range(20):
+        records = tied_bundle(random.Random(seed), 30)
+        violations = find_violations(admitted_ids, records, range(20))
+        if not violations:
+            continue
+        keep, order = shrink(admitted_ids, records, violations[0].order)
+        assert sorted(order) == keep
+        assert admitted_ids([records[i] for i in keep]) != admitted_ids([records[i] for i in order])
+        for drop in keep:
+            rest = [i for i in keep if i != drop]
+            assert admitted_ids([records[i] for i in rest]) == admitted_ids([records[i] for i in order if i != drop])
+
+
+def test_shuffle_invariance_scripts(tmp_path):
+    tied = tmp_path / "tied.json"
+    tied.write_text(json.dumps({"artifacts": [
+        {"id": "sys", "kind": "system", "authority": "system", "content": "Answer from documents only."},
+        {"kind": "tool_output", "authority": "tool", "content": "log line one"},
+        {"kind": "tool_output", "authority": "tool", "content": "log line two"},
+        {"id": "m1", "kind": "message", "authority": "user", "content": "capital of france"},
+    ]}))
+    failure = tmp_path / "failure.json"
+    for script in SCRIPTS:
+        result = subprocess.run(
+            [sys.executable, str(script), "-i", str(FIXTURE), "--runs", "50", "--workers", "2"],
+            text=True, capture_output=True,
+        )
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert "Result: PASS" in result.stdout
+
+        result = subprocess.run(
+            [sys.executable, str(script), "-i", str(tied), "--target", "truncate", "--save-failure", str(failure)],
+            text=True, capture_output=True,
+        )
+        assert result.returncode == 1, result.stdout + result.stderr
+        assert "Result: FAIL" in result.stdout
+        assert sorted(r["id"] for r in json.loads(failure.read_text())["artifacts"]) == ["a1", "a2"]
+
+        result = subprocess.run(
+            [sys.executable, str(script), "-i", str(tied), "--target", "truncate", "--unordered"],
+            text=True, capture_output=True,
+        )
+        assert result.returncode == 0, result.stdout + result.stderr
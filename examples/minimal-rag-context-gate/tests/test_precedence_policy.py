@@ -0,0 +1,107 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+SRC = Path(__file__).parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+import gates  # type: ignore
+from context_core.precedence import (  # type: ignore  # noqa: E402
+    DEFAULT_POLICY,
+    DEFAULT_WEIGHTS,
+    POLICY_ENV,
+    load_policy,
+    parse_policy,
+    policy_tables,
+    with_overrides,
+)
+
+SIMULATOR = REPO_ROOT / "30-control-mechanisms/ordering/scripts/precedence_simulator.py"
+
+
+def test_every_scorer_uses_the_shared_policy():
+    assert policy_tables(DEFAULT_WEIGHTS) == json.loads(DEFAULT_POLICY.read_text())
+    assert gates.WEIGHTS is DEFAULT_WEIGHTS
+    task = gates.Artifact("t", "task", "developer", 2, "", "")
+    assert gates.score(task) == 800 + 110 + 2
+
+
+def test_policy_overlays_base_and_rejects_bad_entries(tmp_path):
+    weights = parse_policy({"kind": {"task": 100}}, DEFAULT_WEIGHTS)
+    assert policy_tables(weights)["kind"]["task"] == 100
+    assert weights.authority == DEFAULT_WEIGHTS.authority
+    assert parse_policy({}).kind == [0] * len(DEFAULT_WEIGHTS.kind)
+    assert with_overrides(DEFAULT_WEIGHTS, ["kind.task=100"]).kind == weights.kind
+
+    for bad in ([], {"scope": {}}, {"kind": {"memo": 1}}, {"kind": {"task": "high"}}, {"authority": {"user": True}}):
+        with pytest.raises(ValueError):
+            parse_policy(bad)
+    for spec in ("kind.task", "task=1", "kind.task=high"):
+        with pytest.raises(ValueError):
+            with_overrides(DEFAULT_WEIGHTS, [spec])
+
+    with pytest.raises(ValueError, match="cannot read policy"):
+        load_policy(tmp_path / "missing.json")
+
+    toml = tmp_path / "policy.toml"
+    toml.write_text('[kind]\ntask = 100\n')
+    assert load_policy(toml, DEFAULT_WEIGHTS).kind == weights.kind
+
+
+def test_policy_file_from_environment(tmp_path):
+    policy = tmp_path / "policy.json"
+    policy.write_text(json.dumps({"authority": {"tool": 1}, "kind": {"task": 5}}))
+    code = "import gates; print(gates.WEIGHTS.authority[3], gates.WEIGHTS.kind[1], gates.WEIGHTS.authority[0])"
+
+    def run(path):
+        return subprocess.run(
+            [sys.executable, "-c", code], cwd=SRC, text=True, capture_output=True,
+            env={**os.environ, POLICY_ENV: str(path)},
+        )
+
+    # a partial policy keeps the packaged weights it leaves out
+    result = run(policy)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["1", "5", "1000"]
+
+    # a missing or invalid file is reported by variable name, not fatal
+    (tmp_path / "bad.json").write_text('{"kind": {"memo": 1}}')
+    for path in (tmp_path / "missing.json", tmp_path / "bad.json"):
+        result = run(path)
+        assert result.returncode == 0, result.stderr
+        assert POLICY_ENV in result.stderr and str(path) in result.stderr
+        assert result.stdout.split() == ["400", "110", "1000"]
+
+
+def test_precedence_simulator_reports_admission_changes(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for n in range(3):
+        (corpus / f"b{n}.json").write_text(json.dumps({"artifacts": [
+            {"id": "task", "kind": "task", "authority": "user", "content": "x" * 40},
+            {"id": "doc", "kind": "document", "authority": "tool", "content": "y" * 40},
+            {"id": "msg", "kind": "message", "authority": "user", "content": "z" * 40 * n},
+        ]}))
+    policy = tmp_path / "tools_first.json"
+    policy.write_text(json.dumps({"authority": {"tool": 700}}))
+    result = subprocess.run(
+        [sys.executable, str(SIMULATOR), "-i", str(corpus), "-b", "20", "--policy", str(policy),
+         "--sweep", "kind.task=0,110", "--workers", "2"],
+        text=True, capture_output=True,
+    )
+    assert result.returncode == 0, result.stderr
+    rows = {}
+    for line in result.stdout.splitlines():  # first table only: admission per config
+        rows.setdefault(line.split("  ")[0], line.split())
+    # one artifact fits; tool authority above user puts the document before the task everywhere,
+    # a zero task weight only loses to a message that fits (one bundle)
+    assert rows["tools_first.json"][1:6] == ["3", "100.0%", "+3", "-3", "+0"]
+    assert rows["kind.task=0"][1] == "1" and rows["kind.task=110"][1] == "0"
+
+    result = subprocess.run([sys.executable, str(SIMULATOR), "-i", str(corpus)], text=True, capture_output=True)
+    assert result.returncode == 2
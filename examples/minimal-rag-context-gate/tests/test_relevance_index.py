@@ -0,0 +1,33 @@
+import json
+import random
+import sys
+from pathlib import Path
+
+
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "bundle.json"
+SRC = Path(__file__).parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+import gates  # type: ignore
+from context_core.relevance import InvertedIndex, has_overlap, terms  # type: ignore  # noqa: E402
+
+
+def test_early_exit_overlap_matches_set_overlap():
+    rng = random.Random(3)
+    words = ["Paris", "paris,", "FRANCE", "capital", "of", "the", "tower", "x euro", "naïve"]
+    for _ in range(500):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(0, 12)))
+        question = " ".join(rng.choice(words) for _ in range(rng.randint(0, 4)))
+        assert has_overlap(text, terms(question)) == (gates._relevance_score(text, question) > 0)
+
+
+def test_gate_with_prebuilt_index_matches_text_scan():
+    bundle = json.loads(FIXTURE.read_text())
+    artifacts = gates.load_bundle(bundle)
+    index = InvertedIndex.build((a.artifact_id, a.content) for a in artifacts if a.kind == "document")
+    admitted, excluded = gates.gate_bundle(bundle, budget_tokens=200)
+    i_admitted, i_excluded = gates.gate_bundle(bundle, budget_tokens=200, index=index)
+    assert [a.artifact_id for a in admitted] == [a.artifact_id for a in i_admitted]
+    assert [(a.artifact_id, r) for a, r in excluded] == [(a.artifact_id, r) for a, r in i_excluded]
+    ranked = index.ranked(terms("What is the capital of France?"))
+    assert {doc_id for doc_id, _ in ranked} == {"doc1", "doc2"}
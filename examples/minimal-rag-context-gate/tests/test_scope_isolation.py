@@ -0,0 +1,122 @@
+import json
+import random
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "bundle.json"
+SRC = Path(__file__).parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+import gates  # type: ignore
+from context_core.artifact import normalize_artifact  # type: ignore  # noqa: E402
+from context_core.isolation import ScopePolicy, parse_scope_budgets, partition_by_scope  # type: ignore  # noqa: E402
+from factories import random_records  # noqa: E402
+
+SCOPES = [None, None, "billing", "support", "tenant-a", "tenant-b"]
+
+
+def random_artifacts(rng, n):
+    question = {"id": "q", "kind": "message", "authority": "user", "content": "capital of france"}
+    return gates.load_bundle({"artifacts": [question] + random_records(rng, n, max_words=40, scopes=SCOPES)})
+
+
+def test_partition_is_one_pass_in_first_seen_order():
+    assert partition_by_scope(["b", None, "a", "b", None]) == {"b": [0, 3], None: [1, 4], "a": [2]}
+    assert parse_scope_budgets(["billing=300", "a=b=5"]) == {"billing": 300, "a=b": 5}
+    with pytest.raises(ValueError):
+        parse_scope_budgets(["billing"])
+
+
+def test_unscoped_bundle_gates_like_gate_artifacts():
+    artifacts = gates.load_bundle(json.loads(FIXTURE.read_text()))
+    admitted, excluded = gates.gate_artifacts(artifacts, budget_tokens=200)
+    s_admitted, s_excluded = gates.gate_scoped(artifacts, ScopePolicy(default_budget=200))
+    assert s_admitted == sorted(admitted, key=lambda a: (a.authority_code, -gates.score(a)))
+    assert s_excluded == excluded
+
+
+def test_random_bundles_keep_their_scopes():
+    artifacts = random_artifacts(random.Random(0), 60)
+    assert {a.scope for a in artifacts} == set(SCOPES)
+
+
+def test_each_scope_is_gated_alone_and_merged_by_authority():
+    multi_scope = 0
+    for seed in range(150):
+        rng = random.Random(seed)
+        artifacts = random_artifacts(rng, rng.randint(0, 60))
+        multi_scope += len(partition_by_scope(a.scope for a in artifacts)) > 1
+        policy = ScopePolicy(
+            budgets={"billing": rng.randint(0, 300)},
+            default_budget=rng.randint(0, 200),
+            allowed=rng.choice([None, {"billing", "support"}, set()]),
+            global_budget=rng.randint(0, 300),
+        )
+        solver = rng.choice(gates.SOLVERS)
+        admitted, excluded = gates.gate_scoped(artifacts, policy, max_docs=2, solver=solver)
+
+        expected_admitted, expected_excluded = [], []
+        for scope, rows in partition_by_scope(a.scope for a in artifacts).items():
+            part = [artifacts[i] for i in rows]
+            if not policy.allows(scope):
+                expected_excluded.extend((a, "scope_denied") for a in part)
+                continue
+            a_in, a_out = gates.gate_artifacts(
+                part, budget_tokens=policy.budget(scope), max_docs=2, solver=solver, question="capital of france"
+            )
+            assert sum(gates.HeuristicTokenCounter().count(a.content) for a in a_in) <= policy.budget(scope)
+            expected_admitted.extend(a_in)
+            expected_excluded.extend(a_out)
+        assert excluded == expected_excluded, seed
+        assert sorted(map(id, admitted)) == sorted(map(id, expected_admitted)), seed
+        keys = [(a.authority_code, -gates.score(a)) for a in admitted]
+        assert keys == sorted(keys), seed
+    assert multi_scope > 100
+
+
+def test_parallel_scopes_match_serial():
+    artifacts = random_artifacts(random.Random(3), 400)
+    policy = ScopePolicy(budgets={"billing": 150}, default_budget=80, allowed={"billing", "support", "tenant-a"})
+    assert len(partition_by_scope(a.scope for a in artifacts)) == len(set(SCOPES))
+    serial = gates.gate_scoped(artifacts, policy)
+    with ProcessPoolExecutor(2) as pool:
+        parallel = gates.gate_scoped(artifacts, policy, executor=pool)
+    assert [a.artifact_id for a in parallel[0]] == [a.artifact_id for a in serial[0]]
+    assert [(a.artifact_id, r) for a, r in parallel[1]] == [(a.artifact_id, r) for a, r in serial[1]]
+
+
+def test_boundary_split_demo_runs(tmp_path):
+    records = [
+        {"id": "sys", "kind": "system", "authority": "system", "content": "Answer from documents only."},
+        {"id": "q", "kind": "message", "authority": "user", "content": "refund or reset steps?"},
+        {"id": "b1", "kind": "document", "authority": "tool", "scope": "billing", "content": "refund policy " * 4},
+        {"id": "b2", "kind": "document", "authority": "tool", "scope": "billing", "content": "lunch menu " * 4},
+        {"id": "s1", "kind": "document", "authority": "tool", "scope": "support", "content": "reset steps " * 4},
+        {"id": "t1", "kind": "document", "authority": "tool", "scope": "tenant-a", "content": "refund " * 4},
+    ]
+    path = tmp_path / "bundle.json"
+    path.write_text(json.dumps({"artifacts": records}))
+    script = REPO_ROOT / "30-control-mechanisms/isolation/scripts/boundary_split_demo.py"
+    result = subprocess.run(
+        [sys.executable, str(script), "-i", str(path), "--allow", "billing", "--allow", "support", "--workers", "2"],
+        text=True, capture_output=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "Boundary Split" in result.stdout
+
+    def table(title):  # rows under the first line starting with `title`, up to the blank line
+        lines = result.stdout.splitlines()
+        start = next(i for i, line in enumerate(lines) if line.startswith(title)) + 3
+        return [line.split() for line in lines[start : lines.index("", start)]]
+
+    # the demo reports exactly what the gate decides
+    artifacts = [normalize_artifact(r, i) for i, r in enumerate(records)]
+    admitted, excluded = gates.gate_scoped(artifacts, ScopePolicy(default_budget=200, allowed={"billing", "support"}))
+    assert [row[1] for row in table("Admitted context")] == [a.artifact_id for a in admitted]
+    assert [(row[0], row[-1]) for row in table("Excluded")] == [(a.artifact_id, r) for a, r in excluded]
+    assert {a.artifact_id: r for a, r in excluded} == {"b2": "out_of_scope", "t1": "scope_denied"}
@@ -0,0 +1,63 @@
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "bundle.json"
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+from context_core.bundle_stream import iter_artifact_records  # type: ignore  # noqa: E402
+
+
+def test_stream_matches_json_load_across_chunk_sizes():
+    text = FIXTURE.read_text()
+    expected = json.loads(text)["artifacts"]
+    jsonl = "\n".join(json.dumps(a) for a in expected)
+    for chunk in (1, 7, 1 << 20):
+        assert list(iter_artifact_records(io.StringIO(text), chunk)) == expected
+        assert list(iter_artifact_records(io.StringIO(jsonl), chunk)) == expected
+
+
+def test_bundle_without_artifacts_and_trailing_data():
+    # a lone object is a bundle even without "artifacts"; only two or more values are JSON Lines
+    assert list(iter_artifact_records(io.StringIO('{"question": "What?"}'))) == []
+    assert list(iter_artifact_records(io.StringIO('{"id": "a"}\n{"id": "b"}'))) == [{"id": "a"}, {"id": "b"}]
+    for text in ('{"artifacts": [{"id": "a"}]} {"id": "b"}', '[{"id": "a"}] []'):
+        with pytest.raises(ValueError):
+            list(iter_artifact_records(io.StringIO(text)))
+
+
+def test_budget_report_accepts_json_lines(tmp_path):
+    expected = json.loads(FIXTURE.read_text())["artifacts"]
+    path = tmp_path / "bundle.jsonl"
+    path.write_text("\n".join(json.dumps(a) for a in expected))
+    result = subprocess.run(
+        [
+            "python3",
+            "skills/operator/context-triage/scripts/context_budget_report.py",
+            "--input",
+            str(path),
+            "--budget",
+            "500",
+        ],
+        text=True,
+        capture_output=True,
+        check=True,
+    )
+    assert f"Artifacts:          {len(expected)}" in result.stdout
+
+
+def test_budget_report_on_bundle_without_artifacts(tmp_path):
+    path = tmp_path / "bundle.json"
+    path.write_text('{"question": "What?"}')
+    result = subprocess.run(
+        ["python3", "skills/operator/context-triage/scripts/context_budget_report.py", "--input", str(path)],
+        text=True,
+        capture_output=True,
+    )
+    assert result.returncode == 1
+    assert "No artifacts found" in result.stderr + result.stdout
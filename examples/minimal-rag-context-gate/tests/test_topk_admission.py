@@ -0,0 +1,53 @@
+import random
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+import gates  # type: ignore
+from context_core.admission import cap_rows, pack_greedy, rank_desc, select_greedy  # type: ignore  # noqa: E402
+from factories import random_bundle  # noqa: E402
+
+
+
+def test_select_greedy_matches_full_sort_packing():
+    for seed in range(2000):
+        rng = random.Random(seed)
+        n = rng.randint(0, 25)
+        scores = [rng.randint(0, 4) for _ in range(n)]
+        tokens = [rng.choice([0, 1, 3, 8, 20]) for _ in range(n)]
+        capped = [rng.random() < 0.4 and t > 0 for t in tokens]
+        rows = sorted(rng.sample(range(n), rng.randint(0, n)))
+        budget, cap = rng.randint(0, 50), rng.randint(0, 4)
+
+        order = rank_desc(scores, rows)
+        blocked = cap_rows(order, capped, cap)
+        flags = pack_greedy(order, tokens, budget, blocked=blocked)
+        admitted, ranked, rest = select_greedy(scores, tokens, budget, rows, capped, cap)
+
+        assert admitted == [r for r in order if flags[r]], seed
+        expected = {r: "empty" if tokens[r] == 0 else "cap" if blocked[r] else "budget" for r in order if not flags[r]}
+        assert dict(ranked + rest) == expected, seed
+        assert [r for r, _ in rest] == sorted(r for r, _ in rest)
+
+
+def test_select_greedy_stops_once_nothing_fits():
+    scores = list(range(1000, 0, -1))
+    tokens = [10] * 1000
+    admitted, ranked, rest = select_greedy(scores, tokens, budget=35)
+    assert admitted == [0, 1, 2]
+    assert ranked == []  # remaining budget 5 < smallest candidate: nothing else is ranked
+    assert len(rest) == 997
+
+
+def test_topk_gate_matches_greedy_decisions():
+    for seed in range(200):
+        rng = random.Random(seed)
+        bundle = random_bundle(rng, rng.randint(0, 20), max_words=30, max_priority=10, words=["paris"])
+        artifacts = gates.load_bundle(bundle)
+        budget, max_docs = rng.randint(0, 200), rng.randint(0, 4)
+        greedy = gates.gate_artifacts(artifacts, budget_tokens=budget, max_docs=max_docs)
+        topk = gates.gate_artifacts(artifacts, budget_tokens=budget, max_docs=max_docs, solver="topk")
+        assert topk[0] == greedy[0], seed
+        assert sorted(topk[1], key=lambda p: p[0].artifact_id) == sorted(greedy[1], key=lambda p: p[0].artifact_id)
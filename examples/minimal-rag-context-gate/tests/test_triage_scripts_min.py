@@ -52,3 +52,28 @@ def test_duplicate_scan_runs():
         ]
     )
     assert "Duplicate Scan Report" in result.stdout
+
+
+def test_duplicate_scan_lsh_mode_runs():
+    result = run(
+        [
+            "python3",
+            "skills/operator/context-triage/scripts/duplicate_scan_demo.py",
+            "--input",
+            str(FIXTURE),
+            "--near-threshold",
+            "0.8",
+            "--shingle-k",
+            "3",
+            "--mode",
+            "lsh",
+            "--bands",
+            "16",
+            "--rows",
+            "4",
+            "--compare",
+        ]
+    )
+    assert "Mode:                  lsh" in result.stdout
+    assert "Mode comparison (lsh vs exact)" in result.stdout
+    assert "Recall:" in result.stdout
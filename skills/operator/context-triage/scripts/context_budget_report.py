@@ -5,7 +5,7 @@ Skill: skills/operator/context-triage/SKILL.md
 Note: Illustrative script. Not production code. Authority: human-supervised execution.
 
 What this script does
-- Loads a context bundle (JSON) from a file path or stdin
+- Streams a context bundle (JSON or JSON Lines) from a file path or stdin
 - Estimates token usage per artifact using a consistent heuristic
 - Produces a budget report and a ranked admission preview
 
@@ -18,17 +18,43 @@ What this script does not do
 from __future__ import annotations
 
 import argparse
-import json
+import itertools
+import sqlite3
 import sys
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from context_core.admission import (  # noqa: E402
+    pack_greedy,
+    pack_knapsack,
+    pinned_rows,
+    rank_desc,
+    score_columns,
+    select_greedy,
+)
+from context_core.artifact import Artifact, ArtifactBatch, normalize_artifact  # noqa: E402
+from context_core.bundle_stream import iter_artifact_records  # noqa: E402
+from context_core.precedence import DEFAULT_WEIGHTS  # noqa: E402
+from context_core.tokens import (  # noqa: E402
+    ArtifactTokenCounter,
+    CachedTokenCounter,
+    DiskTokenCache,
+    TokenCounter,
+    make_counter,
+)
+from context_core.tokens import HeuristicTokenCounter as SharedHeuristicTokenCounter  # noqa: E402
 
 
 # ----------------------------
-# Token counting (consistent heuristic)
+# Token counting (consistent heuristic by default)
 # ----------------------------
 
-class HeuristicTokenCounter:
+class HeuristicTokenCounter(SharedHeuristicTokenCounter):
     """
     Consistent heuristic token counter.
 
@@ -36,7 +62,8 @@ class HeuristicTokenCounter:
     - Roughly 4 characters per token for English prose
     - Adds a small fixed overhead per artifact to account for framing
 
-    This is intentionally simple and stable for demos.
+    This is intentionally simple and stable for demos. Use --tokenizer
+    approx or bpe for estimates closer to a real tokenizer.
     """
 
     def __init__(self, chars_per_token: int = 4, per_artifact_overhead: int = 10) -> None:
@@ -44,69 +71,19 @@ class HeuristicTokenCounter:
             raise ValueError("chars_per_token must be > 0")
         if per_artifact_overhead < 0:
             raise ValueError("per_artifact_overhead must be >= 0")
-        self.chars_per_token = chars_per_token
-        self.per_artifact_overhead = per_artifact_overhead
+        super().__init__(chars_per_token, per_artifact_overhead, min_one=True)
 
     def count_text(self, text: str) -> int:
-        if not text:
-            return 0
-        return max(1, len(text) // self.chars_per_token)
+        return self.backend.count_text(text)
 
     def count_artifact(self, text: str) -> int:
-        base = self.count_text(text)
-        if base == 0:
-            return 0
-        return base + self.per_artifact_overhead
-
-
-# ----------------------------
-# Data model
-# ----------------------------
-
-@dataclass
-class Artifact:
-    artifact_id: str
-    kind: str  # system | task | message | document | tool_output | other
-    authority: str  # system | developer | user | tool | other
-    priority: int  # higher means earlier admission
-    title: str
-    content: str
-    scope: Optional[str] = None
-    timestamp: Optional[str] = None
+        return self.count(text)
 
 
 # ----------------------------
 # Loading and normalization
 # ----------------------------
 
-ALLOWED_AUTHORITIES = {"system", "developer", "user", "tool", "other"}
-ALLOWED_KINDS = {"system", "task", "message", "document", "tool_output", "other"}
-
-DEFAULT_AUTHORITY_WEIGHT = {
-    "system": 1000,
-    "developer": 800,
-    "user": 600,
-    "tool": 400,
-    "other": 200,
-}
-
-DEFAULT_KIND_WEIGHT = {
-    "system": 120,
-    "task": 110,
-    "message": 60,
-    "document": 50,
-    "tool_output": 40,
-    "other": 10,
-}
-
-
-def _safe_int(x: Any, default: int = 0) -> int:
-    try:
-        return int(x)
-    except Exception:
-        return default
-
-
 def normalize_bundle(bundle: Dict[str, Any]) -> List[Artifact]:
     """
     Accepts a JSON dict with a top-level key "artifacts" containing list items.
@@ -128,46 +105,13 @@ def normalize_bundle(bundle: Dict[str, Any]) -> List[Artifact]:
     if not isinstance(artifacts_raw, list):
         raise ValueError("bundle.artifacts must be a list")
 
-    artifacts: List[Artifact] = []
-    for i, a in enumerate(artifacts_raw):
-        if not isinstance(a, dict):
-            raise ValueError(f"artifact at index {i} must be an object")
-
-        artifact_id = str(a.get("id") or a.get("artifact_id") or f"artifact_{i}")
-        kind = str(a.get("kind") or "other").strip()
-        authority = str(a.get("authority") or "other").strip()
-        priority = _safe_int(a.get("priority"), default=0)
-        title = str(a.get("title") or artifact_id).strip()
-        content = str(a.get("content") or "").strip()
-        scope = a.get("scope")
-        timestamp = a.get("timestamp")
-
-        if kind not in ALLOWED_KINDS:
-            kind = "other"
-        if authority not in ALLOWED_AUTHORITIES:
-            authority = "other"
-
-        artifacts.append(
-            Artifact(
-                artifact_id=artifact_id,
-                kind=kind,
-                authority=authority,
-                priority=priority,
-                title=title,
-                content=content,
-                scope=str(scope) if scope is not None else None,
-                timestamp=str(timestamp) if timestamp is not None else None,
-            )
-        )
-
-    return artifacts
+    return [normalize_artifact(a, i) for i, a in enumerate(artifacts_raw)]
 
 
-def load_json_from_path_or_stdin(path: Optional[str]) -> Dict[str, Any]:
-    if path and path != "-":
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return json.load(sys.stdin)
+def iter_artifacts(path: Optional[str]) -> Iterator[Artifact]:
+    """Streams normalized artifacts from a bundle, JSON array or JSON Lines file (or stdin)."""
+    for i, a in enumerate(iter_artifact_records(path)):
+        yield normalize_artifact(a, i)
 
 
 # ----------------------------
@@ -179,15 +123,20 @@ def score_for_admission(a: Artifact) -> int:
     Admission score: authority weight + kind weight + explicit priority.
     Higher score admitted earlier.
     """
-    return (
-        DEFAULT_AUTHORITY_WEIGHT.get(a.authority, 0)
-        + DEFAULT_KIND_WEIGHT.get(a.kind, 0)
-        + a.priority
-    )
+    return DEFAULT_WEIGHTS.score(a)
+
+
+BREAKDOWN_KEY_BY_KIND = {
+    "system": "system_prompt",
+    "task": "task",
+    "message": "message_history",
+    "document": "retrieved_documents",
+    "tool_output": "tool_outputs",
+}
 
 
-def compute_breakdown(artifacts: List[Artifact], counter: HeuristicTokenCounter) -> Dict[str, int]:
-    breakdown: Dict[str, int] = {
+def empty_breakdown() -> Dict[str, int]:
+    return {
         "system_prompt": 0,
         "task": 0,
         "message_history": 0,
@@ -196,41 +145,76 @@ def compute_breakdown(artifacts: List[Artifact], counter: HeuristicTokenCounter)
         "other": 0,
     }
 
-    for a in artifacts:
-        tokens = counter.count_artifact(a.content)
-        if a.kind == "system":
-            breakdown["system_prompt"] += tokens
-        elif a.kind == "task":
-            breakdown["task"] += tokens
-        elif a.kind == "message":
-            breakdown["message_history"] += tokens
-        elif a.kind == "document":
-            breakdown["retrieved_documents"] += tokens
-        elif a.kind == "tool_output":
-            breakdown["tool_outputs"] += tokens
-        else:
-            breakdown["other"] += tokens
 
+def compute_breakdown(artifacts: Iterable[Artifact], counter: TokenCounter) -> Dict[str, int]:
+    """Accepts any iterable, so a streamed bundle is summed in constant memory."""
+    breakdown = empty_breakdown()
+    for a in artifacts:
+        breakdown[BREAKDOWN_KEY_BY_KIND.get(a.kind, "other")] += counter.count(a.content)
     return breakdown
 
 
+@dataclass
+class StreamSummary:
+    artifacts: int
+    total_tokens: int
+    breakdown: Dict[str, int]
+    # Per-artifact (artifact, tokens) for the admission preview. Content is
+    # cut to the preview length so only metadata stays resident.
+    scored: List[Tuple[Artifact, int]]
+
+
+# Artifacts counted per count_many() call: one cache lookup/write per chunk,
+# while only a chunk's full content is held at once.
+COUNT_CHUNK = 1024
+
+
+def summarize_stream(
+    artifacts: Iterable[Artifact],
+    counter: TokenCounter,
+    keep_chars: int = 0,
+) -> StreamSummary:
+    """
+    Single pass over an artifact stream: counts each artifact once (in
+    chunks of COUNT_CHUNK, through count_many when the counter has it) and
+    accumulates totals and the kind breakdown without holding content.
+    """
+    summary = StreamSummary(artifacts=0, total_tokens=0, breakdown=empty_breakdown(), scored=[])
+    count_many = getattr(counter, "count_many", None)
+    it = iter(artifacts)
+    while True:
+        chunk = list(itertools.islice(it, COUNT_CHUNK))
+        if not chunk:
+            return summary
+        texts = [a.content for a in chunk]
+        counts = count_many(texts) if count_many else [counter.count(t) for t in texts]
+        for a, t in zip(chunk, counts):
+            summary.artifacts += 1
+            summary.total_tokens += t
+            summary.breakdown[BREAKDOWN_KEY_BY_KIND.get(a.kind, "other")] += t
+            summary.scored.append((a.replace(content=a.content[:keep_chars]), t))
+
+
 def admission_preview(
     artifacts: List[Artifact],
-    counter: HeuristicTokenCounter,
+    counter: TokenCounter,
     budget_tokens: int,
+    token_counts: Optional[List[int]] = None,
 ) -> Tuple[List[Tuple[Artifact, int]], List[Tuple[Artifact, int]]]:
     """
     Returns (admitted, excluded) lists with their token estimates.
     Admits artifacts by admission score until budget is exhausted.
+    Pass token_counts (aligned with artifacts) to skip recounting.
     """
-    ranked = sorted(artifacts, key=score_for_admission, reverse=True)
+    if token_counts is None:
+        token_counts = [counter.count(a.content) for a in artifacts]
+    ranked = sorted(zip(artifacts, token_counts), key=lambda p: score_for_admission(p[0]), reverse=True)
 
     admitted: List[Tuple[Artifact, int]] = []
     excluded: List[Tuple[Artifact, int]] = []
 
     used = 0
-    for a in ranked:
-        t = counter.count_artifact(a.content)
+    for a, t in ranked:
         if t == 0:
             # Empty content, exclude by default to avoid false admission.
             excluded.append((a, t))
@@ -245,6 +229,41 @@ def admission_preview(
     return admitted, excluded
 
 
+def admission_preview_batch(
+    batch: ArtifactBatch,
+    token_counts: Sequence[int],
+    budget_tokens: int,
+    solver: str = "greedy",
+    time_limit: float = 0.05,
+) -> Tuple[List[int], List[int]]:
+    """
+    Columnar admission_preview(): identical decisions, returned as row
+    indices in ranked order. Scoring, ranking and packing run over the
+    batch arrays (NumPy when available).
+
+    solver="knapsack" keeps greedy's decisions for system/developer
+    artifacts and admits the highest-scoring subset of the rest that fits
+    the remaining budget (never a lower total score than greedy). solver="topk" admits what greedy
+    admits but stops ranking once nothing else can fit; the unranked rest
+    is listed after the ranked exclusions, in bundle order.
+    """
+    scores = score_columns(batch.authority, batch.kind, batch.priority, DEFAULT_WEIGHTS)
+    if solver == "topk":
+        admitted, ranked, rest = select_greedy(scores.tolist(), token_counts, budget_tokens)
+        return admitted, [i for i, _ in ranked + rest]
+    order = rank_desc(scores)
+    if solver == "knapsack":
+        flags = pack_knapsack(
+            order, token_counts, scores.tolist(), budget_tokens,
+            pinned=pinned_rows(batch.authority), time_limit=time_limit,
+        )
+    else:
+        flags = pack_greedy(order, token_counts, budget_tokens)
+    admitted = [i for i in order if flags[i]]
+    excluded = [i for i in order if not flags[i]]
+    return admitted, excluded
+
+
 def fmt_pct(x: float) -> str:
     return f"{x * 100:.1f}%"
 
@@ -297,44 +316,114 @@ def main() -> int:
         default=0,
         help="If > 0, prints a short content preview per artifact (first N chars).",
     )
-    args = parser.parse_args()
-
-    counter = HeuristicTokenCounter(
-        chars_per_token=args.chars_per_token,
-        per_artifact_overhead=args.overhead,
+    parser.add_argument(
+        "--tokenizer",
+        choices=["heuristic", "approx", "bpe"],
+        default="heuristic",
+        help="Token counting backend: chars-per-token heuristic, fast byte-pair approximation, or exact BPE.",
+    )
+    parser.add_argument(
+        "--bpe-vocab",
+        default=None,
+        help="BPE vocabulary in tiktoken ranks format ('<base64 token> <rank>' per line); needed for --tokenizer bpe.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used to count large batches with approx/bpe tokenizers.",
+    )
+    parser.add_argument(
+        "--solver",
+        choices=["greedy", "topk", "knapsack"],
+        default="greedy",
+        help=(
+            "Admission packing: first-fit by score, first-fit ranking only what can still fit, "
+            "or optimal total score within the budget."
+        ),
     )
+    parser.add_argument(
+        "--time-limit-ms",
+        type=int,
+        default=50,
+        help="Knapsack search time limit; the best packing found so far is used after it.",
+    )
+    parser.add_argument(
+        "--token-cache",
+        default=None,
+        help="Optional SQLite file caching token counts by content hash across runs.",
+    )
+    args = parser.parse_args()
 
     if args.budget <= 0:
         print("ERROR: budget must be a positive integer", file=sys.stderr)
         return 2
 
     try:
-        bundle = load_json_from_path_or_stdin(args.input)
-        artifacts = normalize_bundle(bundle)
+        if args.tokenizer == "heuristic":
+            base_counter: ArtifactTokenCounter = HeuristicTokenCounter(
+                chars_per_token=args.chars_per_token,
+                per_artifact_overhead=args.overhead,
+            )
+        else:
+            base_counter = make_counter(
+                args.tokenizer,
+                vocab=args.bpe_vocab,
+                per_artifact_overhead=args.overhead,
+                workers=args.workers,
+            )
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        disk_cache = DiskTokenCache(args.token_cache) if args.token_cache else None
+    except (OSError, sqlite3.Error) as e:
+        print(f"ERROR: cannot open token cache {args.token_cache}: {e}", file=sys.stderr)
+        return 2
+
+    # Stream once: totals and breakdown in constant memory, content kept
+    # only up to the preview length (+1 to know whether to add an ellipsis).
+    keep_chars = args.max_content_preview + 1 if args.max_content_preview > 0 else 0
+    try:
+        counter: TokenCounter = base_counter
+        if disk_cache is not None:
+            counter = CachedTokenCounter(counter, disk=disk_cache)
+        summary = summarize_stream(iter_artifacts(args.input), counter, keep_chars)
     except Exception as e:
         print(f"ERROR: failed to load/parse context bundle: {e}", file=sys.stderr)
         return 2
+    finally:
+        # Counting is done; summary.scored already holds every count.
+        base_counter.close()
+        if disk_cache is not None:
+            disk_cache.close()
 
-    if not artifacts:
+    if not summary.artifacts:
         print("No artifacts found in bundle.artifacts", file=sys.stderr)
         return 1
 
     # Compute totals
-    per_artifact_tokens = [(a, counter.count_artifact(a.content)) for a in artifacts]
-    total_tokens = sum(t for _, t in per_artifact_tokens)
+    total_tokens = summary.total_tokens
     utilization = total_tokens / float(args.budget) if args.budget > 0 else 0.0
 
-    breakdown = compute_breakdown(artifacts, counter)
-    admitted, excluded = admission_preview(artifacts, counter, args.budget)
+    breakdown = summary.breakdown
+    batch = ArtifactBatch.from_artifacts(a for a, _ in summary.scored)
+    token_counts = [t for _, t in summary.scored]
+    admitted_rows, excluded_rows = admission_preview_batch(
+        batch, token_counts, args.budget, solver=args.solver, time_limit=args.time_limit_ms / 1000.0
+    )
+    admitted = [summary.scored[i] for i in admitted_rows]
+    excluded = [summary.scored[i] for i in excluded_rows]
 
     admitted_tokens = sum(t for _, t in admitted)
     excluded_tokens = sum(t for _, t in excluded)
 
     # Summary
     print("")
-    print("Context Budget Report (heuristic)")
+    print(f"Context Budget Report ({args.tokenizer})")
     print("--------------------------------")
-    print(f"Artifacts:          {len(artifacts)}")
+    print(f"Artifacts:          {summary.artifacts}")
     print(f"Budget (tokens):    {args.budget}")
     print(f"Estimated total:    {total_tokens}")
     print(f"Utilization:        {fmt_pct(utilization)}")
@@ -5,11 +5,15 @@ Skill: skills/operator/context-triage/SKILL.md
 Note: Illustrative script. Not production code. Authority: human-supervised execution.
 
 What this script does
-- Loads a context bundle (JSON) from a file path or stdin
+- Streams a context bundle (JSON or JSON Lines) from a file path or stdin
 - Normalizes text lightly (whitespace + lowercasing)
+- Fingerprints each artifact once (hashed shingle set)
 - Finds likely duplicates using:
   1) Exact hash match (post-normalization)
   2) Near-duplicate match using shingled Jaccard similarity
+     - exact mode: compares every pair (small bundles)
+     - lsh mode: MinHash signatures + LSH banding propose candidate pairs,
+       which are then verified with the same Jaccard score
 - Produces a grouped report suitable for operator review
 
 What this script does not do
@@ -22,69 +26,38 @@ from __future__ import annotations
 
 import argparse
 import hashlib
-import json
+import random
 import re
 import sys
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from context_core.artifact import Artifact, normalize_artifact  # noqa: E402
+from context_core.bundle_stream import iter_artifact_records  # noqa: E402
 
 
 # ----------------------------
 # Data model and loading
 # ----------------------------
 
-@dataclass
-class Artifact:
-    artifact_id: str
-    kind: str
-    authority: str
-    priority: int
-    title: str
-    content: str
-
-
-def _safe_int(x: Any, default: int = 0) -> int:
-    try:
-        return int(x)
-    except Exception:
-        return default
-
-
-def load_json_from_path_or_stdin(path: Optional[str]) -> Dict[str, Any]:
-    if path and path != "-":
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return json.load(sys.stdin)
-
-
 def normalize_bundle(bundle: Dict[str, Any]) -> List[Artifact]:
     artifacts_raw = bundle.get("artifacts", [])
     if not isinstance(artifacts_raw, list):
         raise ValueError("bundle.artifacts must be a list")
 
-    artifacts: List[Artifact] = []
-    for i, a in enumerate(artifacts_raw):
-        if not isinstance(a, dict):
-            raise ValueError(f"artifact at index {i} must be an object")
-
-        artifact_id = str(a.get("id") or a.get("artifact_id") or f"artifact_{i}")
-        kind = str(a.get("kind") or "other").strip()
-        authority = str(a.get("authority") or "other").strip()
-        priority = _safe_int(a.get("priority"), default=0)
-        title = str(a.get("title") or artifact_id).strip()
-        content = str(a.get("content") or "").strip()
-
-        artifacts.append(
-            Artifact(
-                artifact_id=artifact_id,
-                kind=kind,
-                authority=authority,
-                priority=priority,
-                title=title,
-                content=content,
-            )
-        )
-    return artifacts
+    return [normalize_artifact(a, i) for i, a in enumerate(artifacts_raw)]
+
+
+def iter_artifacts(path: Optional[str]) -> Iterator[Artifact]:
+    """Streams normalized artifacts from a bundle, JSON array or JSON Lines file (or stdin)."""
+    for i, a in enumerate(iter_artifact_records(path)):
+        yield normalize_artifact(a, i)
 
 
 # ----------------------------
@@ -129,25 +102,38 @@ def shingles(word_tokens: List[str], k: int) -> List[Tuple[str, ...]]:
     return [tuple(word_tokens[i : i + k]) for i in range(len(word_tokens) - k + 1)]
 
 
-def jaccard(a: set, b: set) -> float:
-    if not a and not b:
-        return 1.0
-    if not a or not b:
-        return 0.0
-    inter = a.intersection(b)
-    union = a.union(b)
-    return len(inter) / float(len(union))
+# ----------------------------
+# Per-artifact fingerprints (computed once per scan)
+# ----------------------------
 
+def shingle_hash(shingle: Tuple[str, ...]) -> int:
+    """Stable 64-bit hash of a shingle (independent of PYTHONHASHSEED)."""
+    digest = hashlib.blake2b(" ".join(shingle).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
 
-def near_duplicate_score(text_a: str, text_b: str, shingle_k: int) -> float:
-    ta = tokens(text_a)
-    tb = tokens(text_b)
-    # If either text is too short for the shingle length, treat as non-duplicate.
-    if len(ta) < shingle_k or len(tb) < shingle_k:
-        return 0.0
-    sa = set(shingles(ta, shingle_k))
-    sb = set(shingles(tb, shingle_k))
-    return jaccard(sa, sb)
+
+@dataclass
+class Fingerprint:
+    artifact_id: str
+    shingles: FrozenSet[int]  # 64-bit hashed shingles
+    size: int  # len(shingles)
+
+
+def fingerprint(art: Artifact, shingle_k: int) -> Fingerprint:
+    nt = normalize_text(art.content)
+    hs = frozenset(shingle_hash(sh) for sh in shingles(tokens(nt), shingle_k)) if nt else frozenset()
+    return Fingerprint(art.artifact_id, hs, len(hs))
+
+
+def fingerprint_artifacts(artifacts: List[Artifact], shingle_k: int) -> List[Fingerprint]:
+    """Tokenizes and shingles each artifact exactly once."""
+    return [fingerprint(a, shingle_k) for a in artifacts]
+
+
+def fingerprint_score(a: Fingerprint, b: Fingerprint) -> float:
+    """Jaccard of two fingerprints using only the intersection size."""
+    inter = len(a.shingles & b.shingles)
+    return inter / float(a.size + b.size - inter)
 
 
 # ----------------------------
@@ -182,31 +168,35 @@ def near_duplicates(
     threshold: float,
     shingle_k: int,
     max_pairs: int,
+    fingerprints: Optional[List[Fingerprint]] = None,
 ) -> List[PairMatch]:
     """
     Returns a list of high-scoring pairs (potential near-duplicates).
 
-    This is O(n^2) and intended for small demo bundles.
-    For larger sets, add blocking by title hash or MinHash/LSH.
+    Still O(n^2) pairs in the worst case, but each artifact is fingerprinted
+    once and pairs are visited in order of shingle count. Since
+    jaccard <= min(|A|, |B|) / max(|A|, |B|), the inner loop stops as soon
+    as the size ratio makes the threshold unreachable.
+    For larger sets, use near_duplicates_lsh() (--mode lsh).
     """
+    fps = fingerprints if fingerprints is not None else fingerprint_artifacts(artifacts, shingle_k)
+    # Artifacts too short for the shingle length are treated as non-duplicates.
+    ordered = sorted((fp for fp in fps if fp.size), key=lambda fp: fp.size)
     matches: List[PairMatch] = []
-    n = len(artifacts)
+    n = len(ordered)
 
     for i in range(n):
-        ai = artifacts[i]
-        ti = normalize_text(ai.content)
-        if not ti:
-            continue
+        fi = ordered[i]
+        max_size = fi.size / threshold if threshold > 0 else float("inf")
 
         for j in range(i + 1, n):
-            aj = artifacts[j]
-            tj = normalize_text(aj.content)
-            if not tj:
-                continue
+            fj = ordered[j]
+            if fj.size > max_size:
+                break
 
-            score = near_duplicate_score(ti, tj, shingle_k=shingle_k)
+            score = fingerprint_score(fi, fj)
             if score >= threshold:
-                matches.append(PairMatch(ai.artifact_id, aj.artifact_id, score))
+                matches.append(PairMatch(fi.artifact_id, fj.artifact_id, score))
 
             if len(matches) >= max_pairs:
                 return sorted(matches, key=lambda m: m.score, reverse=True)
@@ -214,6 +204,134 @@ def near_duplicates(
     return sorted(matches, key=lambda m: m.score, reverse=True)
 
 
+# ----------------------------
+# Near-duplicate candidates via MinHash + LSH banding
+# ----------------------------
+
+def minhash_masks(num_perm: int, seed: int) -> List[int]:
+    """
+    One random 64-bit mask per permutation.
+
+    XOR with a random mask permutes the 64-bit hash space, so min(h ^ mask)
+    over a set of well-mixed hashes behaves like a min-wise hash.
+    """
+    rng = random.Random(seed)
+    return [rng.getrandbits(64) for _ in range(num_perm)]
+
+
+def minhash_signature(hashes: Iterable[int], masks: List[int]) -> Tuple[int, ...]:
+    hs = list(hashes)
+    return tuple(min(map(m.__xor__, hs)) for m in masks)
+
+
+def lsh_candidate_pairs(signatures: Dict[int, Tuple[int, ...]], bands: int, rows: int) -> Set[Tuple[int, int]]:
+    """
+    Buckets each signature band; artifacts sharing any band bucket become candidates.
+    Work is linear in the number of signatures plus the size of colliding buckets.
+    """
+    candidates: Set[Tuple[int, int]] = set()
+    for b in range(bands):
+        lo = b * rows
+        buckets: Dict[Tuple[int, ...], List[int]] = {}
+        for idx, sig in signatures.items():
+            buckets.setdefault(sig[lo : lo + rows], []).append(idx)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    candidates.add((members[x], members[y]))
+    return candidates
+
+
+def near_duplicates_lsh(
+    artifacts: List[Artifact],
+    threshold: float,
+    shingle_k: int,
+    bands: int,
+    rows: int,
+    seed: int = 0,
+    stats: Optional[Dict[str, int]] = None,
+    fingerprints: Optional[List[Fingerprint]] = None,
+) -> List[PairMatch]:
+    """
+    Near-linear alternative to near_duplicates().
+
+    Each fingerprint is summarized as a MinHash signature of bands * rows
+    values and bucketed per band. Only pairs that collide in at least one
+    band are scored, so every returned pair has the same score exact mode
+    would give it. Pairs the banding never proposes are missed; raise
+    --bands (or lower --rows) to trade time for recall.
+    """
+    if bands <= 0 or rows <= 0:
+        raise ValueError("bands and rows must be > 0")
+
+    fps = fingerprints if fingerprints is not None else fingerprint_artifacts(artifacts, shingle_k)
+    masks = minhash_masks(bands * rows, seed)
+    signatures: Dict[int, Tuple[int, ...]] = {
+        idx: minhash_signature(fp.shingles, masks) for idx, fp in enumerate(fps) if fp.size
+    }
+
+    candidates = lsh_candidate_pairs(signatures, bands=bands, rows=rows)
+
+    matches: List[PairMatch] = []
+    for i, j in sorted(candidates):
+        score = fingerprint_score(fps[i], fps[j])
+        if score >= threshold:
+            matches.append(PairMatch(fps[i].artifact_id, fps[j].artifact_id, score))
+
+    if stats is not None:
+        stats["candidates"] = len(candidates)
+        stats["verified"] = len(matches)
+    return sorted(matches, key=lambda m: m.score, reverse=True)
+
+
+def group_pairs(artifacts: List[Artifact], pairs: List[PairMatch]) -> List[List[str]]:
+    """Connected components over matched pairs (simple union-find)."""
+    parent: Dict[str, str] = {}
+
+    def find(x: str) -> str:
+        parent.setdefault(x, x)
+        if parent[x] != x:
+            parent[x] = find(parent[x])
+        return parent[x]
+
+    def union(x: str, y: str) -> None:
+        rx, ry = find(x), find(y)
+        if rx != ry:
+            parent[ry] = rx
+
+    for m in pairs:
+        union(m.a_id, m.b_id)
+
+    comps: Dict[str, List[str]] = {}
+    for a in artifacts:
+        root = find(a.artifact_id)
+        comps.setdefault(root, []).append(a.artifact_id)
+
+    groups = [sorted(v) for v in comps.values() if len(v) >= 2]
+    return sorted(groups, key=lambda g: (-len(g), g))
+
+
+def compare_modes(exact: List[PairMatch], lsh: List[PairMatch], lsh_candidates: int) -> Dict[str, float]:
+    """
+    Recall/precision of lsh mode measured against exact mode.
+
+    - recall: share of exact-mode pairs that lsh mode also reports
+    - precision: share of lsh-mode pairs that exact mode also reports
+      (1.0 by construction, since candidates are verified with jaccard)
+    - candidate_precision: share of LSH candidates that survived verification
+    """
+    exact_keys = {frozenset((m.a_id, m.b_id)) for m in exact}
+    lsh_keys = {frozenset((m.a_id, m.b_id)) for m in lsh}
+    hits = len(exact_keys & lsh_keys)
+    return {
+        "recall": hits / len(exact_keys) if exact_keys else 1.0,
+        "precision": hits / len(lsh_keys) if lsh_keys else 1.0,
+        "candidate_precision": len(lsh_keys) / lsh_candidates if lsh_candidates else 1.0,
+    }
+
+
 def print_groups(title: str, groups: List[List[str]]) -> None:
     print(title)
     print("-" * len(title))
@@ -226,6 +344,45 @@ def print_groups(title: str, groups: List[List[str]]) -> None:
     print("")
 
 
+def print_comparison(artifacts: List[Artifact], args: argparse.Namespace, fps: List[Fingerprint]) -> None:
+    """Runs both modes uncapped and prints lsh recall/precision against exact mode."""
+    n = len(artifacts)
+    start = time.perf_counter()
+    exact = near_duplicates(
+        artifacts=artifacts,
+        threshold=args.near_threshold,
+        shingle_k=args.shingle_k,
+        max_pairs=max(1, n * (n - 1) // 2),
+        fingerprints=fps,
+    )
+    exact_s = time.perf_counter() - start
+
+    stats: Dict[str, int] = {}
+    start = time.perf_counter()
+    lsh = near_duplicates_lsh(
+        artifacts=artifacts,
+        threshold=args.near_threshold,
+        shingle_k=args.shingle_k,
+        bands=args.bands,
+        rows=args.rows,
+        seed=args.seed,
+        stats=stats,
+        fingerprints=fps,
+    )
+    lsh_s = time.perf_counter() - start
+
+    result = compare_modes(exact, lsh, stats.get("candidates", 0))
+    print("Mode comparison (lsh vs exact)")
+    print("------------------------------")
+    print(f"Exact pairs:           {len(exact)}  ({exact_s:.3f}s)")
+    print(f"LSH pairs:             {len(lsh)}  ({lsh_s:.3f}s)")
+    print(f"LSH candidates:        {stats.get('candidates', 0)}")
+    print(f"Recall:                {result['recall']:.3f}")
+    print(f"Precision:             {result['precision']:.3f}")
+    print(f"Candidate precision:   {result['candidate_precision']:.3f}")
+    print("")
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Context Triage demo: scan for duplicate and near-duplicate artifacts."
@@ -252,7 +409,39 @@ def main() -> int:
         "--max-pairs",
         type=int,
         default=200,
-        help="Maximum near-duplicate pairs to report (caps runtime).",
+        help=(
+            "Maximum near-duplicate pairs to report in exact mode (caps runtime). "
+            "Pairs are visited smallest artifact first (by shingle count), not in input order."
+        ),
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["exact", "lsh"],
+        default="exact",
+        help="Near-duplicate search: 'exact' compares every pair, 'lsh' uses MinHash + LSH banding.",
+    )
+    parser.add_argument(
+        "--bands",
+        type=int,
+        default=20,
+        help="LSH mode: number of bands (more bands raise recall and candidate count).",
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=5,
+        help="LSH mode: MinHash rows per band (more rows lower false candidates).",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="LSH mode: seed for MinHash permutations.",
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Run both modes and report lsh recall/precision against exact mode.",
     )
     args = parser.parse_args()
 
@@ -265,10 +454,12 @@ def main() -> int:
     if args.max_pairs <= 0:
         print("ERROR: --max-pairs must be > 0", file=sys.stderr)
         return 2
+    if args.bands <= 0 or args.rows <= 0:
+        print("ERROR: --bands and --rows must be > 0", file=sys.stderr)
+        return 2
 
     try:
-        bundle = load_json_from_path_or_stdin(args.input)
-        artifacts = normalize_bundle(bundle)
+        artifacts = list(iter_artifacts(args.input))
     except Exception as e:
         print(f"ERROR: failed to load/parse context bundle: {e}", file=sys.stderr)
         return 2
@@ -283,39 +474,31 @@ def main() -> int:
     for _, group in exact.items():
         exact_groups.append([a.artifact_id for a in group])
 
-    # Near duplicates (pair list)
-    near = near_duplicates(
-        artifacts=artifacts,
-        threshold=args.near_threshold,
-        shingle_k=args.shingle_k,
-        max_pairs=args.max_pairs,
-    )
-
-    # Build near-duplicate adjacency groups (simple union-find)
-    parent: Dict[str, str] = {}
-
-    def find(x: str) -> str:
-        parent.setdefault(x, x)
-        if parent[x] != x:
-            parent[x] = find(parent[x])
-        return parent[x]
-
-    def union(x: str, y: str) -> None:
-        rx, ry = find(x), find(y)
-        if rx != ry:
-            parent[ry] = rx
-
-    for m in near:
-        union(m.a_id, m.b_id)
-
-    # Collect components
-    comps: Dict[str, List[str]] = {}
-    for a in artifacts:
-        root = find(a.artifact_id)
-        comps.setdefault(root, []).append(a.artifact_id)
+    # Near duplicates (pair list), fingerprinting each artifact once
+    fps = fingerprint_artifacts(artifacts, args.shingle_k)
+    lsh_stats: Dict[str, int] = {}
+    if args.mode == "lsh":
+        # Every verified pair feeds grouping; no early cut-off.
+        near = near_duplicates_lsh(
+            artifacts=artifacts,
+            threshold=args.near_threshold,
+            shingle_k=args.shingle_k,
+            bands=args.bands,
+            rows=args.rows,
+            seed=args.seed,
+            stats=lsh_stats,
+            fingerprints=fps,
+        )
+    else:
+        near = near_duplicates(
+            artifacts=artifacts,
+            threshold=args.near_threshold,
+            shingle_k=args.shingle_k,
+            max_pairs=args.max_pairs,
+            fingerprints=fps,
+        )
 
-    near_groups = [sorted(v) for v in comps.values() if len(v) >= 2]
-    near_groups = sorted(near_groups, key=lambda g: (-len(g), g))
+    near_groups = group_pairs(artifacts, near)
 
     # Print report
     print("")
@@ -326,6 +509,10 @@ def main() -> int:
     print(f"Near-dup groups:       {len(near_groups)}")
     print(f"Near threshold:        {args.near_threshold}")
     print(f"Shingle k:             {args.shingle_k}")
+    print(f"Mode:                  {args.mode}")
+    if args.mode == "lsh":
+        print(f"LSH bands x rows:      {args.bands} x {args.rows}")
+        print(f"LSH candidates:        {lsh_stats.get('candidates', 0)}")
     print("")
 
     print_groups("Exact duplicates (post-normalization)", [sorted(g) for g in exact_groups])
@@ -342,6 +529,9 @@ def main() -> int:
             print(f"{m.a_id}  <->  {m.b_id}   score={m.score:.3f}")
         print("")
 
+    if args.compare:
+        print_comparison(artifacts, args, fps)
+
     print("Operator reminder")
     print("-----------------")
     print("This scan suggests candidates for redundancy removal.")
@@ -5,7 +5,7 @@ Skill: skills/operator/context-triage/SKILL.md
 Note: Illustrative script. Not production code. Authority: human-supervised execution.
 
 What this script does
-- Loads a context bundle (JSON) from a file path or stdin
+- Streams a context bundle (JSON or JSON Lines) from a file path or stdin
 - Normalizes artifacts and enforces allowed authority/kind values
 - Computes an admission score (authority weight + kind weight + explicit priority)
 - Outputs the reordered artifact list for operator review
@@ -19,55 +19,18 @@ What this script does not do
 from __future__ import annotations
 
 import argparse
-import json
+import heapq
 import sys
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
-
-
-@dataclass
-class Artifact:
-    artifact_id: str
-    kind: str
-    authority: str
-    priority: int
-    title: str
-    content: str
-
-
-ALLOWED_AUTHORITIES = {"system", "developer", "user", "tool", "other"}
-ALLOWED_KINDS = {"system", "task", "message", "document", "tool_output", "other"}
-
-DEFAULT_AUTHORITY_WEIGHT = {
-    "system": 1000,
-    "developer": 800,
-    "user": 600,
-    "tool": 400,
-    "other": 200,
-}
-
-DEFAULT_KIND_WEIGHT = {
-    "system": 120,
-    "task": 110,
-    "message": 60,
-    "document": 50,
-    "tool_output": 40,
-    "other": 10,
-}
-
-
-def _safe_int(x: Any, default: int = 0) -> int:
-    try:
-        return int(x)
-    except Exception:
-        return default
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+REPO_ROOT = Path(__file__).resolve().parents[4]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
-def load_json_from_path_or_stdin(path: Optional[str]) -> Dict[str, Any]:
-    if path and path != "-":
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return json.load(sys.stdin)
+from context_core.artifact import Artifact, normalize_artifact  # noqa: E402
+from context_core.bundle_stream import iter_artifact_records  # noqa: E402
+from context_core.precedence import DEFAULT_WEIGHTS  # noqa: E402
 
 
 def normalize_bundle(bundle: Dict[str, Any]) -> List[Artifact]:
@@ -75,34 +38,13 @@ def normalize_bundle(bundle: Dict[str, Any]) -> List[Artifact]:
     if not isinstance(artifacts_raw, list):
         raise ValueError("bundle.artifacts must be a list")
 
-    artifacts: List[Artifact] = []
-    for i, a in enumerate(artifacts_raw):
-        if not isinstance(a, dict):
-            raise ValueError(f"artifact at index {i} must be an object")
-
-        artifact_id = str(a.get("id") or a.get("artifact_id") or f"artifact_{i}")
-        kind = str(a.get("kind") or "other").strip()
-        authority = str(a.get("authority") or "other").strip()
-        priority = _safe_int(a.get("priority"), default=0)
-        title = str(a.get("title") or artifact_id).strip()
-        content = str(a.get("content") or "").strip()
-
-        if kind not in ALLOWED_KINDS:
-            kind = "other"
-        if authority not in ALLOWED_AUTHORITIES:
-            authority = "other"
-
-        artifacts.append(
-            Artifact(
-                artifact_id=artifact_id,
-                kind=kind,
-                authority=authority,
-                priority=priority,
-                title=title,
-                content=content,
-            )
-        )
-    return artifacts
+    return [normalize_artifact(a, i) for i, a in enumerate(artifacts_raw)]
+
+
+def iter_artifacts(path: Optional[str]) -> Iterator[Artifact]:
+    """Streams normalized artifacts from a bundle, JSON array or JSON Lines file (or stdin)."""
+    for i, a in enumerate(iter_artifact_records(path)):
+        yield normalize_artifact(a, i)
 
 
 def score(a: Artifact) -> int:
@@ -110,16 +52,19 @@ def score(a: Artifact) -> int:
     Admission score: authority weight + kind weight + explicit priority.
     Higher score ranks earlier.
     """
-    return (
-        DEFAULT_AUTHORITY_WEIGHT.get(a.authority, 0)
-        + DEFAULT_KIND_WEIGHT.get(a.kind, 0)
-        + a.priority
-    )
+    return DEFAULT_WEIGHTS.score(a)
 
 
-def reorder(artifacts: List[Artifact]) -> List[Tuple[Artifact, int]]:
-    ranked = sorted(artifacts, key=lambda a: score(a), reverse=True)
-    return [(a, score(a)) for a in ranked]
+def reorder(artifacts: Iterable[Artifact], top: Optional[int] = None) -> List[Tuple[Artifact, int]]:
+    """
+    (artifact, score) pairs, highest score first; ties keep input order.
+    Each artifact is scored once. With `top`, only the best `top` are kept
+    (a bounded heap, so the input can be a stream).
+    """
+    scored = ((a, score(a)) for a in artifacts)
+    if top is not None:
+        return heapq.nlargest(top, scored, key=lambda p: p[1])
+    return sorted(scored, key=lambda p: p[1], reverse=True)
 
 
 def print_table(rows: List[List[str]], headers: List[str]) -> None:
@@ -145,25 +90,38 @@ def main() -> int:
         default="-",
         help="Path to context bundle JSON. Use '-' to read from stdin.",
     )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=None,
+        help="Only list the N highest-ranked artifacts (the bundle is streamed, not held).",
+    )
     args = parser.parse_args()
+    if args.top is not None and args.top < 0:
+        print("ERROR: --top must be >= 0", file=sys.stderr)
+        return 2
+
+    seen = [0]
+
+    def _counted(stream: Iterator[Artifact]) -> Iterator[Artifact]:
+        for a in stream:
+            seen[0] += 1
+            yield a
 
     try:
-        bundle = load_json_from_path_or_stdin(args.input)
-        artifacts = normalize_bundle(bundle)
+        ranked = reorder(_counted(iter_artifacts(args.input)), top=args.top)
     except Exception as e:
         print(f"ERROR: failed to load/parse context bundle: {e}", file=sys.stderr)
         return 2
 
-    if not artifacts:
+    if not seen[0]:
         print("No artifacts found in bundle.artifacts", file=sys.stderr)
         return 1
 
-    ranked = reorder(artifacts)
-
     print("")
     print("Reorder by Authority + Kind + Priority")
     print("--------------------------------------")
-    print(f"Artifacts: {len(artifacts)}")
+    print(f"Artifacts: {seen[0]}")
     print("")
 
     rows: List[List[str]] = []
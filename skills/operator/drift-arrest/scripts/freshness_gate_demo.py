@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Purpose: Demonstrate a freshness gate that ages out stale artifacts as a session advances
+Skill: skills/operator/drift-arrest/SKILL.md
+Note: Illustrative script. Not production code. Authority: human-supervised execution.
+Implementation: context_core/freshness.py (also: python -m context_core.freshness)
+
+What this script does
+- Streams a context bundle (JSON or JSON Lines) from a file path or stdin
+- Parses each artifact's timestamp once into epoch seconds and applies a
+  per-kind TTL (system/task never expire by default)
+- Replays the bundle in order: the clock follows the newest timestamp seen,
+  and each turn evicts only the artifacts that just went stale (a per-scope
+  expiry heap, O(log n) per artifact, no rescans)
+- Reports the eviction timeline and the final VALID / STALE / UNKNOWN state
+  of every artifact at --now
+- Optionally writes the artifacts that are still valid as JSON Lines
+
+What this script does not do
+- It does not check provenance, authority, scope or consistency (other validation checks)
+- It does not refresh stale artifacts; it only removes their influence
+- It does not infer timestamps that are missing (they are UNKNOWN)
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from context_core.freshness import main  # noqa: E402
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Purpose: Detect stale persistent artifacts per scope for Drift Arrest
+Skill: skills/operator/drift-arrest/SKILL.md
+Note: Illustrative script. Not production code. Authority: human-supervised execution.
+
+What this script does
+- Streams a context bundle (JSON or JSON Lines) from a file path or stdin
+- Indexes every artifact whose kind has a TTL by expiry time, one heap per
+  scope, parsing each timestamp once
+- Pops the stale artifacts of each scope at --now (cost proportional to
+  what is stale, not to the bundle)
+- Reports per scope: tracked, stale and unknown counts, the oldest stale
+  age and the next expiry; then lists stale artifacts, earliest expired first
+- Exits 1 with --fail-on-stale when anything is stale (for use as a check)
+
+What this script does not do
+- It does not quarantine, refresh or delete artifacts (see freshness_gate_demo.py)
+- It does not decide whether a stale artifact is still correct
+- It does not infer timestamps that are missing (they are reported as unknown)
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from context_core.artifact import Artifact, normalize_artifact  # noqa: E402
+from context_core.bundle_stream import iter_artifact_records  # noqa: E402
+from context_core.freshness import (  # noqa: E402
+    FreshnessIndex,
+    fmt_age,
+    fmt_time,
+    latest_timestamp,
+    parse_timestamp,
+    parse_ttl_overrides,
+)
+
+
+# ----------------------------
+# Output helpers
+# ----------------------------
+
+def print_table(rows: List[List[str]], headers: List[str]) -> None:
+    cols = list(zip(*([headers] + rows))) if rows else [headers]
+    widths = [max(len(str(cell)) for cell in col) for col in cols]
+
+    def _line(parts: List[str]) -> str:
+        return "  ".join(str(p).ljust(w) for p, w in zip(parts, widths))
+
+    print(_line(headers))
+    print(_line(["-" * w for w in widths]))
+    for r in rows:
+        print(_line(r))
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Drift Arrest: detect stale artifacts per scope.")
+    parser.add_argument(
+        "--input",
+        "-i",
+        default="-",
+        help="Path to context bundle JSON. Use '-' to read from stdin.",
+    )
+    parser.add_argument(
+        "--ttl",
+        action="append",
+        default=[],
+        metavar="KIND=DURATION",
+        help="Override a kind's TTL (e.g. tool_output=15m, document=7d, message=none). Repeatable.",
+    )
+    parser.add_argument(
+        "--now",
+        default=None,
+        help="Evaluation time (ISO-8601 or epoch seconds). Default: the newest timestamp in the bundle.",
+    )
+    parser.add_argument(
+        "--scope",
+        action="append",
+        default=None,
+        help="Only check this scope ('-' for unscoped artifacts). Repeatable.",
+    )
+    parser.add_argument(
+        "--fail-on-stale",
+        action="store_true",
+        help="Exit 1 if any artifact is stale.",
+    )
+    args = parser.parse_args()
+
+    try:
+        ttls = parse_ttl_overrides(args.ttl)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+
+    index = FreshnessIndex(ttls)
+    artifacts: List[Artifact] = []
+    stamps: List[Optional[int]] = []
+    unknown: Dict[Optional[str], int] = {}
+    tracked: Dict[Optional[str], int] = {}
+    try:
+        for i, raw in enumerate(iter_artifact_records(args.input)):
+            a = normalize_artifact(raw, i)
+            artifacts.append(a)
+            stamps.append(parse_timestamp(a.timestamp))
+            if index.add(a, key=i) is not None:
+                tracked[a.scope] = tracked.get(a.scope, 0) + 1
+            elif index.ttl(a.kind) is not None:
+                unknown[a.scope] = unknown.get(a.scope, 0) + 1
+    except (OSError, ValueError) as e:
+        print(f"ERROR: failed to read bundle: {e}", file=sys.stderr)
+        return 2
+
+    if not artifacts:
+        print("No artifacts found in bundle.artifacts", file=sys.stderr)
+        return 1
+
+    now = parse_timestamp(args.now) if args.now is not None else latest_timestamp(artifacts)
+    if now is None and args.now is not None:
+        print(f"ERROR: --now {args.now!r} is not a timestamp", file=sys.stderr)
+        return 2
+    if now is None:
+        print("ERROR: no evaluation time: pass --now or include timestamps in the bundle", file=sys.stderr)
+        return 2
+
+    scopes = sorted(set(tracked) | set(unknown), key=lambda s: (s is not None, s or ""))
+    if args.scope is not None:
+        wanted = {None if s == "-" else s for s in args.scope}
+        scopes = [s for s in scopes if s in wanted]
+
+    scope_rows: List[List[str]] = []
+    stale_rows: List[List[str]] = []
+    total_stale = 0
+    for scope in scopes:
+        stale = index.expire(now, scope=scope)
+        total_stale += len(stale)
+        oldest = max((now - stamps[i] for i in stale), default=None)
+        scope_rows.append([
+            scope or "-",
+            str(tracked.get(scope, 0)),
+            str(len(stale)),
+            str(unknown.get(scope, 0)),
+            fmt_age(oldest),
+            fmt_time(index.next_expiry(scope)),
+        ])
+        for i in stale:
+            a = artifacts[i]
+            stale_rows.append([
+                a.artifact_id,
+                a.kind,
+                scope or "-",
+                a.authority,
+                fmt_time(stamps[i]),
+                fmt_age(now - stamps[i]),
+                fmt_age(index.ttl(a.kind)),
+                a.title[:40],
+            ])
+
+    print("")
+    print("Stale Artifact Detector")
+    print("-----------------------")
+    print(f"Artifacts:          {len(artifacts)}")
+    print(f"Evaluated at:       {fmt_time(now)}")
+    print(f"Stale:              {total_stale}")
+    print("")
+
+    print("By scope")
+    print_table(scope_rows, headers=["scope", "tracked", "stale", "unknown", "oldest stale", "next expiry"])
+    print("")
+
+    print("Stale artifacts (earliest expired first, per scope)")
+    if stale_rows:
+        print_table(stale_rows, headers=["id", "kind", "scope", "authority", "timestamp", "age", "ttl", "title"])
+    else:
+        print("(none)")
+    print("")
+
+    print("Operator reminder")
+    print("-----------------")
+    print("Stale artifacts should be quarantined or refreshed against current ground truth, not silently reused.")
+    print("Artifacts with unknown timestamps cannot be validated for lifetime; treat them as not valid.")
+    print("")
+
+    return 1 if args.fail_on_stale and total_stale else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Purpose: Test that a gate's admitted context does not depend on input order
+Skill: skills/operator/session-stabilization/SKILL.md
+Note: Illustrative script. Not production code. Authority: human-supervised execution.
+Implementation: context_core/invariance.py (also: python -m context_core.invariance)
+
+What this script does
+- Streams a context bundle (JSON or JSON Lines) from a file path or stdin
+- Runs the example gate (gate_bundle) or truncator (truncate_session) on
+  the bundle as given and on hundreds of seeded permutations of it, in
+  parallel worker processes that share the parsed bundle
+- Keeps declared order dependence out of the test: artifacts of the
+  --keep-order kinds (default: message, since the question is the first
+  message and truncation keeps the latest two) keep their relative order
+- Diffs the admitted ids of every permutation against the original
+- Shrinks the first failing permutation to a minimal bundle (optionally
+  written to --save-failure) and exits 1
+
+What this script does not do
+- It does not test every permutation (only --runs seeded ones)
+- It does not fix order dependence (ties in score are broken by input order
+  unless the gate breaks them itself)
+- It does not compare token counts or content, only admitted ids
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from context_core.invariance import main  # noqa: E402
+
+if __name__ == "__main__":
+    raise SystemExit(main())